@@ -3,8 +3,24 @@ from flask_bootstrap import Bootstrap
 from docker.docker_config import Config
 from pymongo import MongoClient
 from flask_cors import CORS
-import geopandas as gpd
 import os
+import sys
+import threading
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(__file__)), 'processing'))
+from enhanced.address_index import AddressIndex
+from suggest_index import SuggestIndex
+from frame_cache import load_frame
+from app.route_cache import ensure_indexes
+
+
+def is_serving():
+    """False inside `flask <command>` for any command other than `run` (seed-tiles, purge-route-cache, ...)"""
+    program = os.path.normpath(sys.argv[0]) if sys.argv else ''
+    if os.path.basename(program) not in ('flask', 'flask.exe') and not program.endswith(os.path.join('flask', '__main__.py')):
+        return True
+    return 'run' in [arg for arg in sys.argv[1:] if not arg.startswith('-')]
+
 
 app = Flask(__name__)
 CORS(app)
@@ -18,6 +34,11 @@ client = MongoClient(mongodb_uri)
 db = client.flask_db
 geoms = db.geoms
 route = db.route
+legs = db.legs
+jobs = db.jobs
+leases = db.leases
+# In the background: an unreachable MongoDB must not hold up worker boots and CLI commands
+threading.Thread(target=ensure_indexes, args=(route, legs), daemon=True).start()
 
 # Define Docker and local data directories
 docker_data_dir = '/app/data'
@@ -37,19 +58,26 @@ points = None
 
 if os.path.exists(routes_file):
     try:
-        routes_gdf = gpd.read_file(routes_file)
-        routes_gdf.to_crs(epsg=4326, inplace=True)
+        # Read from the reprojected GeoParquet cache next to the file when it is fresh
+        routes_gdf = load_frame(routes_file, crs=4326, build=app.config['FRAME_CACHE'])
         print(f"Loaded routes from {routes_file}")
     except Exception as e:
         print(f"Error loading routes file: {e}")
 
 if os.path.exists(points_file):
     try:
-        points = gpd.read_file(points_file)
+        points = load_frame(points_file, build=app.config['FRAME_CACHE'])
         print(f"Loaded points from {points_file}")
     except Exception as e:
         print(f"Error loading points file: {e}")
 
+# Postcode -> rows lookups and address matching used by the routing endpoints
+points_index = AddressIndex(points) if points is not None else None
+routes_index = AddressIndex(routes_gdf) if routes_gdf is not None else None
+
+# Prefix/token index behind /suggest
+suggest_index = SuggestIndex(points) if points is not None else None
+
 # Make data available globally
 app.config['ROUTES_GDF'] = routes_gdf
 app.config['POINTS'] = points
@@ -57,3 +85,8 @@ app.config['NETWORK_FILE'] = network_file
 app.config['DATA_DIR'] = data_dir
 
 from app import routes, errors, models
+
+if is_serving():
+    # Pick up batch jobs cut off by a restart without waiting for a /jobs request
+    threading.Thread(target=routes.get_batch_runner, daemon=True).start()
+    routes.start_file_sweepers()
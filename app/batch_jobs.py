@@ -0,0 +1,149 @@
+"""
+Batch Routing Jobs
+Routing batches too large for one HTTP request are stored in the `jobs`
+collection and executed by a local thread pool; clients poll the job for
+progress and fetch the routes from the route cache when it is done
+"""
+
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+from pymongo import ASCENDING, ReturnDocument
+
+
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+
+
+def _now():
+    return datetime.now(timezone.utc)
+
+
+class BatchJobRunner:
+    """
+    Executes batch jobs in `max_workers` background threads
+
+    A job routes one start to many destinations in chunks of `chunk_size`;
+    `route_chunk(job, end_zips, on_progress)` does the routing of one chunk
+    and returns the destinations without a route. Jobs are claimed with an
+    atomic update, so several app processes can share the collection; a
+    running job whose heartbeat is older than `stale_after` seconds is
+    picked up again by resume().
+    """
+
+    def __init__(self, jobs, route_chunk, max_workers=2, chunk_size=50, stale_after=600):
+        self.jobs = jobs
+        self.route_chunk = route_chunk
+        self.chunk_size = max(1, int(chunk_size))
+        self.stale_after = stale_after
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='batch-job')
+        self._owner = f"{uuid.uuid4().hex[:8]}"
+
+    def ensure_indexes(self):
+        try:
+            self.jobs.create_index([('status', ASCENDING), ('updated_at', ASCENDING)], name='status_updated')
+        except Exception as e:
+            print(f"❌ Could not create job indexes: {e}")
+
+    def submit(self, start_zip, end_zips, network):
+        """
+        Store a new job and queue it
+
+        Returns:
+            The job id
+        """
+        job_id = uuid.uuid4().hex
+        now = _now()
+        # Repeated postcodes are routed once, so they count once towards the total
+        end_zips = list(dict.fromkeys(end_zips))
+        self.jobs.insert_one({
+            '_id': job_id,
+            'status': QUEUED,
+            'start_zip': start_zip,
+            'end_zips': end_zips,
+            'network': network,
+            'total': len(end_zips),
+            'completed': 0,
+            'progress': 0.0,
+            'failed_zips': [],
+            'error': None,
+            'created_at': now,
+            'updated_at': now,
+        })
+        self._executor.submit(self._run, job_id)
+        return job_id
+
+    def resume(self):
+        """Queue jobs left unfinished by a stopped process"""
+        stale = datetime.fromtimestamp(time.time() - self.stale_after, timezone.utc)
+        try:
+            pending = self.jobs.find(
+                {'$or': [{'status': QUEUED}, {'status': RUNNING, 'updated_at': {'$lt': stale}}]},
+                {'_id': 1}
+            )
+            job_ids = [job['_id'] for job in pending]
+        except Exception as e:
+            print(f"❌ Could not resume batch jobs: {e}")
+            return 0
+        for job_id in job_ids:
+            self._executor.submit(self._run, job_id, True)
+        return len(job_ids)
+
+    def get(self, job_id):
+        return self.jobs.find_one({'_id': job_id})
+
+    def _claim(self, job_id, stale_ok):
+        claimable = [{'status': QUEUED}]
+        if stale_ok:
+            stale = datetime.fromtimestamp(time.time() - self.stale_after, timezone.utc)
+            claimable.append({'status': RUNNING, 'updated_at': {'$lt': stale}})
+        return self.jobs.find_one_and_update(
+            {'_id': job_id, '$or': claimable},
+            {'$set': {'status': RUNNING, 'owner': self._owner, 'updated_at': _now()}},
+            return_document=ReturnDocument.AFTER
+        )
+
+    def _update(self, job_id, **fields):
+        fields['updated_at'] = _now()
+        self.jobs.update_one({'_id': job_id}, {'$set': fields})
+
+    def _run(self, job_id, stale_ok=False):
+        job = self._claim(job_id, stale_ok)
+        if job is None:
+            return
+
+        end_zips = list(dict.fromkeys(job['end_zips']))
+        chunks = [end_zips[i:i + self.chunk_size] for i in range(0, len(end_zips), self.chunk_size)]
+        failed = []
+        completed = 0
+        lock = threading.Lock()
+        last_report = [0.0]
+
+        def report(fraction_of_chunk):
+            # Mongo is updated at most once per percent of the whole job
+            progress = round(100.0 * (completed + fraction_of_chunk * len(chunk)) / max(1, len(end_zips)), 1)
+            with lock:
+                if progress - last_report[0] < 1.0:
+                    return
+                last_report[0] = progress
+            self._update(job_id, progress=progress)
+
+        try:
+            for chunk in chunks:
+                failed.extend(self.route_chunk(job, chunk, lambda percent: report(percent / 100.0)))
+                completed += len(chunk)
+                last_report[0] = round(100.0 * completed / len(end_zips), 1)
+                self._update(job_id, completed=completed, progress=last_report[0], failed_zips=failed)
+            self._update(job_id, status=DONE, progress=100.0, finished_at=_now())
+            print(f"✅ Batch job {job_id} done: {completed - len(failed)}/{completed} routes")
+        except Exception as e:
+            print(f"❌ Batch job {job_id} failed: {e}")
+            self._update(job_id, status=FAILED, error=str(e), finished_at=_now())
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,103 @@
+"""
+Compact Route Responses
+Rewrites route responses (GeoJSON strings nested in JSON) into a single-level
+JSON payload: coordinates are quantized to a chosen number of decimals and
+polyline-encoded, and features keep only the route length the map needs
+"""
+
+import json
+
+import numpy as np
+
+
+def encode_polyline(coordinates, precision=5):
+    """
+    Encoded polyline (Google algorithm) of lon/lat coordinates
+
+    Args:
+        coordinates: Sequence of [lon, lat] (extra dimensions are ignored)
+        precision: Decimals kept; 5 is the usual polyline precision (~1 m)
+
+    Returns:
+        The encoded string, in lat/lon order like the Google format
+    """
+    coords = np.asarray(coordinates, dtype=float)
+    if coords.size == 0:
+        return ''
+    quantized = np.round(coords[:, 1::-1] * 10 ** precision).astype(np.int64)
+    deltas = np.diff(quantized, axis=0, prepend=np.zeros((1, 2), dtype=np.int64)).ravel()
+    # Zigzag: small negative deltas become small positive integers
+    values = ((deltas << 1) ^ (deltas >> 63)).tolist()
+    chars = []
+    for value in values:
+        while value >= 0x20:
+            chars.append(chr((0x20 | (value & 0x1f)) + 63))
+            value >>= 5
+        chars.append(chr(value + 63))
+    return ''.join(chars)
+
+
+def compact_geojson(value, precision=5):
+    """
+    Compact form of a GeoJSON FeatureCollection (string or dict)
+
+    Returns:
+        dict with 'points' (one polyline of every point), 'lines' (one polyline
+        per line part) and 'length' (of the first feature that has one); empty
+        members are left out
+    """
+    collection = json.loads(value) if isinstance(value, str) else value
+    points = []
+    lines = []
+    length = None
+    for feature in collection.get('features', []):
+        geometry = feature.get('geometry') or {}
+        kind = geometry.get('type')
+        coordinates = geometry.get('coordinates')
+        if kind == 'Point':
+            points.append(coordinates)
+        elif kind == 'MultiPoint':
+            points.extend(coordinates)
+        elif kind == 'LineString':
+            lines.append(encode_polyline(coordinates, precision))
+        elif kind == 'MultiLineString':
+            lines.extend(encode_polyline(part, precision) for part in coordinates)
+        if length is None:
+            length = (feature.get('properties') or {}).get('length')
+
+    compact = {}
+    if points:
+        compact['points'] = encode_polyline(points, precision)
+    if lines:
+        compact['lines'] = lines
+    if length is not None:
+        compact['length'] = round(float(length), 2)
+    return compact
+
+
+def _is_geojson(value):
+    if isinstance(value, str):
+        return value.lstrip().startswith('{"type"')
+    return isinstance(value, dict) and 'features' in value
+
+
+def _compact_members(payload, precision):
+    compact = {}
+    for key, value in payload.items():
+        if key in ('start', 'end', 'route', 'routes') and _is_geojson(value):
+            value = compact_geojson(value, precision)
+        elif key == 'routes' and isinstance(value, list):
+            value = [_compact_members(entry, precision) if isinstance(entry, dict) else entry for entry in value]
+        compact[key] = value
+    return compact
+
+
+def compact_payload(payload, precision=5):
+    """
+    Compact copy of a route response or stream record
+
+    GeoJSON members ('start', 'end', 'route', 'routes', and 'end'/'route' of
+    every entry of a 'routes' list) are replaced by compact_geojson(); other
+    members (tables, totals, flags) are kept as they are.
+    """
+    return {'format': 'compact', 'precision': precision, **_compact_members(payload, precision)}
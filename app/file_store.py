@@ -0,0 +1,162 @@
+"""
+Content-Addressed Routing Files
+Names the GPKG layers exchanged with the QGIS subprocess after a hash of
+their content, so identical requests reuse the same files, and sweeps the
+routing directories to keep them within an age and size budget
+"""
+
+import hashlib
+import os
+import threading
+import time
+import uuid
+
+
+def content_key(*parts):
+    """
+    Short hash of GeoDataFrames/GeoSeries (geometry and attributes) and strings
+
+    Returns:
+        20 hex characters, identical for identical content
+    """
+    sha = hashlib.sha256()
+    for part in parts:
+        text = part if isinstance(part, str) else part.to_json()
+        sha.update(text.encode())
+        sha.update(b'\0')
+    return sha.hexdigest()[:20]
+
+
+def touch(path):
+    """Mark a reused file as recently used so the sweeper keeps it"""
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+
+
+def temporary_path(path):
+    """Unique sibling of `path` with the same extension, to be moved into place"""
+    root, ext = os.path.splitext(str(path))
+    return f"{root}.{uuid.uuid4().hex}.tmp{ext}"
+
+
+def store_frame(frame, path, driver='GPKG'):
+    """
+    Write a GeoDataFrame to its content-addressed path unless it is already there
+
+    The file is written under a temporary name and renamed, so concurrent
+    requests never read a half-written layer.
+    """
+    if os.path.exists(path):
+        touch(path)
+        return path
+    tmp = temporary_path(path)
+    try:
+        frame.to_file(tmp, driver=driver)
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+    return path
+
+
+class FileSweeper:
+    """
+    Background thread deleting routing files older than `max_age` seconds, and
+    the least recently used ones while the directories exceed `max_bytes`
+
+    With a `lock_path`, only the process holding an exclusive lock on that
+    file sweeps, so several app processes on one host do not scan the same
+    directories; another process takes over when the holder exits.
+    """
+
+    def __init__(self, directories, max_bytes=1024 ** 3, max_age=7 * 24 * 3600, interval=600, lock_path=None):
+        self.directories = [str(d) for d in directories]
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.interval = interval
+        self.lock_path = str(lock_path) if lock_path is not None else None
+        self._lock_file = None
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def _holds_lock(self):
+        if self.lock_path is None or self._lock_file is not None:
+            return True
+        try:
+            import fcntl
+        except ImportError:
+            # No advisory locks (Windows): every process sweeps
+            return True
+        lock_file = open(self.lock_path, 'a')
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+        self._lock_file = lock_file
+        return True
+
+    def _files(self):
+        files = []
+        for directory in self.directories:
+            try:
+                entries = os.scandir(directory)
+            except OSError:
+                continue
+            with entries:
+                for entry in entries:
+                    try:
+                        if entry.is_file():
+                            stat = entry.stat()
+                            files.append((stat.st_mtime, stat.st_size, entry.path))
+                    except OSError:
+                        continue
+        return files
+
+    def sweep(self):
+        """
+        Apply the age and size budgets once
+
+        Returns:
+            dict with the number of deleted files, freed bytes and bytes kept
+        """
+        files = sorted(self._files())
+        cutoff = time.time() - self.max_age
+        total = sum(size for _, size, _ in files)
+        deleted = 0
+        freed = 0
+        for mtime, size, path in files:
+            if mtime >= cutoff and total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            freed += size
+            deleted += 1
+        return {'deleted': deleted, 'freed_bytes': freed, 'kept_bytes': total}
+
+    def _loop(self):
+        while True:
+            try:
+                result = self.sweep() if self._holds_lock() else {'deleted': 0}
+                if result['deleted']:
+                    print(f"✅ Swept {result['deleted']} routing files ({result['freed_bytes']} bytes)")
+            except Exception as e:
+                print(f"❌ Routing file sweep failed: {e}")
+            if self._stopped.wait(self.interval):
+                break
+
+    def start(self):
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stopped.set()
+        if self._lock_file is not None:
+            self._lock_file.close()
+            self._lock_file = None
@@ -0,0 +1,207 @@
+"""
+MongoDB Route Cache
+Indexes, bulk lookups and upserts for the `route` and `legs` collections.
+Routes are stored as GeoJSON features (properties + geometry) so a cache hit
+is served without parsing WKT or building a GeoDataFrame. Every document
+carries the network fingerprint it was computed with (`network`) and the
+simplified geometries served so far (`simplified`, by level)
+"""
+
+import json
+
+from pymongo import ASCENDING, UpdateOne
+from shapely import wkt
+from shapely.geometry import mapping
+
+from app.simplify import simplify_geometry
+
+
+EMPTY_FEATURE_COLLECTION = '{"type": "FeatureCollection", "features": []}'
+
+
+def ensure_indexes(route, legs):
+    """Create the indexes behind every cache lookup (no-op if they exist)"""
+    try:
+        route.create_index([('route_key', ASCENDING)], name='route_key')
+        route.create_index(
+            [('start_point', ASCENDING), ('end_point', ASCENDING), ('network', ASCENDING)],
+            name='start_end_point_network'
+        )
+        route.create_index([('network', ASCENDING)], name='network')
+        legs.create_index([('leg_key', ASCENDING)], name='leg_key')
+        legs.create_index([('network', ASCENDING)], name='network')
+        print("✅ Route cache indexes ready")
+    except Exception as e:
+        print(f"❌ Could not create route cache indexes: {e}")
+    try:
+        # Behind the routes vector tiles
+        route.create_index([('geometry', '2dsphere')], name='geometry')
+    except Exception as e:
+        print(f"❌ Could not create route geometry index (run `flask purge-route-cache` to drop WKT routes): {e}")
+
+
+def route_document(frame, **keys):
+    """
+    Cache document for the last route of a GeoDataFrame
+
+    Args:
+        frame: GeoDataFrame returned by the routing backend (EPSG:4326)
+        **keys: Lookup fields stored with the route (route_key, start_point, ...)
+
+    Returns:
+        dict of the route's properties with a GeoJSON geometry
+    """
+    feature = json.loads(frame.iloc[[-1]].to_json())['features'][0]
+    document = feature['properties']
+    document.update(keys)
+    document['geometry'] = feature['geometry']
+    return document
+
+
+def _geometry(value):
+    # Documents written before the GeoJSON switch hold WKT strings
+    if isinstance(value, str):
+        return mapping(wkt.loads(value))
+    return value
+
+
+def feature_collection(documents):
+    """GeoJSON FeatureCollection string for cached route documents (like GeoDataFrame.to_json)"""
+    features = []
+    for i, document in enumerate(documents):
+        properties = {k: v for k, v in document.items() if k not in ('geometry', 'simplified')}
+        if '_id' in properties:
+            properties['_id'] = str(properties['_id'])
+        features.append({
+            'id': str(i),
+            'type': 'Feature',
+            'properties': properties,
+            'geometry': _geometry(document.get('geometry'))
+        })
+    return json.dumps({'type': 'FeatureCollection', 'features': features})
+
+
+def simplify_documents(collection, documents, level, key_fields=('route_key',)):
+    """
+    Documents with their geometry simplified to `level`
+
+    Simplified geometries are read from the documents' `simplified` field;
+    missing ones are computed and stored there in one bulk write.
+
+    Args:
+        collection: The collection the documents come from
+        documents: Cached route documents
+        level: (level key, tolerance) from simplify_level(), or None
+        key_fields: Fields identifying a document that has no _id yet
+
+    Returns:
+        list of documents (copies when simplified)
+    """
+    if level is None:
+        return list(documents)
+    level_key, tolerance = level
+    simplified = []
+    updates = []
+    for document in documents:
+        geometry = (document.get('simplified') or {}).get(level_key)
+        if geometry is None:
+            geometry = simplify_geometry(_geometry(document.get('geometry')), tolerance)
+            selector = {'_id': document['_id']} if '_id' in document else {f: document[f] for f in key_fields}
+            updates.append(UpdateOne(selector, {'$set': {f'simplified.{level_key}': geometry}}))
+        simplified.append({**document, 'geometry': geometry})
+    if updates:
+        try:
+            collection.bulk_write(updates, ordered=False)
+        except Exception as e:
+            print(f"❌ Could not cache simplified routes: {e}")
+    return simplified
+
+
+def find_routes(route, route_keys, projection=None, level=None):
+    """
+    route_key -> cached document for every key found, in one $in query
+
+    Args:
+        route: The route collection
+        route_keys: Keys to look up
+        projection: Explicit find() projection; by default documents are read
+            without _id and without simplified geometries
+        level: (level key, tolerance) from simplify_level(); keeps only that
+            level of the simplified geometries, for simplify_documents()
+    """
+    query = {'route_key': {'$in': list(route_keys)}}
+    if projection is not None:
+        cursor = route.find(query, projection)
+    elif level is None:
+        cursor = route.find(query, {'_id': 0, 'simplified': 0})
+    else:
+        # Projections cannot mix exclusions with one included sub-field
+        level_key = level[0]
+        cursor = route.aggregate([
+            {'$match': query},
+            {'$set': {'simplified': {'$arrayToObject': [[{'k': level_key, 'v': f'$simplified.{level_key}'}]]}}},
+            {'$unset': '_id'}
+        ])
+    found = {}
+    for document in cursor:
+        found.setdefault(document['route_key'], document)
+    return found
+
+
+def find_route(route, start_point, end_point, network):
+    """Cached document for a start/end point pair on a network, or None"""
+    return route.find_one({'start_point': start_point, 'end_point': end_point, 'network': network})
+
+
+def save_routes(route, documents, key_fields=('route_key',)):
+    """
+    Upsert route documents in one bulk write
+
+    Args:
+        route: The route collection
+        documents: Documents from route_document()
+        key_fields: Fields identifying a cached route
+    """
+    if not documents:
+        return
+    route.bulk_write([
+        UpdateOne({field: document[field] for field in key_fields}, {'$set': document}, upsert=True)
+        for document in documents
+    ], ordered=False)
+
+
+def find_leg(legs, leg_key, level_key=None):
+    """Cached length and route (and simplified route at level_key, if stored) of a round trip leg, or None"""
+    projection = {'_id': 0, 'length': 1, 'route': 1}
+    if level_key is not None:
+        projection[f'simplified.{level_key}'] = 1
+    return legs.find_one({'leg_key': leg_key}, projection)
+
+
+def save_leg(legs, leg_key, document):
+    """Upsert a round trip leg"""
+    legs.update_one({'leg_key': leg_key}, {'$set': {'leg_key': leg_key, **document}}, upsert=True)
+
+
+def save_simplified_leg(legs, leg_key, level_key, route_json):
+    """Store the simplified route of a round trip leg next to the full one"""
+    legs.update_one({'leg_key': leg_key}, {'$set': {f'simplified.{level_key}': route_json}})
+
+
+def purge_stale(route, legs, network):
+    """
+    Delete cached routes and legs computed on any other network fingerprint
+
+    Args:
+        route: The route collection
+        legs: The legs collection
+        network: Fingerprint to keep
+
+    Returns:
+        dict with the number of deleted route and leg documents
+    """
+    stale = {'network': {'$ne': network}}
+    return {
+        'routes': route.delete_many(stale).deleted_count,
+        'legs': legs.delete_many(stale).deleted_count
+    }
@@ -1,19 +1,35 @@
 from flask import *
-from app import app, geoms, routes_gdf, points, route
+from app import (app, geoms, routes_gdf, points, points_file, route, legs, jobs, leases, points_index, routes_index,
+                 suggest_index)
 from app.forms import UserForm
+from app.batch_jobs import DONE, BatchJobRunner
+from app.compact_format import compact_payload
+from app.file_store import FileSweeper, content_key, store_frame, temporary_path, touch
+from app.response_cache import ResponseCache
+from app.single_flight import SingleFlight
+from app.route_cache import (EMPTY_FEATURE_COLLECTION, feature_collection, find_leg, find_route,
+                             find_routes, purge_stale, route_document, save_leg, save_routes,
+                             save_simplified_leg, simplify_documents)
+from app.simplify import simplify_geojson, simplify_level
 import json
 from bson import json_util, Int64
 import logging
 import subprocess
 import os
 import re
-import uuid
 import traceback
 import geopandas as gpd
+import pandas as pd
 from pathlib import Path
-from shapely import wkt
+import numpy as np
+import shapely
+import shapely.wkb
 from shapely.geometry import Point
 import sys
+import atexit
+import threading
+import time
+import click
 
 # Add processing directory to path for enhanced routing
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'processing'))
@@ -37,6 +53,35 @@ ROUTING_DATA_DIR.mkdir(exist_ok=True)
 (DATA_DIR / "zip_start").mkdir(parents=True, exist_ok=True)
 (DATA_DIR / "zip_end").mkdir(parents=True, exist_ok=True)
 (DATA_DIR / "routes").mkdir(parents=True, exist_ok=True)
+(DATA_DIR / "tiles").mkdir(parents=True, exist_ok=True)
+
+
+def start_file_sweepers():
+    """
+    Keep the routing file directories and the tile cache within their own age
+    and size budgets; started by serving processes only, one of which sweeps
+    per host
+    """
+    sweepers = [
+        FileSweeper(
+            [ROUTING_DATA_DIR, DATA_DIR / "zip_start", DATA_DIR / "zip_end", DATA_DIR / "routes"],
+            max_bytes=app.config['ROUTING_FILES_MAX_BYTES'],
+            max_age=app.config['ROUTING_FILES_MAX_AGE'],
+            interval=app.config['ROUTING_FILES_SWEEP_INTERVAL'],
+            lock_path=DATA_DIR / '.file-sweeper.lock'
+        ),
+        FileSweeper(
+            [DATA_DIR / "tiles"],
+            max_bytes=app.config['TILE_CACHE_MAX_BYTES'],
+            max_age=app.config['TILE_CACHE_MAX_AGE'],
+            interval=app.config['ROUTING_FILES_SWEEP_INTERVAL'],
+            lock_path=DATA_DIR / '.tile-sweeper.lock'
+        ),
+    ]
+    for sweeper in sweepers:
+        sweeper.start()
+        atexit.register(sweeper.stop)
+    return sweepers
 
 
 @app.route('/', methods=['GET', 'POST'])
@@ -85,6 +130,34 @@ def serve_zipcode_data():
     
     
 
+@app.route('/suggest', methods=['GET'])
+def suggest():
+    """
+    Zipcode suggestions for a partial postcode, street or city
+
+    GET: ?q=4000&limit=10&offset=0
+    Returns "ZIP - Street, City" suggestions with coordinates, best first.
+    """
+    query = request.args.get('q', '')
+    try:
+        limit = min(max(int(request.args.get('limit', 10)), 1), app.config['SUGGEST_MAX_LIMIT'])
+        offset = max(int(request.args.get('offset', 0)), 0)
+    except ValueError:
+        return jsonify({'error': 'limit and offset must be integers'}), 400
+
+    if suggest_index is None:
+        return jsonify({'error': 'Zipcode data not loaded'}), 503
+
+    suggestions, total = suggest_index.search(query, limit, offset)
+    return jsonify({
+        'query': query,
+        'total': total,
+        'offset': offset,
+        'limit': limit,
+        'suggestions': suggestions
+    })
+
+
 @app.route('/delete', methods=['POST'])
 def delete():
     if request.is_json:
@@ -94,11 +167,105 @@ def delete():
 
     return {"message" : "Data deleted"}
 
+def ndjson_line(record):
+    """One record of a newline-delimited JSON stream"""
+    return json.dumps(record) + "\n"
+
+
+def ndjson_response(records, precision=None):
+    """Stream the records of a generator as newline-delimited JSON, compacted if precision is given"""
+    if precision is not None:
+        records = (compact_payload(r, precision) for r in records)
+    return Response(stream_with_context(ndjson_line(r) for r in records), mimetype='application/x-ndjson')
+
+
+def iter_zip_r_routes(end_zips, end_addresses, end_cities, use_enhanced_routing, level=None):
+    """
+    Resolve the destinations of /get_zip_r one at a time, routes simplified to
+    `level` (from simplify_level()) if given
+
+    Yields:
+        (route entry with end and route GeoJSON, HTML table rows, route length)
+        per destination, in request order
+    """
+    for i, ezip in enumerate(end_zips):
+        if use_enhanced_routing and i < len(end_addresses) and i < len(end_cities):
+            # Use enhanced routing for precise end points
+            end_point = get_precise_point(points, ezip, end_addresses[i], end_cities[i], index=points_index)
+            zip_routes = get_precise_route_points(routes_gdf, ezip, end_addresses[i], end_cities[i], index=routes_index)
+        else:
+            # Standard routing
+            end_point = points_index.get(ezip)
+            zip_routes = routes_index.get(ezip)
+        if not zip_routes.empty:
+            formatted = zip_routes.loc[:, ['address', 'city', 'postcode', 'length']]
+            # Get the route length for this destination
+            route_length = formatted.iloc[0]['length'] if len(formatted) > 0 else 0
+            rows = [
+                f"<tr><td>{row['address']}</td><td>{row['city']}</td><td>{row['postcode']}</td><td>{row['length']}</td></tr>"
+                for _, row in formatted.iterrows()
+            ]
+            route_json = zip_routes.to_json()
+            if level is not None:
+                route_json = simplify_geojson(route_json, level[1])
+            yield (
+                {'end': end_point.to_json(), 'route': route_json},
+                rows,
+                round(float(route_length), 2) if route_length else 0
+            )
+        else:
+            # Fallback for missing route
+            yield (
+                {
+                    'end': end_point.to_json() if not end_point.empty else EMPTY_FEATURE_COLLECTION,
+                    'route': EMPTY_FEATURE_COLLECTION
+                },
+                [f"<tr><td>N/A</td><td>N/A</td><td>{ezip}</td><td>0</td></tr>"],
+                0
+            )
+
+
+def zip_r_table(end_zips, end_addresses, end_cities, table_rows, route_lengths, use_enhanced_routing):
+    """HTML results table of /get_zip_r"""
+    standard_table = (
+        "<table border='1' style='border-collapse: collapse; width: 100%; background: white;'>"
+        "<thead><tr><th>address</th><th>city</th><th>postcode</th><th>length</th></tr></thead>"
+        "<tbody>" + "".join(table_rows) + "</tbody></table>"
+    )
+    if not (use_enhanced_routing and ENHANCED_ROUTING_AVAILABLE):
+        return standard_table
+
+    try:
+        # Create location data for table enhancement
+        end_location_data = []
+        for i, ezip in enumerate(end_zips):
+            location_data = {'postcode': ezip}
+            if i < len(end_addresses) and end_addresses[i]:
+                location_data['address'] = end_addresses[i]
+            if i < len(end_cities) and end_cities[i]:
+                location_data['city'] = end_cities[i]
+            end_location_data.append(location_data)
+        
+        return enhance_table_output(None, end_location_data, route_lengths)
+    except Exception as e:
+        print(f"Error generating enhanced table: {e}")
+        # Fallback to standard table
+        return standard_table
+
+
 @app.route('/get_zip_r', methods=['GET'])
 def get_zip_r():
+    """
+    Routes from one zip code to several
+
+    With ?stream=1 the response is newline-delimited JSON: a 'start' record,
+    one 'route' record per destination as soon as it is resolved, then a
+    'summary' record with the results table.
+    """
     start_zip = request.args.get('startZip')
     end_zip = request.args.get('endZip')
     end_zips = [z.strip() for z in end_zip.split(',') if z.strip()]
+    stream = request.args.get('stream') in ('1', 'true')
     
     # Enhanced: Get specific address data for precise routing
     start_address = request.args.get('startAddress', '')
@@ -113,88 +280,51 @@ def get_zip_r():
     if use_enhanced_routing:
         print("Using enhanced precise routing")
         # Get precise start point
-        start_point = get_precise_point(points, start_zip, start_address, start_city)
+        start_point = get_precise_point(points, start_zip, start_address, start_city, index=points_index)
     else:
         print("Using standard postcode-only routing")
-        start_point = points[points['postcode'] == start_zip]
+        start_point = points_index.get(start_zip)
     
+    destinations = iter_zip_r_routes(end_zips, end_addresses, end_cities, use_enhanced_routing, simplify_level_arg())
+
+    if stream:
+        def records():
+            yield {'type': 'start', 'start': start_point.to_json(), 'count': len(end_zips), 'is_multiple': len(end_zips) > 1}
+            table_rows = []
+            route_lengths = []
+            try:
+                for i, (entry, rows, length) in enumerate(destinations):
+                    table_rows.extend(rows)
+                    route_lengths.append(length)
+                    yield {'type': 'route', 'index': i, **entry}
+            except Exception as e:
+                # The status line is already sent: report the failure in the stream
+                traceback.print_exc()
+                yield {'type': 'error', 'error': str(e)}
+                return
+            yield {
+                'type': 'summary',
+                'routes_html': zip_r_table(end_zips, end_addresses, end_cities, table_rows, route_lengths, use_enhanced_routing),
+                'is_multiple': len(end_zips) > 1
+            }
+        return ndjson_response(records(), compact_precision())
+
     all_routes = []
     table_rows = []
     route_lengths = []  # Collect route lengths for enhanced table
+    for entry, rows, length in destinations:
+        all_routes.append(entry)
+        table_rows.extend(rows)
+        route_lengths.append(length)
 
-    for i, ezip in enumerate(end_zips):
-        if use_enhanced_routing and i < len(end_addresses) and i < len(end_cities):
-            # Use enhanced routing for precise end points
-            end_point = get_precise_point(points, ezip, end_addresses[i], end_cities[i])
-            zip_routes = get_precise_route_points(routes_gdf, ezip, end_addresses[i], end_cities[i])
-        else:
-            # Standard routing
-            end_point = points[points['postcode'] == ezip]
-            zip_routes = routes_gdf[routes_gdf['postcode'] == ezip]
-        if not zip_routes.empty:
-            formatted = zip_routes.loc[:, ['address', 'city', 'postcode', 'length']]
-            # Get the route length for this destination
-            route_length = formatted.iloc[0]['length'] if len(formatted) > 0 else 0
-            route_lengths.append(round(float(route_length), 2) if route_length else 0)
-            
-            for _, row in formatted.iterrows():
-                table_rows.append(
-                    f"<tr><td>{row['address']}</td><td>{row['city']}</td><td>{row['postcode']}</td><td>{row['length']}</td></tr>"
-                )
-            all_routes.append({
-                'end': end_point.to_json(),
-                'route': zip_routes.to_json()
-            })
-        else:
-            # Fallback for missing route
-            route_lengths.append(0)
-            table_rows.append(
-                f"<tr><td>N/A</td><td>N/A</td><td>{ezip}</td><td>0</td></tr>"
-            )
-            all_routes.append({
-                'end': end_point.to_json() if not end_point.empty else '{"type":"FeatureCollection","features":[]}',
-                'route': '{"type":"FeatureCollection","features":[]}'
-            })
-
-    # Generate enhanced table if using precise routing
-    if use_enhanced_routing and ENHANCED_ROUTING_AVAILABLE:
-        try:
-            # Create location data for table enhancement
-            end_location_data = []
-            for i, ezip in enumerate(end_zips):
-                location_data = {'postcode': ezip}
-                if i < len(end_addresses) and end_addresses[i]:
-                    location_data['address'] = end_addresses[i]
-                if i < len(end_cities) and end_cities[i]:
-                    location_data['city'] = end_cities[i]
-                end_location_data.append(location_data)
-            
-            table_html = enhance_table_output(None, end_location_data, route_lengths)
-        except Exception as e:
-            print(f"Error generating enhanced table: {e}")
-            # Fallback to standard table
-            table_html = (
-                "<table border='1' style='border-collapse: collapse; width: 100%; background: white;'>"
-                "<thead><tr><th>address</th><th>city</th><th>postcode</th><th>length</th></tr></thead>"
-                "<tbody>" + "".join(table_rows) + "</tbody></table>"
-            )
-    else:
-        table_html = (
-            "<table border='1' style='border-collapse: collapse; width: 100%; background: white;'>"
-            "<thead><tr><th>address</th><th>city</th><th>postcode</th><th>length</th></tr></thead>"
-            "<tbody>" + "".join(table_rows) + "</tbody></table>"
-        )
+    table_html = zip_r_table(end_zips, end_addresses, end_cities, table_rows, route_lengths, use_enhanced_routing)
 
-    return app.response_class(
-        response=json.dumps({
-            'start': start_point.to_json(),
-            'routes': all_routes,
-            'routes_html': table_html,
-            'is_multiple': len(end_zips) > 1
-        }),
-        status=200,
-        mimetype='application/json; charset=utf-8'
-    )
+    return route_response({
+        'start': start_point.to_json(),
+        'routes': all_routes,
+        'routes_html': table_html,
+        'is_multiple': len(end_zips) > 1
+    })
 
 
 @app.route('/get_zip_roundtrip', methods=['GET'])
@@ -236,20 +366,32 @@ def get_zip_roundtrip():
     
     # Get start point with address precision if available using precise routing function
     if use_enhanced_routing and start_address and start_city:
-        start_point = get_precise_point(points, start_zip, start_address, start_city)
+        start_point = get_precise_point(points, start_zip, start_address, start_city, index=points_index)
     else:
-        start_point = points[points['postcode'] == start_zip]
+        start_point = points_index.get(start_zip)
     
     if start_point.empty:
         return jsonify({'error': f'Start postcode {start_zip} not found'}), 404
     
+    # Optional: reorder the waypoints into a short tour instead of typed order
+    optimize = request.args.get('optimize', '').lower() in ('1', 'true', 'yes')
+    estimated_duration = None
+    if optimize and len(waypoints) > 1:
+        try:
+            waypoints, end_addresses, end_cities, estimated_duration = optimize_waypoint_order(
+                start_point, waypoints, end_addresses, end_cities, use_enhanced_routing
+            )
+            full_route = [start_zip] + waypoints + [start_zip]
+            print(f"DEBUG: Optimized waypoint order: {waypoints}")
+        except Exception as e:
+            print(f"DEBUG: Waypoint optimization failed, keeping typed order: {e}")
+            optimize = False
+    
     all_routes = []
     table_rows = []
+    legs = []
     total_distance = 0
-    
-    # Use enhanced routing if available and location data provided
-    use_enhanced_routing = (ENHANCED_ROUTING_AVAILABLE and 
-                           (start_address or start_city or end_addresses or end_cities))
+    level = simplify_level_arg()
     
     if use_enhanced_routing:
         print("DEBUG: Using enhanced precise routing for round trip")
@@ -266,43 +408,43 @@ def get_zip_roundtrip():
         if use_enhanced_routing:
             # For start point
             if i == 0:  # First segment uses start location data
-                from_point = get_precise_point(points, from_zip, start_address, start_city)
+                from_point = get_precise_point(points, from_zip, start_address, start_city, index=points_index)
             else:
                 # For intermediate points, try to use end location data from previous segment
                 prev_idx = i - 1
                 if prev_idx < len(end_addresses) and prev_idx < len(end_cities):
-                    from_point = get_precise_point(points, from_zip, end_addresses[prev_idx], end_cities[prev_idx])
+                    from_point = get_precise_point(points, from_zip, end_addresses[prev_idx], end_cities[prev_idx], index=points_index)
                 else:
-                    from_point = points[points['postcode'] == from_zip]
+                    from_point = points_index.get(from_zip)
             
             # For end point
             if i < len(end_addresses) and i < len(end_cities) and end_addresses[i] and end_cities[i]:
                 # Regular waypoint with specific address
-                to_point = get_precise_point(points, to_zip, end_addresses[i], end_cities[i])
+                to_point = get_precise_point(points, to_zip, end_addresses[i], end_cities[i], index=points_index)
                 selected_address = end_addresses[i]
                 selected_city = end_cities[i]
             elif to_zip == start_zip:
                 # Returning to start - use precise start point
-                to_point = get_precise_point(points, to_zip, start_address, start_city)
+                to_point = get_precise_point(points, to_zip, start_address, start_city, index=points_index)
                 selected_address = start_address
                 selected_city = start_city
             else:
                 # Fallback to any point for this zipcode
-                to_point = points[points['postcode'] == to_zip]
+                to_point = points_index.get(to_zip)
                 selected_address = to_point.iloc[0].get('address', 'N/A') if not to_point.empty else 'N/A'
                 selected_city = to_point.iloc[0].get('city', 'N/A') if not to_point.empty else 'N/A'
         else:
             # Standard routing
-            from_point = points[points['postcode'] == from_zip] 
+            from_point = points_index.get(from_zip) 
             
             # For standard routing, still check if returning to start
             if to_zip == start_zip and start_address and start_city:
                 # Returning to start - try to use precise start point even in standard mode
-                to_point = get_precise_point(points, to_zip, start_address, start_city)
+                to_point = get_precise_point(points, to_zip, start_address, start_city, index=points_index)
                 selected_address = start_address
                 selected_city = start_city
             else:
-                to_point = points[points['postcode'] == to_zip]
+                to_point = points_index.get(to_zip)
                 selected_address = to_point.iloc[0].get('address', 'N/A') if not to_point.empty else 'N/A'
                 selected_city = to_point.iloc[0].get('city', 'N/A') if not to_point.empty else 'N/A'
         
@@ -313,29 +455,15 @@ def get_zip_roundtrip():
             )
             continue
             
-        # Try to find existing route data with precision if available
-        available_routes = None
-        try:
-            if routes_gdf is not None and not routes_gdf.empty:
-                if use_enhanced_routing and i < len(end_addresses) and i < len(end_cities) and end_addresses[i] and end_cities[i]:
-                    # Use precise route matching
-                    available_routes = get_precise_route_points(routes_gdf, to_zip, end_addresses[i], end_cities[i])
-                    print(f"DEBUG: Found {len(available_routes) if not available_routes.empty else 0} precise routes for {to_zip} - {end_addresses[i]}")
-                else:
-                    # Standard route matching
-                    available_routes = routes_gdf[routes_gdf['postcode'] == to_zip]
-        except Exception as e:
-            print(f"DEBUG: Error in route matching: {e}")
-            pass
+        # Route this leg on the road network from the actual previous stop
+        leg = route_leg(from_point, to_point, level)
             
-        if available_routes is not None and not available_routes.empty:
-            # Use available route data
-            route_info = available_routes.iloc[0]
-            segment_length = getattr(route_info, 'length', 0)
+        if leg is not None:
+            segment_length = leg['length']
             
             all_routes.append({
                 'end': to_point.to_json(),
-                'route': available_routes.to_json(),
+                'route': leg['route'],
                 'segment': f"{from_zip} → {to_zip}"
             })
             
@@ -344,25 +472,17 @@ def get_zip_roundtrip():
                 f"<tr><td>{from_zip}</td><td>{to_zip}</td><td><strong>{selected_address}</strong></td><td>{selected_city}</td><td>{round(float(segment_length), 2) if segment_length else 0}</td></tr>"
             )
             total_distance += float(segment_length) if segment_length else 0
+            legs.append({'from': from_zip, 'to': to_zip, 'length': round(float(segment_length), 2) if segment_length else 0})
         else:
             # Create a mock route for visualization using straight line distance
-            import math
+            from geodesic import haversine
             from_coords = from_point.iloc[0].geometry
             to_coords = to_point.iloc[0].geometry
             
             # Calculate approximate distance (in meters)
             lat1, lon1 = from_coords.y, from_coords.x  
             lat2, lon2 = to_coords.y, to_coords.x
-            
-            # Simple distance calculation (not exact, but for demo purposes)
-            R = 6371000  # Earth's radius in meters
-            dlat = math.radians(lat2 - lat1)
-            dlon = math.radians(lon2 - lon1)
-            a = (math.sin(dlat/2)**2 + 
-                 math.cos(math.radians(lat1)) * math.cos(math.radians(lat2)) * 
-                 math.sin(dlon/2)**2)
-            c = 2 * math.atan2(math.sqrt(a), math.sqrt(1-a))
-            distance = R * c
+            distance = haversine(lon1, lat1, lon2, lat2)
             
             # Create mock route geometry (straight line)
             mock_route = {
@@ -392,6 +512,7 @@ def get_zip_roundtrip():
                 f"<tr><td>{from_zip}</td><td>{to_zip}</td><td><strong>{selected_address}</strong></td><td>{selected_city}</td><td>{round(distance, 2)}</td></tr>"
             )
             total_distance += distance
+            legs.append({'from': from_zip, 'to': to_zip, 'length': round(distance, 2)})
     
     # Add total distance row
     table_rows.append(
@@ -407,21 +528,230 @@ def get_zip_roundtrip():
         "</style>"
     )
 
-    return app.response_class(
-        response=json.dumps({
-            'start': start_point.to_json(),
-            'routes': all_routes,
-            'routes_html': table_html,
-            'is_multiple': True,
-            'is_roundtrip': True,
-            'total_distance': round(total_distance, 2),
-            'waypoint_sequence': ' → '.join(full_route)
-        }),
-        status=200,
-        mimetype='application/json; charset=utf-8'
+    return route_response({
+        'start': start_point.to_json(),
+        'routes': all_routes,
+        'routes_html': table_html,
+        'is_multiple': True,
+        'is_roundtrip': True,
+        'total_distance': round(total_distance, 2),
+        'waypoint_sequence': ' → '.join(full_route),
+        'waypoints': waypoints,
+        'legs': legs,
+        'optimized': optimize,
+        'estimated_duration': round(estimated_duration, 1) if estimated_duration is not None else None
+    })
+
+
+
+def route_leg(from_point, to_point, level=None):
+    """
+    Road route between two stops, cached per (from point, to point, strategy)
+
+    Args:
+        from_point: Start stop GeoDataFrame
+        to_point: End stop GeoDataFrame
+        level: Simplification level from simplify_level(), None for the full route
+
+    Returns:
+        dict with length and route (GeoJSON FeatureCollection string), or None
+        if no route could be computed
+    """
+    from_geom = from_point.iloc[0].geometry
+    to_geom = to_point.iloc[0].geometry
+    strategy = app.config['ROUTING_STRATEGY']
+    network = get_network_fingerprint()
+    leg_key = f"{network}:{strategy}:{from_geom.x:.6f},{from_geom.y:.6f}->{to_geom.x:.6f},{to_geom.y:.6f}"
+
+    level_key = level[0] if level is not None else None
+    if cached_leg := find_leg(legs, leg_key, level_key):
+        print(f"DEBUG: Found cached leg {leg_key}")
+        return simplified_leg(leg_key, cached_leg, level)
+
+    def compute():
+        leg_routes = calculate_routes(from_point.head(1), to_point.head(1))
+        if leg_routes is None or leg_routes.empty:
+            return {}
+
+        leg_routes = leg_routes.head(1)
+        length = float(leg_routes.iloc[0].get('length', 0) or 0)
+        leg = {'length': length, 'route': leg_routes.to_json()}
+        save_leg(legs, leg_key, {
+            'from_point': [from_geom.x, from_geom.y],
+            'to_point': [to_geom.x, to_geom.y],
+            'strategy': strategy,
+            'network': network,
+            **leg
+        })
+        return leg
+
+    # Concurrent round trips sharing this leg wait for one computation
+    leg = get_single_flight().do(leg_key, compute, lambda: find_leg(legs, leg_key, level_key))
+    return simplified_leg(leg_key, leg, level) if leg else None
+
+
+def simplified_leg(leg_key, leg, level):
+    """Length and route of a leg, the route simplified to `level` and cached with the leg"""
+    if level is None:
+        return {'length': leg['length'], 'route': leg['route']}
+    level_key, tolerance = level
+    route_json = (leg.get('simplified') or {}).get(level_key)
+    if route_json is None:
+        route_json = simplify_geojson(leg['route'], tolerance)
+        save_simplified_leg(legs, leg_key, level_key, route_json)
+    return {'length': leg['length'], 'route': route_json}
+
+
+def optimize_waypoint_order(start_point, waypoints, end_addresses, end_cities, use_enhanced_routing):
+    """
+    Reorder round trip waypoints using a travel-time matrix and a tour heuristic
+
+    Returns:
+        (waypoints, end_addresses, end_cities, estimated_duration) in visiting
+        order; address/city lists are padded to the number of waypoints
+    """
+    from geodesic import distance_matrix
+    from matrix import travel_matrix
+    from tour import solve_tour
+
+    end_addresses = list(end_addresses) + [''] * (len(waypoints) - len(end_addresses))
+    end_cities = list(end_cities) + [''] * (len(waypoints) - len(end_cities))
+
+    stops = [start_point]
+    for i, waypoint in enumerate(waypoints):
+        if use_enhanced_routing and end_addresses[i] and end_cities[i]:
+            stop = get_precise_point(points, waypoint, end_addresses[i], end_cities[i], index=points_index)
+        else:
+            stop = points_index.get(waypoint)
+        if stop.empty:
+            raise ValueError(f"Waypoint {waypoint} not found")
+        stops.append(stop)
+
+    xy = [(stop.iloc[0].geometry.x, stop.iloc[0].geometry.y) for stop in stops]
+    try:
+        _, durations = travel_matrix(get_routing_graph(), xy, xy, 'Fastest', get_matrix_cache())
+    except Exception as e:
+        # No road graph: order by straight-line travel time at the default speed
+        print(f"DEBUG: Road matrix unavailable, using straight-line distances: {e}")
+        lons, lats = zip(*xy)
+        durations = distance_matrix(lons, lats) / (app.config['ROUTING_DEFAULT_SPEED'] / 3.6)
+    order, total = solve_tour(durations, time_limit=app.config['TOUR_TIME_LIMIT'])
+
+    visit = [k - 1 for k in order[1:]]
+    return (
+        [waypoints[k] for k in visit],
+        [end_addresses[k] for k in visit],
+        [end_cities[k] for k in visit],
+        total
     )
 
 
+def iter_zip_routes(start_zip, start_point, end_zips, network, level=None):
+    """
+    Resolve the routes of a multi-destination /get_zip_route request
+
+    Cached routes come first, in one Mongo query; the remaining destinations
+    are then routed together in one run and cached in one bulk write;
+    concurrent requests for the same destinations share that run.
+
+    Args:
+        level: Simplification level from simplify_level(), None for full routes
+
+    Yields:
+        (end zip, route FeatureCollection JSON, route length) once per distinct end zip
+    """
+    # Every cached destination in one query
+    cached_routes = find_routes(route, [f"{network}:{start_zip}_to_{z}" for z in end_zips], level=level)
+    resolved = [z for z in dict.fromkeys(end_zips) if f"{network}:{start_zip}_to_{z}" in cached_routes]
+    cached_documents = simplify_documents(
+        route, [cached_routes[f"{network}:{start_zip}_to_{z}"] for z in resolved], level)
+    for end_zip_single, cached_route in zip(resolved, cached_documents):
+        print(f"DEBUG: Found cached route for {end_zip_single}")
+        yield end_zip_single, feature_collection([cached_route]), cached_route.get('length', 0)
+    
+    # One routing run from the start to every uncached destination:
+    # the model is point-to-layer, so all paths come from one search tree
+    missing_zips = [z for z in dict.fromkeys(end_zips) if z not in resolved]
+    if not missing_zips:
+        return
+    print(f"DEBUG: Calculating {len(missing_zips)} new routes")
+    route_keys = {z: f"{network}:{start_zip}_to_{z}" for z in missing_zips}
+
+    def compute():
+        end_points = points_index.get_many(missing_zips)
+        new_routes = calculate_routes_parallel(start_point, end_points) if not end_points.empty else None
+        documents = {}
+        for end_zip_single in missing_zips:
+            if new_routes is None:
+                continue
+            routes_gdf = new_routes[new_routes['postcode'] == end_zip_single]
+            if not routes_gdf.empty:
+                documents[end_zip_single] = route_document(
+                    routes_gdf, route_key=route_keys[end_zip_single], network=network)
+        # Cache the new routes in one bulk write
+        save_routes(route, list(documents.values()))
+        return documents
+
+    def lookup():
+        found = find_routes(route, route_keys.values(), level=level)
+        if len(found) < len(route_keys):
+            return None
+        return {z: found[key] for z, key in route_keys.items()}
+
+    # Identical concurrent requests wait for this computation
+    flight_key = f"{network}:{start_zip}_to_{','.join(sorted(missing_zips))}"
+    new_documents = get_single_flight().do(flight_key, compute, lookup)
+    routed = list(new_documents)
+    new_documents = dict(zip(routed, simplify_documents(route, [new_documents[z] for z in routed], level)))
+
+    for end_zip_single in missing_zips:
+        document = new_documents.get(end_zip_single)
+        if document is None:
+            print(f"DEBUG: No route found for {end_zip_single}")
+            yield end_zip_single, EMPTY_FEATURE_COLLECTION, 0
+            continue
+        yield end_zip_single, feature_collection([document]), document.get('length', 0)
+
+
+def zip_route_entry(start_zip, end_zip, route_json, route_length):
+    """Route entry (end and route GeoJSON) and table info of one /get_zip_route destination"""
+    end_point = points_index.get(end_zip)
+    entry = {'end': end_point.to_json(), 'route': route_json}
+    
+    # Get correct route info from the end point (not from route geometry)
+    if not end_point.empty:
+        end_point_info = end_point.iloc[0]
+        info = {
+            'start_zip': start_zip,
+            'end_zip': end_zip,
+            'address': end_point_info.get('address', 'N/A'),
+            'city': end_point_info.get('city', 'N/A'),
+            'postcode': end_zip,
+            'length': round(float(route_length), 2) if route_length else 0
+        }
+    else:
+        info = {
+            'start_zip': start_zip,
+            'end_zip': end_zip,
+            'address': 'N/A',
+            'city': 'N/A',
+            'postcode': end_zip,
+            'length': 0
+        }
+    return entry, info
+
+
+def zip_route_table(all_routes_info):
+    """HTML table for multiple routes"""
+    table_html = "<table border='1' style='border-collapse: collapse; width: 100%; background: white;'>"
+    table_html += "<thead><tr><th>From</th><th>To</th><th>Address</th><th>City</th><th>Postcode</th><th>Length (m)</th></tr></thead><tbody>"
+    
+    for info in all_routes_info:
+        table_html += f"<tr><td>{info['start_zip']}</td><td>{info['end_zip']}</td><td>{info['address']}</td><td>{info['city']}</td><td>{info['postcode']}</td><td>{info['length']}</td></tr>"
+    
+    table_html += "</tbody></table>"
+    return table_html
+
 
 @app.route('/get_zip_route', methods=['GET'])
 def get_zip_route():
@@ -436,160 +766,96 @@ def get_zip_route():
         
         print(f"DEBUG: Parsed end_zips: {end_zips}")
         
+        network = get_network_fingerprint()
+        level = simplify_level_arg()
+        response_key = f"{network}:zip_route:{start_zip}:{','.join(end_zips)}:{response_variant()}"
+        stream = len(end_zips) > 1 and request.args.get('stream') in ('1', 'true')
+        if not stream and (payload := get_response_cache().get(response_key)) is not None:
+            print("DEBUG: Serving response from memory cache")
+            return json_response(payload)
+        
         if len(end_zips) == 1:
             # Single destination logic
-            cache_key = f"{start_zip}_to_{end_zips[0]}"
+            cache_key = f"{network}:{start_zip}_to_{end_zips[0]}"
             print(f"DEBUG: Single route, checking cache for: {cache_key}")
             
-            if cached_route := route.find_one({"route_key": cache_key}):
+            if cached_route := find_routes(route, [cache_key], level=level).get(cache_key):
                 print("DEBUG: Found cached route")
-                cached_route['geometry'] = wkt.loads(cached_route['geometry'])
-                cached_route['_id'] = str(cached_route["_id"])
-                routes_gdf = gpd.GeoDataFrame([cached_route], geometry='geometry')
-                routes_gdf.set_crs("EPSG:4326", inplace=True)
-                
-                start_point = points[points['postcode'] == start_zip]
-                end_point = points[points['postcode'] == end_zips[0]]
+                start_point = points_index.get(start_zip)
+                end_point = points_index.get(end_zips[0])
                 
-                return app.response_class(
-                    response=json.dumps({
-                        'start': start_point.to_json(),
-                        'end': end_point.to_json(),
-                        'routes': routes_gdf.to_json()
-                    }),
-                    status=200,
-                    mimetype='application/json; charset=utf-8'
-                )
+                return route_response({
+                    'start': start_point.to_json(),
+                    'end': end_point.to_json(),
+                    'routes': feature_collection(simplify_documents(route, [cached_route], level))
+                }, response_key)
             
             print("DEBUG: No cached route, calculating new single route")
             # Calculate new single route
-            route_id = uuid.uuid1()
-            start_point = points[points['postcode'] == start_zip]
-            end_point = points[points['postcode'] == end_zips[0]]
-            
-            start_point_path = DATA_DIR / "zip_start" / f"start_{route_id}.gpkg"
-            end_point_path = DATA_DIR / "zip_end" / f"end_{route_id}.gpkg"
-            route_path = DATA_DIR / "routes" / f"final_output_{route_id}.gpkg"
-
-            start_point.to_file(start_point_path, driver='GPKG')
-            end_point.to_file(end_point_path, driver='GPKG')
-
-            run_routes(str(start_point_path), str(end_point_path), str(route_path))
-            routes_gdf = gpd.read_file(route_path)
-            
-            # Cache the result
-            if 'route_key' not in routes_gdf.columns:
-                routes_gdf['route_key'] = None
-            routes_gdf.at[routes_gdf.index[-1], 'route_key'] = cache_key
-            row = routes_gdf.iloc[-1].to_dict()
-            row['geometry'] = row['geometry'].wkt
-            route.insert_one(row)
-            
-            return app.response_class(
-                response=json.dumps({
-                    'start': start_point.to_json(),
-                    'end': end_point.to_json(),
-                    'routes': routes_gdf.to_json()
-                }),
-                status=200,
-                mimetype='application/json; charset=utf-8'
-            )
+            start_point = points_index.get(start_zip)
+            end_point = points_index.get(end_zips[0])
+
+            def compute():
+                routes_gdf = calculate_routes(start_point, end_point)
+                if routes_gdf is None or routes_gdf.empty:
+                    raise RuntimeError(f"No route found from {start_zip} to {end_zips[0]}")
+                # Cache the result
+                document = route_document(routes_gdf, route_key=cache_key, network=network)
+                save_routes(route, [document])
+                return document
+
+            # Identical concurrent requests wait for this computation
+            document = get_single_flight().do(cache_key, compute, lambda: find_routes(route, [cache_key], level=level).get(cache_key))
+
+            return route_response({
+                'start': start_point.to_json(),
+                'end': end_point.to_json(),
+                'routes': feature_collection(simplify_documents(route, [document], level))
+            }, response_key)
         
         else:
             print(f"DEBUG: Multiple routes for {len(end_zips)} destinations")
             # Multiple destinations logic
-            start_point = points[points['postcode'] == start_zip]
+            start_point = points_index.get(start_zip)
+            destinations = iter_zip_routes(start_zip, start_point, end_zips, network, level)
+            
+            if stream:
+                def records():
+                    yield {'type': 'start', 'start': start_point.to_json(), 'count': len(end_zips), 'is_multiple': True}
+                    all_routes_info = [None] * len(end_zips)
+                    try:
+                        for end_zip_single, route_json, route_length in destinations:
+                            for i, z in enumerate(end_zips):
+                                if z != end_zip_single:
+                                    continue
+                                entry, all_routes_info[i] = zip_route_entry(start_zip, end_zip_single, route_json, route_length)
+                                yield {'type': 'route', 'index': i, **entry}
+                    except Exception as e:
+                        # The status line is already sent: report the failure in the stream
+                        traceback.print_exc()
+                        yield {'type': 'error', 'error': str(e)}
+                        return
+                    yield {'type': 'summary', 'routes_html': zip_route_table(all_routes_info), 'is_multiple': True}
+                return ndjson_response(records(), compact_precision())
+            
+            # end zip -> (route FeatureCollection JSON, route length)
+            resolved_routes = {z: (route_json, length) for z, route_json, length in destinations}
             all_routes_data = []
             all_routes_info = []
-            
             for end_zip_single in end_zips:
-                print(f"DEBUG: Processing route to {end_zip_single}")
-                cache_key = f"{start_zip}_to_{end_zip_single}"
-                
-                # Check cache for each route
-                if cached_route := route.find_one({"route_key": cache_key}):
-                    print(f"DEBUG: Found cached route for {end_zip_single}")
-                    cached_route['geometry'] = wkt.loads(cached_route['geometry'])
-                    cached_route['_id'] = str(cached_route["_id"])
-                    routes_gdf = gpd.GeoDataFrame([cached_route], geometry='geometry')
-                    routes_gdf.set_crs("EPSG:4326", inplace=True)
-                else:
-                    print(f"DEBUG: Calculating new route for {end_zip_single}")
-                    # Calculate new route
-                    route_id = uuid.uuid1()
-                    end_point = points[points['postcode'] == end_zip_single]
-                    
-                    start_point_path = DATA_DIR / "zip_start" / f"start_{route_id}.gpkg"
-                    end_point_path = DATA_DIR / "zip_end" / f"end_{route_id}.gpkg"
-                    route_path = DATA_DIR / "routes" / f"final_output_{route_id}.gpkg"
-
-                    start_point.to_file(start_point_path, driver='GPKG')
-                    end_point.to_file(end_point_path, driver='GPKG')
-
-                    run_routes(str(start_point_path), str(end_point_path), str(route_path))
-                    routes_gdf = gpd.read_file(route_path)
-                    
-                    # Cache the route
-                    if 'route_key' not in routes_gdf.columns:
-                        routes_gdf['route_key'] = None
-                    routes_gdf.at[routes_gdf.index[-1], 'route_key'] = cache_key
-                    row = routes_gdf.iloc[-1].to_dict()
-                    row['geometry'] = row['geometry'].wkt
-                    route.insert_one(row)
-                
-                end_point = points[points['postcode'] == end_zip_single]
-                
-                # Store route data
-                all_routes_data.append({
-                    'end': end_point.to_json(),
-                    'route': routes_gdf.to_json()
-                })
-                
-                # Get correct route info from the end point (not from route geometry)
-                if not end_point.empty:
-                    end_point_info = end_point.iloc[0]
-                    route_length = routes_gdf.iloc[-1].get('length', 0) if len(routes_gdf) > 0 else 0
-                    
-                    all_routes_info.append({
-                        'start_zip': start_zip,
-                        'end_zip': end_zip_single,
-                        'address': end_point_info.get('address', 'N/A'),
-                        'city': end_point_info.get('city', 'N/A'),
-                        'postcode': end_zip_single,
-                        'length': round(float(route_length), 2) if route_length else 0
-                    })
-                else:
-                    all_routes_info.append({
-                        'start_zip': start_zip,
-                        'end_zip': end_zip_single,
-                        'address': 'N/A',
-                        'city': 'N/A',
-                        'postcode': end_zip_single,
-                        'length': 0
-                    })
+                entry, info = zip_route_entry(start_zip, end_zip_single, *resolved_routes[end_zip_single])
+                all_routes_data.append(entry)
+                all_routes_info.append(info)
             
             print(f"DEBUG: Generated {len(all_routes_info)} routes")
             
-            # Create HTML table for multiple routes
-            table_html = "<table border='1' style='border-collapse: collapse; width: 100%; background: white;'>"
-            table_html += "<thead><tr><th>From</th><th>To</th><th>Address</th><th>City</th><th>Postcode</th><th>Length (m)</th></tr></thead><tbody>"
-            
-            for info in all_routes_info:
-                table_html += f"<tr><td>{info['start_zip']}</td><td>{info['end_zip']}</td><td>{info['address']}</td><td>{info['city']}</td><td>{info['postcode']}</td><td>{info['length']}</td></tr>"
-            
-            table_html += "</tbody></table>"
-            
             print("DEBUG: Returning multiple routes response")
-            return app.response_class(
-                response=json.dumps({
-                    'start': start_point.to_json(),
-                    'routes': all_routes_data,
-                    'routes_html': table_html,
-                    'is_multiple': True
-                }),
-                status=200,
-                mimetype='application/json; charset=utf-8'
-            )
+            return route_response({
+                'start': start_point.to_json(),
+                'routes': all_routes_data,
+                'routes_html': zip_route_table(all_routes_info),
+                'is_multiple': True
+            }, response_key)
             
     except Exception as e:
         print(f"ERROR in get_zip_route: {str(e)}")
@@ -603,60 +869,70 @@ def get_zip_route():
 
 
 
+# Fields identifying a cached route of the point-to-point endpoints
+POINT_ROUTE_KEYS = ('start_point', 'end_point', 'network')
+
+
+def point_route(start_p, end_p, start_point, end_point, network):
+    """
+    Compute and cache the route between two request points, once for concurrent identical requests
+
+    Args:
+        start_p: Start point GeoSeries/GeoDataFrame
+        end_p: End point GeoSeries/GeoDataFrame
+        start_point: Start point as given in the request (cache key)
+        end_point: End point as given in the request (cache key)
+        network: Network fingerprint
+
+    Returns:
+        The cached route document, or None if no route was found
+    """
+    def compute():
+        routes_gdf = calculate_routes(start_p, end_p)
+        if routes_gdf is None or routes_gdf.empty:
+            return None
+        document = route_document(routes_gdf, start_point=start_point, end_point=end_point, network=network)
+        save_routes(route, [document], key_fields=POINT_ROUTE_KEYS)
+        return document
+
+    flight_key = f"{network}:{start_point}|{end_point}"
+    return get_single_flight().do(flight_key, compute, lambda: find_route(route, start_point, end_point, network))
+
+
 @app.route('/get_addr_zip_route', methods=['GET'])
 def get_addr_zip_route():
     start_point = request.args.get('startPoint')
     end_point = request.args.get('endPoint')
 
+    network = get_network_fingerprint()
+    level = simplify_level_arg()
+    response_key = f"{network}:get_addr_zip_route:{start_point}|{end_point}:{response_variant()}"
+    if (payload := get_response_cache().get(response_key)) is not None:
+        return json_response(payload)
+
     start_coords = parse_coords(start_point)
     start_p = gpd.GeoSeries([Point(float(start_coords[1]), float(start_coords[0]))], crs="EPSG:4326")
 
-    end_p = points[points['postcode'] == end_point]
+    end_p = points_index.get(end_point)
     
     
-    if interest_route := route.find_one({"start_point" : start_point, "end_point": end_point}):     
-        interest_route['geometry'] = wkt.loads(interest_route['geometry']) 
-        interest_route['_id'] = str(interest_route["_id"]) 
-        gdf = gpd.GeoDataFrame([interest_route], geometry='geometry')
-        gdf.set_crs("EPSG:4326", inplace=True)
-                
-        return {
+    if interest_route := find_route(route, start_point, end_point, network):
+        return json_response(json.dumps({
             'start' : start_p.to_json(),
             'end' : end_p.to_json(),
-            'route': gdf.to_json()
-        }
-    route_id = uuid.uuid1()
-
-    start_point_path = DATA_DIR / "zip_start" / f"start_{route_id}.gpkg"
-    end_point_path = DATA_DIR / "zip_end" / f"end_{route_id}.gpkg"
-    route_path = DATA_DIR / "routes" / f"final_output_{route_id}.gpkg"
-
-    start_p.to_file(start_point_path, driver='GPKG')
-    end_p.to_file(end_point_path, driver='GPKG')
-
-    run_routes(str(start_point_path), str(end_point_path), str(route_path))
-
-    routes_gdf = gpd.read_file(route_path)
-    if 'start_point' not in routes_gdf.columns:
-        routes_gdf['start_point'] = None
-    if 'end_point' not in routes_gdf.columns:
-        routes_gdf['end_point'] = None
-
+            'route': feature_collection(simplify_documents(route, [interest_route], level, POINT_ROUTE_KEYS))
+        }), response_key)
+    document = point_route(start_p, end_p, start_point, end_point, network)
+    if document is None:
+        return {'error': 'No route found'}, 500
 
 
-    routes_gdf.at[routes_gdf.index[-1], 'start_point'] = start_point
-    routes_gdf.at[routes_gdf.index[-1], 'end_point'] = end_point
-    row = routes_gdf.iloc[-1].to_dict()
-    row['geometry'] = row['geometry'].wkt
-    route.insert_one(row)
 
-
-
-    return {
+    return json_response(json.dumps({
         'start' : start_p.to_json(),
         'end' : end_p.to_json(),
-        'route': routes_gdf.to_json()
-    }
+        'route': feature_collection(simplify_documents(route, [document], level, POINT_ROUTE_KEYS))
+    }), response_key)
     
     
     
@@ -667,6 +943,12 @@ def get_address_route():
     start_point = request.args.get('startPoint') 
     end_point = request.args.get('endPoint')
 
+    network = get_network_fingerprint()
+    level = simplify_level_arg()
+    response_key = f"{network}:get_address_route:{start_point}|{end_point}:{response_variant()}"
+    if (payload := get_response_cache().get(response_key)) is not None:
+        return json_response(payload)
+
 
     start_coords = parse_coords(start_point)
     end_coords = parse_coords(end_point)
@@ -674,52 +956,25 @@ def get_address_route():
     start_p = gpd.GeoSeries([Point(float(start_coords[1]), float(start_coords[0]))], crs="EPSG:4326")
     end_p = gpd.GeoSeries([Point(float(end_coords[1]), float(end_coords[0]))], crs="EPSG:4326")
 
-    if interest_route := route.find_one({"start_point" : start_point, "end_point": end_point}):     
-        interest_route['geometry'] = wkt.loads(interest_route['geometry']) 
-        interest_route['_id'] = str(interest_route["_id"]) 
-        gdf = gpd.GeoDataFrame([interest_route], geometry='geometry')
-        gdf.set_crs("EPSG:4326", inplace=True)
-                
-        return {
+    if interest_route := find_route(route, start_point, end_point, network):
+        return json_response(json.dumps({
             'start' : start_p.to_json(),
             'end' : end_p.to_json(),
-            'route': gdf.to_json()
-        }
-
-
-    route_id = uuid.uuid1()
-
-    start_point_path = DATA_DIR / "zip_start" / f"start_{route_id}.gpkg"
-    end_point_path = DATA_DIR / "zip_end" / f"end_{route_id}.gpkg"
-    route_path = DATA_DIR / "routes" / f"final_output_{route_id}.gpkg"
-
+            'route': feature_collection(simplify_documents(route, [interest_route], level, POINT_ROUTE_KEYS))
+        }), response_key)
 
-    start_p.to_file(start_point_path, driver='GPKG')
-    end_p.to_file(end_point_path, driver='GPKG')
 
-    run_routes(str(start_point_path), str(end_point_path), str(route_path))
+    document = point_route(start_p, end_p, start_point, end_point, network)
+    if document is None:
+        return {'error': 'No route found'}, 500
 
 
 
-    routes_gdf = gpd.read_file(route_path)
-    if 'start_point' not in routes_gdf.columns:
-        routes_gdf['start_point'] = None
-    if 'end_point' not in routes_gdf.columns:
-        routes_gdf['end_point'] = None
-
-    routes_gdf.at[routes_gdf.index[-1], 'start_point'] = start_point
-    routes_gdf.at[routes_gdf.index[-1], 'end_point'] = end_point
-    row = routes_gdf.iloc[-1].to_dict()
-    row['geometry'] = row['geometry'].wkt
-    route.insert_one(row)
-
-
-
-    return {
+    return json_response(json.dumps({
         'start' : start_p.to_json(),
         'end' : end_p.to_json(),
-        'route': routes_gdf.to_json()
-    }
+        'route': feature_collection(simplify_documents(route, [document], level, POINT_ROUTE_KEYS))
+    }), response_key)
     
 
 @app.route('/get_zip_addr_route', methods=['GET'])
@@ -727,59 +982,612 @@ def get_zip_addr_route():
     start_point = request.args.get('startPoint')
     end_point = request.args.get('endPoint')
 
+    network = get_network_fingerprint()
+    level = simplify_level_arg()
+    response_key = f"{network}:get_zip_addr_route:{start_point}|{end_point}:{response_variant()}"
+    if (payload := get_response_cache().get(response_key)) is not None:
+        return json_response(payload)
+
     end_coords = parse_coords(end_point)
     end_p = gpd.GeoSeries([Point(float(end_coords[1]), float(end_coords[0]))], crs="EPSG:4326")
 
-    start_p = points[points['postcode'] == start_point]
+    start_p = points_index.get(start_point)
     
-    if interest_route := route.find_one({"start_point" : start_point, "end_point": end_point}):     
-        interest_route['geometry'] = wkt.loads(interest_route['geometry']) 
-        interest_route['_id'] = str(interest_route["_id"]) 
-        gdf = gpd.GeoDataFrame([interest_route], geometry='geometry')
-        gdf.set_crs("EPSG:4326", inplace=True)
-                
-        return {
+    if interest_route := find_route(route, start_point, end_point, network):
+        return json_response(json.dumps({
             'start' : start_p.to_json(),
             'end' : end_p.to_json(),
-            'route': gdf.to_json()
-        }
-    route_id = uuid.uuid1()
+            'route': feature_collection(simplify_documents(route, [interest_route], level, POINT_ROUTE_KEYS))
+        }), response_key)
+    document = point_route(start_p, end_p, start_point, end_point, network)
+    if document is None:
+        return {'error': 'No route found'}, 500
+
+
+
+    return json_response(json.dumps({
+        'start' : start_p.to_json(),
+        'end' : end_p.to_json(),
+        'route': feature_collection(simplify_documents(route, [document], level, POINT_ROUTE_KEYS))
+    }), response_key)
+    
+    
+
+
+
+
+_network_fingerprint = None
+
+
+def get_network_fingerprint():
+    """Namespace of cached routes: the network file plus what the routing backend does with it"""
+    global _network_fingerprint
+    if _network_fingerprint is None:
+        from network_fingerprint import file_digest, network_fingerprint
+        if app.config['ROUTING_BACKEND'] == 'native':
+            params = ('native', app.config['ROUTING_STRATEGY'], app.config['ROUTING_DEFAULT_SPEED'],
+                      app.config['ROUTING_TOLERANCE'])
+        else:
+            # The QGIS backends take their parameters from the model scripts
+            params = ('qgis', file_digest(BASE_DIR / 'processing' / 'run_routing.py'),
+                      file_digest(BASE_DIR / 'processing' / 'shortest_path.py'))
+        _network_fingerprint = network_fingerprint(app.config['NETWORK_FILE'], *params)
+        print(f"✅ Route cache namespace {_network_fingerprint}")
+    return _network_fingerprint
+
+
+@app.cli.command('purge-route-cache')
+def purge_route_cache():
+    """Delete cached routes and legs that were computed on another network or model"""
+    deleted = purge_stale(route, legs, get_network_fingerprint())
+    print(f"✅ Purged {deleted['routes']} routes and {deleted['legs']} legs not in {get_network_fingerprint()}")
+
+
+_response_cache = None
+
+
+def get_response_cache():
+    global _response_cache
+    if _response_cache is None:
+        _response_cache = ResponseCache(
+            app.config['RESPONSE_CACHE_SIZE'],
+            app.config['RESPONSE_CACHE_MAX_BYTES'],
+            app.config['RESPONSE_CACHE_TTL']
+        )
+    return _response_cache
+
+
+_single_flight = None
+_single_flight_lock = threading.Lock()
+
+
+def get_single_flight():
+    """Coalesces identical in-flight route computations in this worker and, via leases, across workers"""
+    global _single_flight
+    if _single_flight is None:
+        with _single_flight_lock:
+            if _single_flight is None:
+                flight = SingleFlight(leases, lease_ttl=app.config['ROUTE_LEASE_TTL'])
+                flight.ensure_indexes()
+                _single_flight = flight
+    return _single_flight
+
+
+def json_response(payload, cache_key=None):
+    """200 response for a serialized JSON payload, kept in the response cache under cache_key"""
+    if cache_key is not None:
+        get_response_cache().put(cache_key, payload)
+    return app.response_class(response=payload, status=200, mimetype='application/json; charset=utf-8')
+
+
+def compact_precision():
+    """Coordinate decimals asked for with ?format=compact[&precision=N], None for GeoJSON responses"""
+    if request.args.get('format') != 'compact':
+        return None
+    try:
+        precision = int(request.args.get('precision', app.config['COMPACT_PRECISION']))
+    except ValueError:
+        precision = app.config['COMPACT_PRECISION']
+    return min(max(precision, 0), 7)
+
+
+def simplify_level_arg():
+    """Simplification level asked for with ?zoom=N or ?tolerance=<meters>, None for full routes"""
+    try:
+        zoom = request.args.get('zoom')
+        tolerance = request.args.get('tolerance')
+        return simplify_level(int(zoom) if zoom else None, float(tolerance) if tolerance else None)
+    except ValueError:
+        return None
+
+
+def response_variant():
+    """Part of a response cache key for the requested format and simplification level"""
+    level = simplify_level_arg()
+    return f"{compact_precision()}:{level[0] if level else 'full'}"
+
+
+def route_response(payload, cache_key=None):
+    """json_response for a route response dict, in the compact format if the client asked for it"""
+    precision = compact_precision()
+    if precision is not None:
+        payload = compact_payload(payload, precision)
+    return json_response(json.dumps(payload), cache_key)
+
+
+TILE_LAYERS = ('network', 'points', 'routes')
+_tile_layers = {}
+_tile_layers_lock = threading.Lock()
+
+
+def get_tile_layer(name):
+    """Indexed network or points layer for tile cutting, built on first use"""
+    layer = _tile_layers.get(name)
+    if layer is None:
+        with _tile_layers_lock:
+            layer = _tile_layers.get(name)
+            if layer is None:
+                from vector_tiles import TileLayer
+                if name == 'network':
+                    layer = TileLayer.from_frame('network', gpd.read_file(app.config['NETWORK_FILE']))
+                else:
+                    layer = TileLayer.from_frame('points', points, ['postcode', 'address', 'city'])
+                print(f"✅ Indexed {len(layer.properties)} features for {name} tiles")
+                _tile_layers[name] = layer
+    return layer
+
+
+def tile_version(layer):
+    """Part of a cached tile's name that changes with the data behind the layer"""
+    from network_fingerprint import file_digest
+    if layer == 'network':
+        return file_digest(app.config['NETWORK_FILE'])[:12]
+    if layer == 'points':
+        return file_digest(points_file)[:12]
+    return get_network_fingerprint()
+
+
+def route_tile_features(z, x, y):
+    """Cached routes of the current network crossing tile z/x/y, in tile units"""
+    from shapely.geometry import shape
+    from vector_tiles import tile_features, tile_lonlat_bounds, to_mercator
+
+    query = {'network': get_network_fingerprint()}
+    if z >= 2:
+        # Tiles of zoom 0-1 span a hemisphere or more, which $geoIntersects does not handle
+        west, south, east, north = tile_lonlat_bounds(z, x, y)
+        query['geometry'] = {'$geoIntersects': {'$geometry': {
+            'type': 'Polygon',
+            'coordinates': [[[west, south], [east, south], [east, north], [west, north], [west, south]]]
+        }}}
+    geometries = []
+    properties = []
+    for document in route.find(query, {'_id': 0, 'simplified': 0, 'network': 0}):
+        geometry = document.pop('geometry', None)
+        if not isinstance(geometry, dict):
+            continue
+        geometries.append(shape(geometry))
+        properties.append({k: v for k, v in document.items() if isinstance(v, (str, int, float, bool))})
+    if not geometries:
+        return []
+    geometries = shapely.transform(np.asarray(geometries, dtype=object), to_mercator)
+    return tile_features(geometries, properties, z, x, y)
+
+
+def tile_bytes(layer, z, x, y, refresh=False):
+    """
+    Encoded tile from the on-disk tile cache, cut and stored on a miss
+
+    Network and points tiles are named after their data, so they stay valid
+    until the files change; route tiles are rebuilt after TILE_ROUTES_TTL
+    seconds to pick up newly cached routes.
+    """
+    from vector_tiles import encode_tile
+
+    path = DATA_DIR / "tiles" / f"{layer}-{tile_version(layer)}-{z}-{x}-{y}.mvt"
+    if not refresh and path.exists():
+        if layer != 'routes' or time.time() - path.stat().st_mtime < app.config['TILE_ROUTES_TTL']:
+            touch(path)
+            return path.read_bytes()
+
+    if layer == 'routes':
+        features = route_tile_features(z, x, y)
+    else:
+        features = get_tile_layer(layer).features(z, x, y)
+    data = encode_tile([(layer, features)])
+
+    tmp = temporary_path(path)
+    try:
+        with open(tmp, 'wb') as f:
+            f.write(data)
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+    return data
+
+
+@app.route('/tiles/<layer>/<int:z>/<int:x>/<int:y>.mvt', methods=['GET'])
+def vector_tile(layer, z, x, y):
+    """Mapbox Vector Tile of the road network, the postcode points or the cached routes"""
+    if layer not in TILE_LAYERS:
+        return jsonify({'error': f"Unknown layer {layer}, expected one of {', '.join(TILE_LAYERS)}"}), 404
+    if not (0 <= z <= app.config['TILE_MAX_ZOOM'] and 0 <= x < 2 ** z and 0 <= y < 2 ** z):
+        return jsonify({'error': 'Tile out of range'}), 400
+    if layer == 'points' and points is None:
+        return jsonify({'error': 'Zipcode data not loaded'}), 503
+
+    try:
+        data = tile_bytes(layer, z, x, y)
+    except Exception as e:
+        print(f"❌ Could not build tile {layer}/{z}/{x}/{y}: {e}")
+        return jsonify({'error': str(e)}), 500
+
+    response = Response(data, mimetype='application/vnd.mapbox-vector-tile')
+    max_age = app.config['TILE_ROUTES_TTL'] if layer == 'routes' else 24 * 3600
+    response.headers['Cache-Control'] = f"public, max-age={max_age}"
+    return response
+
+
+@app.cli.command('seed-tiles')
+@click.option('--max-zoom', type=int, default=None, help='Highest zoom to precompute (default TILE_SEED_MAX_ZOOM)')
+@click.option('--layer', 'layers', multiple=True, type=click.Choice(['network', 'points']), help='Layers to seed (default both)')
+def seed_tiles(max_zoom, layers):
+    """Precompute the low-zoom network and points tiles covering the data into the tile cache"""
+    from vector_tiles import tiles_covering
+
+    max_zoom = app.config['TILE_SEED_MAX_ZOOM'] if max_zoom is None else max_zoom
+    for layer in layers or ('network', 'points'):
+        if layer == 'points' and points is None:
+            continue
+        bounds = get_tile_layer(layer).bounds
+        count = 0
+        for z in range(max_zoom + 1):
+            xs, ys = tiles_covering(bounds, z)
+            for x in xs:
+                for y in ys:
+                    tile_bytes(layer, z, x, y, refresh=True)
+                    count += 1
+        print(f"✅ Seeded {count} {layer} tiles up to zoom {max_zoom}")
+
+
+@app.route('/response_cache/stats', methods=['GET'])
+def response_cache_stats():
+    """Hit/miss/eviction counters of this worker's response cache, and coalesced route computations"""
+    return jsonify({**get_response_cache().stats(), 'single_flight': get_single_flight().stats()})
+
+
+_matrix_cache = None
+
+
+def get_matrix_cache():
+    global _matrix_cache
+    if _matrix_cache is None:
+        from matrix import MatrixCache
+        _matrix_cache = MatrixCache(app.config['MATRIX_CACHE_SIZE'])
+    return _matrix_cache
+
+
+LATLNG_PATTERN = re.compile(r'^LatLng\(\s*([^,\s()]+)\s*,\s*([^,\s()]+)\s*\)$')
+
+
+def resolve_location(location):
+    """
+    (lon, lat) of a postcode, a [lon, lat] pair or a Leaflet 'LatLng(lat, lng)' string
+
+    Returns:
+        (lon, lat), or None for an unknown postcode
+
+    Raises:
+        ValueError: for malformed pairs and LatLng strings
+    """
+    if isinstance(location, (list, tuple)):
+        if len(location) != 2:
+            raise ValueError(f"Expected a [lon, lat] pair, got {location!r}")
+        return float(location[0]), float(location[1])
+    location = str(location).strip()
+    if location.startswith('LatLng'):
+        coords = LATLNG_PATTERN.match(location)
+        if coords is None:
+            raise ValueError(f"Malformed LatLng {location!r}")
+        return float(coords.group(2)), float(coords.group(1))
+    match = points_index.get(location)
+    if match.empty:
+        return None
+    geom = match.iloc[0].geometry
+    return geom.x, geom.y
+
+
+def resolve_locations(locations):
+    """
+    resolve_location() of every location
+
+    Raises:
+        ValueError: naming the first malformed location
+    """
+    resolved = []
+    for location in locations:
+        try:
+            resolved.append(resolve_location(location))
+        except (ValueError, IndexError, TypeError):
+            raise ValueError(f"Malformed location: {location!r}")
+    return resolved
+
+
+@app.route('/matrix', methods=['GET', 'POST'])
+def matrix():
+    """
+    Travel distance (m) and duration (s) between every source and target
+
+    POST JSON: {"sources": [...], "targets": [...], "strategy": "Fastest"}
+    GET: ?sources=400001;LatLng(46.77, 23.6)&targets=400003&strategy=Shortest
+    Each location is a postcode, a [lon, lat] pair or a 'LatLng(lat, lng)' string.
+    """
+    from matrix import travel_matrix
+    from network_graph import parse_strategy
+
+    if request.is_json:
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict):
+            return jsonify({'error': 'Request body must be a JSON object'}), 400
+        sources = data.get('sources', [])
+        targets = data.get('targets', sources)
+        strategy = data.get('strategy', app.config['ROUTING_STRATEGY'])
+        if not isinstance(sources, list) or not isinstance(targets, list):
+            return jsonify({'error': 'sources and targets must be lists'}), 400
+    else:
+        sources = [s.strip() for s in request.args.get('sources', '').split(';') if s.strip()]
+        targets = [t.strip() for t in request.args.get('targets', '').split(';') if t.strip()] or sources
+        strategy = request.args.get('strategy', app.config['ROUTING_STRATEGY'])
+
+    if not sources or not targets:
+        return jsonify({'error': 'sources and targets are required'}), 400
+    try:
+        strategy = parse_strategy(strategy)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    try:
+        source_xy = resolve_locations(sources)
+        target_xy = resolve_locations(targets)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    unknown = [loc for loc, xy in zip(list(sources) + list(targets), source_xy + target_xy) if xy is None]
+    if unknown:
+        return jsonify({'error': f'Unknown locations: {unknown}'}), 404
+
+    try:
+        distances, durations = travel_matrix(get_routing_graph(), source_xy, target_xy, strategy, get_matrix_cache())
+    except Exception as e:
+        traceback.print_exc()
+        return jsonify({'error': str(e)}), 500
 
-    start_point_path = DATA_DIR / "zip_start" / f"start_{route_id}.gpkg"
-    end_point_path = DATA_DIR / "zip_end" / f"end_{route_id}.gpkg"
-    route_path = DATA_DIR / "routes" / f"final_output_{route_id}.gpkg"
+    def to_list(values):
+        # NaN (unreachable) is not valid JSON
+        return [[None if v != v else round(float(v), 2) for v in row] for row in values]
 
+    return jsonify({
+        'sources': sources,
+        'targets': targets,
+        'distances': to_list(distances),
+        'durations': to_list(durations),
+        'cache': get_matrix_cache().stats()
+    })
 
-    start_p.to_file(start_point_path, driver='GPKG')
-    end_p.to_file(end_point_path, driver='GPKG')
 
-    run_routes(str(start_point_path), str(end_point_path), str(route_path))
+@app.route('/snap', methods=['GET', 'POST'])
+def snap_points():
+    """
+    Snap locations onto the nearest road network segment, or graph node
 
-    routes_gdf = gpd.read_file(route_path)
-    if 'start_point' not in routes_gdf.columns:
-        routes_gdf['start_point'] = None
-    if 'end_point' not in routes_gdf.columns:
-        routes_gdf['end_point'] = None
+    POST JSON: {"points": [...], "to": "segment"}
+    GET: ?points=400001;LatLng(46.77, 23.6)&to=node
+    Each location is a postcode, a [lon, lat] pair or a 'LatLng(lat, lng)' string.
+    Returns the snapped point and the distance to it in metres, with the
+    segment and offset along it, or with the node id for to=node.
+    """
+    if request.is_json:
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict):
+            return jsonify({'error': 'Request body must be a JSON object'}), 400
+        locations = data.get('points', [])
+        target = data.get('to', 'segment')
+        if not isinstance(locations, list):
+            return jsonify({'error': 'points must be a list'}), 400
+    else:
+        locations = [p.strip() for p in request.args.get('points', '').split(';') if p.strip()]
+        target = request.args.get('to', 'segment')
+    if not locations:
+        return jsonify({'error': 'points are required'}), 400
+    if target not in ('segment', 'node'):
+        return jsonify({'error': "to must be 'segment' or 'node'"}), 400
+
+    try:
+        lonlats = resolve_locations(locations)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    unknown = [location for location, lonlat in zip(locations, lonlats) if lonlat is None]
+    if unknown:
+        return jsonify({'error': f'Unknown locations: {unknown}'}), 404
 
+    try:
+        graph = get_routing_graph()
+        if target == 'node':
+            nodes, distances = graph.nearest_nodes(*graph.from_lonlat(*zip(*lonlats)))
+            lons, lats = graph.to_lonlat(graph.node_xy[nodes, 0], graph.node_xy[nodes, 1])
+        else:
+            snaps = graph.snap_lonlat_many([xy[0] for xy in lonlats], [xy[1] for xy in lonlats])
+            lons, lats = graph.to_lonlat([s['point'][0] for s in snaps], [s['point'][1] for s in snaps])
+    except Exception as e:
+        traceback.print_exc()
+        return jsonify({'error': str(e)}), 500
+
+    if target == 'node':
+        return jsonify({'snapped': [
+            {
+                'location': location,
+                'point': [round(lon, 7), round(lat, 7)],
+                'distance': round(float(distance), 2),
+                'node': int(node)
+            }
+            for location, node, distance, lon, lat in zip(locations, nodes, distances, lons, lats)
+        ]})
+    return jsonify({'snapped': [
+        {
+            'location': location,
+            'point': [round(lon, 7), round(lat, 7)],
+            'distance': round(snap['distance'], 2),
+            'segment': snap['segment'],
+            'offset': round(snap['offset'], 2)
+        }
+        for location, snap, lon, lat in zip(locations, snaps, lons, lats)
+    ]})
 
 
-    routes_gdf.at[routes_gdf.index[-1], 'start_point'] = start_point
-    routes_gdf.at[routes_gdf.index[-1], 'end_point'] = end_point
-    row = routes_gdf.iloc[-1].to_dict()
-    row['geometry'] = row['geometry'].wkt
-    route.insert_one(row)
+def route_batch_chunk(job, end_zips, on_progress):
+    """
+    Route one chunk of a batch job into the Mongo route cache
 
+    Returns:
+        End zips of the chunk without a route
+    """
+    network = job['network']
+    keys = {z: f"{network}:{job['start_zip']}_to_{z}" for z in end_zips}
+    cached = find_routes(route, keys.values(), {'route_key': 1})
+    missing = [z for z in end_zips if keys[z] not in cached]
+    if not missing:
+        return []
+
+    start_point = points_index.get(job['start_zip'])
+    if start_point.empty:
+        raise ValueError(f"Start zip {job['start_zip']} not found")
+    end_points = points_index.get_many(missing)
+    new_routes = None
+    if not end_points.empty:
+        if app.config['ROUTING_BACKEND'] == 'native':
+            new_routes = calculate_routes(start_point, end_points, on_progress)
+        else:
+            # Same executor as interactive requests, so ROUTING_MAX_CONCURRENCY caps both
+            new_routes = get_routing_executor().submit(calculate_routes, start_point, end_points, on_progress).result()
+
+    failed = []
+    documents = []
+    for end_zip in missing:
+        routes_gdf = new_routes[new_routes['postcode'] == end_zip] if new_routes is not None else None
+        if routes_gdf is None or routes_gdf.empty:
+            failed.append(end_zip)
+            continue
+        documents.append(route_document(routes_gdf, route_key=keys[end_zip], network=network))
+    save_routes(route, documents)
+    return failed
+
+
+_batch_runner = None
+_batch_runner_lock = threading.Lock()
+
+
+def get_batch_runner():
+    """Start the batch job threads on first use and pick up unfinished jobs"""
+    global _batch_runner
+    if _batch_runner is None:
+        with _batch_runner_lock:
+            if _batch_runner is None:
+                runner = BatchJobRunner(
+                    jobs,
+                    route_batch_chunk,
+                    max_workers=app.config['BATCH_WORKERS'],
+                    chunk_size=app.config['BATCH_CHUNK_SIZE'],
+                    stale_after=app.config['BATCH_JOB_STALE_AFTER']
+                )
+                runner.ensure_indexes()
+                resumed = runner.resume()
+                if resumed:
+                    print(f"✅ Resumed {resumed} batch jobs")
+                atexit.register(runner.shutdown)
+                _batch_runner = runner
+    return _batch_runner
 
 
+def job_status(job):
     return {
-        'start' : start_p.to_json(),
-        'end' : end_p.to_json(),
-        'route': routes_gdf.to_json()
+        'job_id': job['_id'],
+        'status': job['status'],
+        'progress': job['progress'],
+        'completed': job['completed'],
+        'total': job['total'],
+        'failed_zips': job['failed_zips'],
+        'error': job['error'],
+        'created_at': job['created_at'].isoformat(),
+        'updated_at': job['updated_at'].isoformat(),
     }
-    
-    
 
 
+@app.route('/jobs', methods=['POST'])
+def submit_job():
+    """
+    Queue a batch of routes from one zip code to many
+
+    POST JSON: {"startZip": "400001", "endZips": ["400002", ...]}
+    Returns 202 with the job id; poll GET /jobs/<job_id> and fetch
+    GET /jobs/<job_id>/results once the status is 'done'.
+    """
+    data = request.get_json(silent=True) or {}
+    start_zip = str(data.get('startZip', '')).strip()
+    end_zips = data.get('endZips', [])
+    if isinstance(end_zips, str):
+        end_zips = end_zips.split(',')
+    end_zips = [str(z).strip() for z in end_zips if str(z).strip()]
+
+    if not start_zip or not end_zips:
+        return jsonify({'error': 'startZip and endZips are required'}), 400
+    if len(end_zips) > app.config['BATCH_MAX_DESTINATIONS']:
+        return jsonify({'error': f"At most {app.config['BATCH_MAX_DESTINATIONS']} destinations per job"}), 400
+    if start_zip not in points_index:
+        return jsonify({'error': f'Unknown start zip {start_zip}'}), 404
+
+    job_id = get_batch_runner().submit(start_zip, end_zips, get_network_fingerprint())
+    return jsonify({
+        'job_id': job_id,
+        'status_url': url_for('get_job', job_id=job_id),
+        'results_url': url_for('get_job_results', job_id=job_id)
+    }), 202
+
+
+@app.route('/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    job = get_batch_runner().get(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify(job_status(job))
+
+
+@app.route('/jobs/<job_id>/results', methods=['GET'])
+def get_job_results(job_id):
+    """Routes of a finished job as a GeoJSON FeatureCollection, paginated with ?offset=&limit="""
+    job = get_batch_runner().get(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    if job['status'] != DONE:
+        return jsonify(job_status(job)), 409
+
+    try:
+        offset = max(int(request.args.get('offset', 0)), 0)
+        limit = min(max(int(request.args.get('limit', 100)), 1), 500)
+    except ValueError:
+        return jsonify({'error': 'offset and limit must be integers'}), 400
+
+    end_zips = list(dict.fromkeys(job['end_zips']))[offset:offset + limit]
+    keys = [f"{job['network']}:{job['start_zip']}_to_{z}" for z in end_zips]
+    cached = find_routes(route, keys)
+    routes = feature_collection([cached[k] for k in keys if k in cached])
+    return json_response(json.dumps({
+        'job_id': job['_id'],
+        'offset': offset,
+        'limit': limit,
+        'total': job['total'],
+        'failed_zips': job['failed_zips'],
+        'routes': routes
+    }))
 
 
 def parse_coords(point):
@@ -814,16 +1622,12 @@ def get_route():
     start_id = request.args.get('startId')
     end_id = request.args.get('endId')
     
-    start_path = retrieve_data(start_id, 'start')
-    end_path = retrieve_data(end_id, 'end')
-    
-    logging.debug(start_path, end_path)
+    start_gdf = retrieve_data(start_id)
+    end_gdf = retrieve_data(end_id)
     
-    # Use run_routes instead of process_routes
-    output_path = BASE_DIR / "FinalShortestPath_output.gpkg"
-    run_routes(start_path, end_path, str(output_path))
-
-    routes_gdf = gpd.read_file(output_path)
+    routes_gdf = calculate_routes(start_gdf, end_gdf)
+    if routes_gdf is None:
+        return {'error': 'Routing failed'}, 500
     return routes_gdf.to_json()
         
         
@@ -835,15 +1639,13 @@ def get_route():
 
 
 
-def retrieve_data(id, location):
+def retrieve_data(id):
     db_collection = geoms.find({"id" : Int64(id)})
     collection = json.loads(json_util.dumps(db_collection))
 
     gdf = gpd.GeoDataFrame.from_features(collection[0]['features'])
     gdf.set_crs("EPSG:4326", inplace=True)
-    path = ROUTING_DATA_DIR / f"{location}_{id}.gpkg"
-    gdf.to_file(path, driver="GPKG")
-    return str(path)
+    return gdf
     
     
 
@@ -872,7 +1674,236 @@ def retrieve_data(id, location):
 
 #### GOOD ROUTES FUNCTIONS ####
 
+_routing_pool = None
+_routing_pool_lock = threading.Lock()
+
+
+def get_routing_pool():
+    """Start the persistent QGIS worker pool on first use"""
+    global _routing_pool
+    if _routing_pool is None:
+        with _routing_pool_lock:
+            if _routing_pool is None:
+                from routing_pool import RoutingWorkerPool
+                pool = RoutingWorkerPool(
+                    size=app.config['ROUTING_POOL_SIZE'],
+                    network_file=app.config['NETWORK_FILE'],
+                    job_timeout=app.config['ROUTING_JOB_TIMEOUT']
+                )
+                _routing_pool = pool.start()
+                atexit.register(pool.shutdown)
+    return _routing_pool
+
+
+@app.route('/routing_pool/health', methods=['GET'])
+def routing_pool_health():
+    if app.config['ROUTING_BACKEND'] != 'pool':
+        return {"backend": app.config['ROUTING_BACKEND'], "workers": []}
+    pool = get_routing_pool()
+    return {"backend": "pool", "workers": pool.health_check(), **pool.stats()}
+
+
+_routing_graph = None
+_routing_graph_lock = threading.Lock()
+
+
+def get_routing_graph():
+    """Load the road network into the native routing engine on first use"""
+    global _routing_graph
+    if _routing_graph is None:
+        with _routing_graph_lock:
+            if _routing_graph is None:
+                from network_graph import RoutingGraph
+                graph = RoutingGraph.from_file(
+                    app.config['NETWORK_FILE'],
+                    default_speed=app.config['ROUTING_DEFAULT_SPEED'],
+                    tolerance=app.config['ROUTING_TOLERANCE']
+                )
+                print(f"✅ Loaded routing graph: {graph.node_count} nodes, {graph.edge_count} edges")
+                if points_index is not None:
+                    # Every postcode point snapped once, so routing from/to them skips the spatial query
+                    snapped = graph.precompute_snaps(*points_index.coordinates())
+                    print(f"✅ Precomputed network snaps of {snapped} postcode points")
+                _routing_graph = graph
+    return _routing_graph
+
+
+_hierarchies = {}
+
+
+def get_hierarchy(strategy):
+    """Contraction hierarchy built by processing/contraction.py, None if not available"""
+    if strategy not in _hierarchies:
+        from contraction import ContractionHierarchy, hierarchy_path
+        path = hierarchy_path(app.config['NETWORK_FILE'], strategy)
+        hierarchy = None
+        if os.path.exists(path):
+            try:
+                hierarchy = ContractionHierarchy.load(get_routing_graph(), path)
+                print(f"✅ Loaded contraction hierarchy {path}")
+            except Exception as e:
+                print(f"❌ Ignoring contraction hierarchy {path}: {e}")
+        _hierarchies[strategy] = hierarchy
+    return _hierarchies[strategy]
+
+
+def native_routes(start_point, end_points):
+    """Same table as the QGIS model, computed in memory by the native graph engine"""
+    from network_graph import routes_to_gdf
+
+    start_gdf = start_point.to_crs(epsg=4326)
+    end_gdf = end_points.to_crs(epsg=4326)
+
+    # The model routes from the mean coordinate of the start layer
+    start_xy = (start_gdf.geometry.x.mean(), start_gdf.geometry.y.mean())
+    end_xys = list(zip(end_gdf.geometry.x, end_gdf.geometry.y))
+
+    strategy = app.config['ROUTING_STRATEGY']
+    hierarchy = get_hierarchy(strategy) if len(end_xys) == 1 else None
+    if hierarchy is not None:
+        results = hierarchy.route_many(start_xy, end_xys)
+    else:
+        # One-to-many: a single search tree grown until every destination is settled
+        results = get_routing_graph().route_many(start_xy, end_xys, strategy)
+    return routes_to_gdf(start_xy, results, end_gdf)
+
+
+def point_records(frame):
+    """(lon, lat, attributes) of every point, the in-memory layer format of the routing workers"""
+    frame = frame.to_crs(epsg=4326)
+    fields = [f for f in ('postcode', 'city', 'address') if f in frame.columns]
+    return [
+        (geom.x, geom.y, {f: None if pd.isna(row[f]) else row[f] for f in fields})
+        for geom, (_, row) in zip(frame.geometry, frame.iterrows())
+    ]
+
+
+def pool_routes(start_point, end_points, on_progress=None):
+    """Route on a pooled QGIS worker through in-memory layers"""
+    features = get_routing_pool().submit_features(
+        point_records(start_point), point_records(end_points), on_progress=on_progress)
+    if features is None:
+        return None
+    columns = ['start', 'end', 'postcode', 'city', 'address', 'length']
+    return gpd.GeoDataFrame(
+        [{c: attributes.get(c) for c in columns} for _, attributes in features],
+        columns=columns,
+        geometry=[shapely.wkb.loads(geometry) for geometry, _ in features],
+        crs='EPSG:4326'
+    )
+
+
+def calculate_routes(start_point, end_points, on_progress=None):
+    """
+    Route from the start point to every feature of end_points in one run
+
+    The native and pool backends work on in-memory features; only the
+    subprocess backend goes through GPKG files.
+
+    Args:
+        start_point: GeoDataFrame or GeoSeries with the start point
+        end_points: GeoDataFrame or GeoSeries with the end points
+        on_progress: Optional callable receiving the model progress (0-100);
+            only the pool backend reports progress within a run
+
+    Returns:
+        GeoDataFrame with one route per reachable end point, or None on failure
+    """
+    if isinstance(start_point, gpd.GeoSeries):
+        start_point = gpd.GeoDataFrame(geometry=start_point)
+    if isinstance(end_points, gpd.GeoSeries):
+        end_points = gpd.GeoDataFrame(geometry=end_points)
+
+    if app.config['ROUTING_BACKEND'] == 'native':
+        try:
+            return native_routes(start_point, end_points)
+        except Exception as e:
+            logging.error(f"Error occurred while running native routing: {e}")
+            return None
+
+    if app.config['ROUTING_BACKEND'] == 'pool':
+        try:
+            return pool_routes(start_point, end_points, on_progress)
+        except Exception as e:
+            logging.error(f"Error occurred while running routing pool: {e}")
+            return None
+
+    # Files are named after their content: identical requests share them and
+    # a route already computed for the same inputs and network is reused
+    start_key = content_key(start_point)
+    end_key = content_key(end_points)
+    start_point_path = DATA_DIR / "zip_start" / f"start_{start_key}.gpkg"
+    end_point_path = DATA_DIR / "zip_end" / f"end_{end_key}.gpkg"
+    route_path = DATA_DIR / "routes" / f"final_output_{content_key(start_key, end_key, get_network_fingerprint())}.gpkg"
+
+    if route_path.exists():
+        touch(route_path)
+        return gpd.read_file(route_path)
+
+    store_frame(start_point, start_point_path)
+    store_frame(end_points, end_point_path)
+
+    output_path = temporary_path(route_path)
+    try:
+        if run_routes(str(start_point_path), str(end_point_path), output_path) is None:
+            return None
+        os.replace(output_path, route_path)
+    finally:
+        if os.path.exists(output_path):
+            os.remove(output_path)
+    return gpd.read_file(route_path)
+
+
+_routing_executor = None
+_routing_executor_lock = threading.Lock()
+
+
+def get_routing_executor():
+    """Threads dispatching routing runs; its size is the global cap on concurrent runs"""
+    global _routing_executor
+    if _routing_executor is None:
+        with _routing_executor_lock:
+            if _routing_executor is None:
+                from concurrent.futures import ThreadPoolExecutor
+                _routing_executor = ThreadPoolExecutor(
+                    max_workers=app.config['ROUTING_MAX_CONCURRENCY'],
+                    thread_name_prefix='routing'
+                )
+                atexit.register(_routing_executor.shutdown, wait=False)
+    return _routing_executor
+
+
+def calculate_routes_parallel(start_point, end_points):
+    """
+    calculate_routes split over up to ROUTING_REQUEST_PARALLELISM concurrent runs
+
+    The QGIS backends run in separate processes, so the end points are split
+    into contiguous parts routed at the same time; all requests share one
+    executor of ROUTING_MAX_CONCURRENCY threads, so a single large request
+    cannot take every worker. The native backend already grows one search
+    tree for all end points and is called directly.
+
+    Returns:
+        GeoDataFrame with the routes in end_points order, or None if every part failed
+    """
+    parts = min(app.config['ROUTING_REQUEST_PARALLELISM'], len(end_points))
+    if app.config['ROUTING_BACKEND'] == 'native' or parts < 2:
+        return calculate_routes(start_point, end_points)
+
+    bounds = [round(i * len(end_points) / parts) for i in range(parts + 1)]
+    futures = [
+        get_routing_executor().submit(calculate_routes, start_point, end_points.iloc[a:b])
+        for a, b in zip(bounds, bounds[1:])
+    ]
+    results = [f.result() for f in futures]
+    routes = [r for r in results if r is not None and not r.empty]
+    if not routes:
+        return None if all(r is None for r in results) else results[0]
+    return gpd.GeoDataFrame(pd.concat(routes, ignore_index=True), crs=routes[0].crs)
+
+
 def run_routes(start, end, output):
+    """Run the QGIS model in a fresh process on GPKG start/end layers"""
     try:
         result = subprocess.run(
             ['python', str(BASE_DIR / 'processing' / 'run_routing.py'), start, end, output],
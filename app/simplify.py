@@ -0,0 +1,62 @@
+"""
+Route Geometry Simplification
+Topology-preserving simplification of route lines for the zoom level they are
+displayed at, so zoomed-out maps do not receive (and re-tile) every vertex of
+the road network
+"""
+
+import json
+
+from shapely.geometry import mapping, shape
+
+
+MAX_ZOOM = 22
+METERS_PER_DEGREE = 111320.0
+
+
+def zoom_tolerance(zoom):
+    """Half a pixel of a 256 px web map tile at `zoom`, in degrees"""
+    return 180.0 / (256 * 2 ** zoom)
+
+
+def simplify_level(zoom=None, tolerance=None):
+    """
+    Cache key and tolerance of a simplification level
+
+    Args:
+        zoom: Web map zoom level (clamped to 0..MAX_ZOOM)
+        tolerance: Maximum deviation in meters (rounded to whole meters), used
+            when no zoom is given
+
+    Returns:
+        (level key, tolerance in degrees), or None for full geometries
+    """
+    if zoom is not None:
+        zoom = min(max(int(zoom), 0), MAX_ZOOM)
+        return f"z{zoom}", zoom_tolerance(zoom)
+    if tolerance is not None and tolerance >= 0.5:
+        meters = int(round(tolerance))
+        return f"m{meters}", meters / METERS_PER_DEGREE
+    return None
+
+
+def simplify_geometry(geometry, tolerance):
+    """Simplified copy of a GeoJSON line geometry; other geometries are returned as they are"""
+    if not geometry or geometry.get('type') not in ('LineString', 'MultiLineString'):
+        return geometry
+    return mapping(shape(geometry).simplify(tolerance, preserve_topology=True))
+
+
+def simplify_geojson(value, tolerance):
+    """
+    Simplify the lines of a GeoJSON FeatureCollection (string or dict)
+
+    Returns:
+        FeatureCollection string
+    """
+    collection = json.loads(value) if isinstance(value, str) else dict(value)
+    collection['features'] = [
+        {**feature, 'geometry': simplify_geometry(feature.get('geometry'), tolerance)}
+        for feature in collection.get('features', [])
+    ]
+    return json.dumps(collection)
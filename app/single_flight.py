@@ -0,0 +1,146 @@
+"""
+Single-Flight Route Computation
+Concurrent requests for the same route cache key share one computation:
+threads of a process wait on the first caller, and processes coordinate
+through a lease document in the `leases` collection, waiting for the lease
+holder to fill the route cache instead of routing the same pair again
+"""
+
+import os
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from pymongo import ASCENDING, ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+
+class _Call:
+    __slots__ = ('done', 'result', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Run one computation per key at a time, across threads and app processes
+
+    Args:
+        leases: MongoDB collection holding one lease document per key being computed
+        lease_ttl: Seconds after which an unreleased lease (crashed holder) is taken over
+        poll_interval: Seconds between cache checks while another process holds the lease
+    """
+
+    def __init__(self, leases, lease_ttl=300, poll_interval=0.25):
+        self.leases = leases
+        self.lease_ttl = lease_ttl
+        self.poll_interval = poll_interval
+        self.owner = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.coalesced = 0
+
+    def ensure_indexes(self):
+        try:
+            # Expired leases are removed by MongoDB itself
+            self.leases.create_index([('expires_at', ASCENDING)], name='expires_at', expireAfterSeconds=0)
+        except Exception as e:
+            print(f"❌ Could not create lease index: {e}")
+
+    def do(self, key, compute, lookup):
+        """
+        Result for `key`, computed at most once by concurrent callers
+
+        Args:
+            key: Route cache key
+            compute: Callable computing the result and storing it in the shared cache
+            lookup: Callable returning the result from the shared cache, or None
+
+        Returns:
+            The result of compute() or lookup()
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = self._do_leased(key, compute, lookup)
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def _do_leased(self, key, compute, lookup):
+        while True:
+            if self._acquire(key):
+                try:
+                    # The previous holder may have finished since our cache miss
+                    result = lookup()
+                    return result if result is not None else compute()
+                finally:
+                    self._release(key)
+
+            # Another process is computing this key: wait for its result
+            self.coalesced += 1
+            while self._held(key):
+                time.sleep(self.poll_interval)
+                result = lookup()
+                if result is not None:
+                    return result
+            result = lookup()
+            if result is not None:
+                return result
+
+    def _acquire(self, key):
+        now = datetime.now(timezone.utc)
+        expires = now + timedelta(seconds=self.lease_ttl)
+        try:
+            self.leases.insert_one({'_id': key, 'owner': self.owner, 'expires_at': expires})
+            return True
+        except DuplicateKeyError:
+            pass
+        # Take over a lease its holder never released
+        taken = self.leases.find_one_and_update(
+            {'_id': key, 'expires_at': {'$lt': now}},
+            {'$set': {'owner': self.owner, 'expires_at': expires}},
+            return_document=ReturnDocument.AFTER
+        )
+        return taken is not None
+
+    def _held(self, key):
+        lease = self.leases.find_one({'_id': key}, {'expires_at': 1})
+        if lease is None:
+            return False
+        expires = lease['expires_at']
+        if expires.tzinfo is None:
+            expires = expires.replace(tzinfo=timezone.utc)
+        return expires > datetime.now(timezone.utc)
+
+    def _release(self, key):
+        try:
+            self.leases.delete_one({'_id': key, 'owner': self.owner})
+        except Exception as e:
+            print(f"❌ Could not release lease {key}: {e}")
+
+    def stats(self):
+        with self._lock:
+            in_flight = len(self._calls)
+        return {'in_flight': in_flight, 'coalesced': self.coalesced}
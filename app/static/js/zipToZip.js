@@ -57,6 +57,13 @@ const ZipToZipRouting = {
             queryParams.set('endCities', endCities);
         }
 
+        // Polyline-encoded geometries, expanded back to GeoJSON on arrival
+        queryParams.set('format', 'compact');
+        // Routes simplified for two zoom levels closer than the current view
+        if (typeof appLeaflet !== 'undefined' && appLeaflet.map) {
+            queryParams.set('zoom', Math.min(appLeaflet.map.getZoom() + 2, appLeaflet.map.getMaxZoom()));
+        }
+
         // Determine API endpoint based on routing mode
         let url;
         if (routingMode === 'roundtrip' || routingMode === 'round trip') {
@@ -64,18 +71,26 @@ const ZipToZipRouting = {
             url = `/get_zip_roundtrip?${queryParams.toString()}`;
         } else {
             queryParams.set('endZip', endZips);
+            // Multiple destinations are streamed and drawn as they arrive
+            queryParams.set('stream', '1');
             url = `/get_zip_r?${queryParams.toString()}`;
         }
 
         console.log(`Executing ${routingMode} routing: ${startZip} -> ${endZips}`);
         console.log('API URL:', url);
 
+        if (queryParams.has('stream')) {
+            ZipToZipRouting.streamRoutes(url, onSuccess, onError);
+            return;
+        }
+
         // Make AJAX request
         $.ajax({
             url: url,
             type: 'GET',
             dataType: 'json',
             success: function(responseData) {
+                responseData = ZipToZipRouting.expandCompact(responseData);
                 console.log("Routing response received:", responseData);
                 
                 if (responseData.error) {
@@ -96,21 +111,229 @@ const ZipToZipRouting = {
         });
     },
 
+    /**
+     * Fetch a newline-delimited JSON route stream and draw each route as it arrives
+     * Records: {type: 'start'}, {type: 'route', index}, ..., {type: 'summary'},
+     * or {type: 'error', error} if routing fails after the stream started
+     * @param {string} url - Streaming endpoint URL
+     * @param {Function} onSuccess - Success callback
+     * @param {Function} onError - Error callback
+     */
+    streamRoutes: function(url, onSuccess, onError) {
+        const colors = ZipToZipRouting.multipleRouteColors;
+        const responseData = { is_multiple: true, routes: [] };
+        let routeLayerGroup = null;
+        let finished = false;
+
+        const handleRecord = (record) => {
+            record = ZipToZipRouting.expandCompact(record);
+            if (record.type === 'start') {
+                // Remove previous route tables
+                document.querySelectorAll('.table-container').forEach(table => table.remove());
+                responseData.start = record.start;
+                routeLayerGroup = L.layerGroup([ZipToZipRouting.createStartLayer(record.start)]);
+                routeLayerGroup.addTo(appLeaflet.map);
+            } else if (record.type === 'route') {
+                responseData.routes[record.index] = { end: record.end, route: record.route };
+                ZipToZipRouting.createDestinationLayers(record, record.index, colors[record.index % colors.length], false)
+                    .forEach(layer => routeLayerGroup.addLayer(layer));
+            } else if (record.type === 'summary') {
+                responseData.routes_html = record.routes_html;
+                responseData.is_multiple = record.is_multiple;
+                appLeaflet.map.removeLayer(routeLayerGroup);
+                const layerName = record.is_multiple ? "Multiple Routes" : "Routes";
+                finished = true;
+                ZipToZipRouting.registerRouteLayer(routeLayerGroup, responseData, layerName, onSuccess);
+            } else if (record.type === 'error' || record.error) {
+                throw new Error(record.error);
+            }
+        };
+
+        fetch(url)
+            .then(response => {
+                if (!response.ok) {
+                    return response.text().then(text => {
+                        throw new Error(`Failed to fetch the route. Server returned: ${response.status} - ${text}`);
+                    });
+                }
+                const reader = response.body.getReader();
+                const decoder = new TextDecoder();
+                let buffer = '';
+
+                const pump = () => reader.read().then(({ done, value }) => {
+                    buffer += decoder.decode(value || new Uint8Array(), { stream: !done });
+                    const lines = buffer.split('\n');
+                    buffer = done ? '' : lines.pop();
+                    lines.filter(line => line.trim()).forEach(line => handleRecord(JSON.parse(line)));
+                    if (done && !finished) {
+                        throw new Error("The route stream ended before all routes were sent");
+                    }
+                    return done ? null : pump();
+                });
+                return pump();
+            })
+            .catch(error => {
+                console.error("Streaming route error:", error);
+                if (routeLayerGroup && appLeaflet.map.hasLayer(routeLayerGroup)) {
+                    appLeaflet.map.removeLayer(routeLayerGroup);
+                }
+                if (onError) onError(error.message);
+                else alert(error.message);
+            });
+    },
+
+    /**
+     * Decode an encoded polyline into [lon, lat] pairs
+     * Arithmetic instead of bit operators keeps precision 7 within range
+     * @param {string} encoded - Encoded polyline (lat/lon order)
+     * @param {number} precision - Decimals the coordinates were quantized to
+     */
+    decodePolyline: function(encoded, precision) {
+        const factor = Math.pow(10, precision);
+        const coords = [];
+        let index = 0;
+        let lat = 0;
+        let lon = 0;
+        while (index < encoded.length) {
+            const deltas = [0, 0];
+            for (let k = 0; k < 2; k++) {
+                let result = 0;
+                let scale = 1;
+                let chunk;
+                do {
+                    chunk = encoded.charCodeAt(index++) - 63;
+                    result += (chunk % 32) * scale;
+                    scale *= 32;
+                } while (chunk >= 32);
+                deltas[k] = result % 2 ? -(result + 1) / 2 : result / 2;
+            }
+            lat += deltas[0];
+            lon += deltas[1];
+            coords.push([lon / factor, lat / factor]);
+        }
+        return coords;
+    },
+
+    /**
+     * GeoJSON FeatureCollection string of a compact geometry ({points, lines, length})
+     * @param {Object} compact - Compact member of a ?format=compact response
+     * @param {number} precision - Coordinate precision of the response
+     */
+    compactToGeoJSON: function(compact, precision) {
+        const features = [];
+        if (compact.points) {
+            ZipToZipRouting.decodePolyline(compact.points, precision).forEach(coordinates => {
+                features.push({ type: 'Feature', properties: {}, geometry: { type: 'Point', coordinates: coordinates } });
+            });
+        }
+        (compact.lines || []).forEach(line => {
+            features.push({
+                type: 'Feature',
+                properties: { length: compact.length },
+                geometry: { type: 'LineString', coordinates: ZipToZipRouting.decodePolyline(line, precision) }
+            });
+        });
+        return JSON.stringify({ type: 'FeatureCollection', features: features });
+    },
+
+    /**
+     * Turn a ?format=compact response or stream record back into the GeoJSON string layout
+     * @param {Object} data - Response or record; returned unchanged if it is not compact
+     */
+    expandCompact: function(data) {
+        if (!data || data.format !== 'compact') return data;
+        const expand = (item) => {
+            ['start', 'end', 'route'].forEach(key => {
+                if (item[key] && typeof item[key] === 'object') {
+                    item[key] = ZipToZipRouting.compactToGeoJSON(item[key], data.precision);
+                }
+            });
+        };
+        expand(data);
+        if (Array.isArray(data.routes)) {
+            data.routes.forEach(expand);
+        } else if (data.routes && typeof data.routes === 'object') {
+            data.routes = ZipToZipRouting.compactToGeoJSON(data.routes, data.precision);
+        }
+        return data;
+    },
+
+    // Different colors for multiple destinations
+    multipleRouteColors: ['#ff7800', '#0078ff', '#00ff78', '#ff0078', '#7800ff', '#78ff00'],
+
+    // Sequential colors for roundtrip
+    roundTripColors: ['#ff4444', '#ff8800', '#ffbb00', '#88ff00', '#00ff88', '#0088ff', '#4400ff'],
+
+    markerOptions: {
+        radius: 8,
+        fillColor: "#ff7800",
+        color: "#000",
+        weight: 1,
+        opacity: 1,
+        fillOpacity: 0.8
+    },
+
+    /**
+     * Start point marker layer
+     * @param {string} startJson - Start point GeoJSON string
+     */
+    createStartLayer: function(startJson) {
+        return L.geoJSON(JSON.parse(startJson), {
+            pointToLayer: function (feature, latlng) {
+                return L.circleMarker(latlng, ZipToZipRouting.markerOptions);
+            }
+        });
+    },
+
+    /**
+     * End point marker and route line layers of one destination
+     * @param {Object} routeData - Object with 'end' and 'route' GeoJSON strings
+     * @param {number} index - Destination index
+     * @param {string} color - Color of this destination
+     * @param {boolean} isRoundtrip - Draw as a round trip segment
+     */
+    createDestinationLayers: function(routeData, index, color, isRoundtrip) {
+        console.log(`Processing route ${index + 1}:`, routeData.segment || `Route ${index + 1}`);
+        const layers = [];
+        
+        try {
+            const endGeoJSON = JSON.parse(routeData['end']);
+            const routeGeoJSON = JSON.parse(routeData['route']);
+            
+            // Add end point
+            if (endGeoJSON.features && endGeoJSON.features.length > 0) {
+                const endPoint = L.geoJSON(endGeoJSON, {
+                    pointToLayer: function (feature, latlng) {
+                        return L.circleMarker(latlng, {...ZipToZipRouting.markerOptions, fillColor: color});
+                    }
+                });
+                layers.push(endPoint);
+            }
+            
+            // Add route line
+            if (routeGeoJSON.features && routeGeoJSON.features.length > 0) {
+                const route = L.geoJSON(routeGeoJSON, {
+                    style: {
+                        color: color, 
+                        weight: isRoundtrip ? 5 : 4,
+                        opacity: isRoundtrip ? 0.9 : 0.8
+                    }
+                });
+                layers.push(route);
+                console.log(`Added route ${index + 1} to map with color ${color}`);
+            }
+        } catch (parseError) {
+            console.error(`Error parsing GeoJSON for route ${index + 1}:`, parseError);
+        }
+        return layers;
+    },
+
     /**
      * Process route response and add to map
      * @param {Object} responseData - Response from backend
      * @param {Function} onSuccess - Success callback
      */
     processRouteResponse: function(responseData, onSuccess) {
-        const geojsonMarkerOptions = {
-            radius: 8,
-            fillColor: "#ff7800",
-            color: "#000",
-            weight: 1,
-            opacity: 1,
-            fillOpacity: 0.8
-        };
-
         // Remove previous route tables
         document.querySelectorAll('.table-container').forEach(table => table.remove());
 
@@ -122,59 +345,22 @@ const ZipToZipRouting = {
             console.log("Is roundtrip:", responseData.is_roundtrip);
             
             // Create start point
-            const startPoint = L.geoJSON(JSON.parse(responseData['start']), {
-                pointToLayer: function (feature, latlng) {
-                    return L.circleMarker(latlng, geojsonMarkerOptions);
-                }
-            });
-            const allLayers = [startPoint];
+            const allLayers = [ZipToZipRouting.createStartLayer(responseData['start'])];
             
             // Choose color scheme based on routing type
             let colors;
             if (responseData.is_roundtrip) {
-                // Sequential colors for roundtrip
-                colors = ['#ff4444', '#ff8800', '#ffbb00', '#88ff00', '#00ff88', '#0088ff', '#4400ff'];
+                colors = ZipToZipRouting.roundTripColors;
                 layerName = responseData.waypoint_sequence || "Round Trip";
             } else {
-                // Different colors for multiple destinations
-                colors = ['#ff7800', '#0078ff', '#00ff78', '#ff0078', '#7800ff', '#78ff00'];
+                colors = ZipToZipRouting.multipleRouteColors;
                 layerName = "Multiple Routes";
             }
             
             // Process each route
             responseData.routes.forEach((routeData, index) => {
-                console.log(`Processing route ${index + 1}:`, routeData.segment || `Route ${index + 1}`);
                 const color = colors[index % colors.length];
-                
-                try {
-                    const endGeoJSON = JSON.parse(routeData['end']);
-                    const routeGeoJSON = JSON.parse(routeData['route']);
-                    
-                    // Add end point
-                    if (endGeoJSON.features && endGeoJSON.features.length > 0) {
-                        const endPoint = L.geoJSON(endGeoJSON, {
-                            pointToLayer: function (feature, latlng) {
-                                return L.circleMarker(latlng, {...geojsonMarkerOptions, fillColor: color});
-                            }
-                        });
-                        allLayers.push(endPoint);
-                    }
-                    
-                    // Add route line
-                    if (routeGeoJSON.features && routeGeoJSON.features.length > 0) {
-                        const route = L.geoJSON(routeGeoJSON, {
-                            style: {
-                                color: color, 
-                                weight: responseData.is_roundtrip ? 5 : 4,
-                                opacity: responseData.is_roundtrip ? 0.9 : 0.8
-                            }
-                        });
-                        allLayers.push(route);
-                        console.log(`Added route ${index + 1} to map with color ${color}`);
-                    }
-                } catch (parseError) {
-                    console.error(`Error parsing GeoJSON for route ${index + 1}:`, parseError);
-                }
+                allLayers.push(...ZipToZipRouting.createDestinationLayers(routeData, index, color, responseData.is_roundtrip));
             });
             
             routeLayerGroup = L.layerGroup(allLayers);
@@ -182,18 +368,14 @@ const ZipToZipRouting = {
         } else {
             // Single route processing
             console.log("Processing single route");
-            const startPoint = L.geoJSON(JSON.parse(responseData['start']), {
-                pointToLayer: function (feature, latlng) {
-                    return L.circleMarker(latlng, geojsonMarkerOptions);
-                }
-            });
+            const startPoint = ZipToZipRouting.createStartLayer(responseData['start']);
             
             const routesData = responseData.routes && responseData.routes.length > 0 ? responseData.routes[0] : null;
             
             if (routesData) {
                 const endPoint = L.geoJSON(JSON.parse(routesData['end']), {
                     pointToLayer: function (feature, latlng) {
-                        return L.circleMarker(latlng, geojsonMarkerOptions);
+                        return L.circleMarker(latlng, ZipToZipRouting.markerOptions);
                     }
                 });
                 const route = L.geoJSON(JSON.parse(routesData['route']));
@@ -202,50 +384,61 @@ const ZipToZipRouting = {
             }
         }
 
-        // Add to map and layer control
         if (routeLayerGroup) {
-            routeLayerGroup.addTo(appLeaflet.map);
-            
-            const id = Date.now();
-            layerTracker[id] = {
-                layer: routeLayerGroup,
-                routeData: responseData,
-                name: layerName
-            };
-            
-            // Show layer control
-            const control = document.querySelector(".leaflet-control-layers");
-            control.style.display = "block";
+            ZipToZipRouting.registerRouteLayer(routeLayerGroup, responseData, layerName, onSuccess);
+        }
+    },
+
+    /**
+     * Add a finished route layer group to the map, layer control and results table
+     * @param {Object} routeLayerGroup - Leaflet layer group with all route layers
+     * @param {Object} responseData - Complete response data
+     * @param {string} layerName - Name shown in the layer control
+     * @param {Function} onSuccess - Success callback
+     */
+    registerRouteLayer: function(routeLayerGroup, responseData, layerName, onSuccess) {
+        // Add to map and layer control
+        routeLayerGroup.addTo(appLeaflet.map);
+        
+        const id = Date.now();
+        layerTracker[id] = {
+            layer: routeLayerGroup,
+            routeData: responseData,
+            name: layerName
+        };
+        
+        // Show layer control
+        const control = document.querySelector(".leaflet-control-layers");
+        control.style.display = "block";
+        
+        // Add to layer control
+        const controlHTML = createRouteLayerControl(id, layerName);
+        appLeaflet.layerControl.addOverlay(routeLayerGroup, controlHTML);
+
+        // Show route table if available
+        if (responseData.routes_html) {
+            console.log("Displaying routes table");
+            const tableId = createRouteTable(responseData);
             
-            // Add to layer control
-            const controlHTML = createRouteLayerControl(id, layerName);
-            appLeaflet.layerControl.addOverlay(routeLayerGroup, controlHTML);
-
-            // Show route table if available
-            if (responseData.routes_html) {
-                console.log("Displaying routes table");
-                const tableId = createRouteTable(responseData);
-                
-                // Add special formatting for round trip
-                if (responseData.is_roundtrip && responseData.total_distance) {
-                    const tableContainer = document.getElementById(tableId);
-                    if (tableContainer) {
-                        const titleElement = tableContainer.querySelector('.table-title');
-                        if (titleElement) {
-                            titleElement.textContent = `Round Trip: ${responseData.total_distance}m total`;
-                        }
+            // Add special formatting for round trip
+            if (responseData.is_roundtrip && responseData.total_distance) {
+                const tableContainer = document.getElementById(tableId);
+                if (tableContainer) {
+                    const titleElement = tableContainer.querySelector('.table-title');
+                    if (titleElement) {
+                        titleElement.textContent = `Round Trip: ${responseData.total_distance}m total`;
                     }
                 }
             }
+        }
 
-            // Call success callback
-            if (onSuccess) {
-                onSuccess({
-                    layerId: id,
-                    layerGroup: routeLayerGroup,
-                    responseData: responseData
-                });
-            }
+        // Call success callback
+        if (onSuccess) {
+            onSuccess({
+                layerId: id,
+                layerGroup: routeLayerGroup,
+                responseData: responseData
+            });
         }
     },
 
@@ -5,8 +5,7 @@
  */
 
 const ZipcodeSuggestions = {
-    // Cache for zipcode data from unique_cluj.geojson
-    zipcodeData: null,
+    // Suggestions returned by /suggest, keyed by query
     suggestionCache: new Map(),
     
     // Track the current active input for suggestions
@@ -27,56 +26,10 @@ const ZipcodeSuggestions = {
      */
     init: function() {
         console.log('Initializing Zipcode Suggestions Module...');
-        this.loadZipcodeData();
         this.bindEventHandlers();
         this.createSuggestionStyles();
     },
 
-    /**
-     * Load zipcode data from the server
-     */
-    loadZipcodeData: function() {
-        // Try the dedicated route first
-        fetch('/data/unique_cluj.geojson')
-            .then(response => {
-                if (!response.ok) {
-                    throw new Error(`HTTP error! status: ${response.status}`);
-                }
-                return response.json();
-            })
-            .then(data => {
-                this.zipcodeData = data.features;
-                console.log(`Loaded ${this.zipcodeData.length} zipcode records`);
-                this.preprocessData();
-            })
-            .catch(error => {
-                console.error('Failed to load zipcode data from dedicated route:', error);
-                console.warn('Zipcode suggestions will not be available until data is loaded');
-            });
-    },
-
-    /**
-     * Preprocess data for faster searching
-     */
-    preprocessData: function() {
-        if (!this.zipcodeData) return;
-        
-        // Create search-optimized structure
-        this.searchableData = this.zipcodeData.map(feature => {
-            const props = feature.properties;
-            return {
-                postcode: props.postcode || '',
-                city: props.city || '',
-                address: props.address || '-',
-                type: props.type || '',
-                displayText: this.formatSuggestionText(props.postcode, props.city, props.address),
-                searchText: `${props.postcode} ${props.city} ${props.address}`.toLowerCase()
-            };
-        }).filter(item => item.postcode); // Only include items with postcodes
-        
-        console.log(`Preprocessed ${this.searchableData.length} searchable items`);
-    },
-
     /**
      * Format suggestion text as ZIP + Street + County
      */
@@ -185,84 +138,47 @@ const ZipcodeSuggestions = {
         }
 
         console.log(`Searching suggestions for zipcode: ${zipcode}`);
-        const suggestions = this.getSuggestions(zipcode);
-        
-        if (suggestions.length > 0) {
-            this.showSuggestions(inputElement, suggestions);
-        } else {
-            this.hideSuggestions();
-            this.showNoResultsMessage(inputElement);
-        }
+        this.getSuggestions(zipcode).then(suggestions => {
+            if (suggestions.length > 0) {
+                this.showSuggestions(inputElement, suggestions);
+            } else {
+                this.hideSuggestions();
+                this.showNoResultsMessage(inputElement);
+            }
+        });
     },
 
     /**
-     * Get suggestions based on zipcode input
+     * Get suggestions for the typed text from the server-side index
      */
     getSuggestions: function(zipcode) {
-        if (!this.searchableData) {
-            console.warn('Zipcode data not loaded yet');
-            return [];
-        }
-
         // Check cache first
         const cacheKey = zipcode.toLowerCase();
         if (this.suggestionCache.has(cacheKey)) {
-            return this.suggestionCache.get(cacheKey);
+            return Promise.resolve(this.suggestionCache.get(cacheKey));
         }
 
-        const searchTerm = zipcode.toLowerCase();
-        
-        // Priority-based scoring system
-        const suggestions = this.searchableData
-            .map(item => {
-                let score = 0;
-                const postcodeLower = item.postcode.toLowerCase();
-                const searchTextLower = item.searchText;
-                
-                // Exact postcode match gets highest priority
-                if (postcodeLower === searchTerm) {
-                    score = 1000;
-                } 
-                // Postcode starts with search term
-                else if (postcodeLower.startsWith(searchTerm)) {
-                    score = 800;
-                }
-                // Postcode contains search term
-                else if (postcodeLower.includes(searchTerm)) {
-                    score = 600;
-                }
-                // City or address contains search term
-                else if (searchTextLower.includes(searchTerm)) {
-                    score = 400;
-                }
-                // Partial match at word boundaries
-                else if (this.hasWordBoundaryMatch(searchTextLower, searchTerm)) {
-                    score = 200;
-                }
-                
-                // Bonus points for shorter postcodes (more specific)
-                if (score > 0) {
-                    score += (10 - Math.min(item.postcode.length, 10));
+        const params = new URLSearchParams({ q: zipcode, limit: this.config.maxSuggestions });
+        return fetch(`/suggest?${params}`)
+            .then(response => {
+                if (!response.ok) {
+                    throw new Error(`HTTP error! status: ${response.status}`);
                 }
-                
-                return { ...item, score };
+                return response.json();
             })
-            .filter(item => item.score > 0)
-            .sort((a, b) => b.score - a.score)
-            .slice(0, this.config.maxSuggestions);
-
-        // Cache the results
-        this.suggestionCache.set(cacheKey, suggestions);
-        
-        return suggestions;
-    },
-
-    /**
-     * Check for word boundary matches (e.g., "Cluj" matches "Cluj-Napoca")
-     */
-    hasWordBoundaryMatch: function(text, searchTerm) {
-        const regex = new RegExp(`\\b${searchTerm}`, 'i');
-        return regex.test(text);
+            .then(data => {
+                const suggestions = data.suggestions.map(item => ({
+                    ...item,
+                    displayText: item.text
+                }));
+                // Cache the results
+                this.suggestionCache.set(cacheKey, suggestions);
+                return suggestions;
+            })
+            .catch(error => {
+                console.error('Failed to load zipcode suggestions:', error);
+                return [];
+            });
     },
 
     /**
@@ -828,8 +744,9 @@ const ZipcodeSuggestions = {
             
             // Fallback: try to find by current value
             const zipcode = this.extractZipcodeFromValue(inputElement.value);
-            if (zipcode && this.searchableData) {
-                const match = this.searchableData.find(item => 
+            if (zipcode) {
+                const seen = [].concat(...this.suggestionCache.values());
+                const match = seen.find(item => 
                     item.postcode === zipcode && 
                     inputElement.value.includes(item.address)
                 );
@@ -26,3 +26,64 @@ class DockerConfig(object):
     NETWORK_FILE = '/app/data/viteze_drum300.gpkg'
     POINTS_FILE = '/app/data/unique_cluj.geojson'
     ROUTES_FILE = '/app/data/route.gpkg'
+
+    # Routing backend: 'subprocess' (one QGIS process per route), 'pool'
+    # (persistent QGIS workers) or 'native' (in-process graph engine)
+    ROUTING_BACKEND = os.environ.get('ROUTING_BACKEND') or 'subprocess'
+    ROUTING_POOL_SIZE = int(os.environ.get('ROUTING_POOL_SIZE') or 2)
+    ROUTING_JOB_TIMEOUT = int(os.environ.get('ROUTING_JOB_TIMEOUT') or 300)
+    # Concurrent routing runs: per request (cache misses are split into this
+    # many parts) and across all requests of one app process
+    ROUTING_REQUEST_PARALLELISM = int(os.environ.get('ROUTING_REQUEST_PARALLELISM') or 2)
+    ROUTING_MAX_CONCURRENCY = int(os.environ.get('ROUTING_MAX_CONCURRENCY') or 4)
+
+    # Model parameters used by the native backend (same as docker_run_routing.py)
+    ROUTING_STRATEGY = int(os.environ.get('ROUTING_STRATEGY') or 1)  # 0 Shortest, 1 Fastest
+    ROUTING_DEFAULT_SPEED = float(os.environ.get('ROUTING_DEFAULT_SPEED') or 50)
+    ROUTING_TOLERANCE = float(os.environ.get('ROUTING_TOLERANCE') or 0)
+
+    # Cells kept by the /matrix distance/duration cache
+    MATRIX_CACHE_SIZE = int(os.environ.get('MATRIX_CACHE_SIZE') or 200000)
+
+    # Seconds the round trip optimizer may spend improving a tour
+    TOUR_TIME_LIMIT = float(os.environ.get('TOUR_TIME_LIMIT') or 1.0)
+
+    # Per-worker LRU of serialized route responses in front of MongoDB
+    RESPONSE_CACHE_SIZE = int(os.environ.get('RESPONSE_CACHE_SIZE') or 1000)
+    RESPONSE_CACHE_MAX_BYTES = int(os.environ.get('RESPONSE_CACHE_MAX_BYTES') or 64 * 1024 * 1024)
+    RESPONSE_CACHE_TTL = int(os.environ.get('RESPONSE_CACHE_TTL') or 3600)
+    # Seconds a worker may hold the lease on a route it is computing before
+    # other workers stop waiting for it and compute the route themselves
+    ROUTE_LEASE_TTL = int(os.environ.get('ROUTE_LEASE_TTL') or 300)
+
+    # Coordinate decimals of ?format=compact route responses (5 is about 1 m)
+    COMPACT_PRECISION = int(os.environ.get('COMPACT_PRECISION') or 5)
+
+    # Vector tiles: highest zoom served, highest zoom precomputed by
+    # `flask seed-tiles`, and seconds a cached route tile stays valid
+    TILE_MAX_ZOOM = int(os.environ.get('TILE_MAX_ZOOM') or 20)
+    TILE_SEED_MAX_ZOOM = int(os.environ.get('TILE_SEED_MAX_ZOOM') or 10)
+    TILE_ROUTES_TTL = int(os.environ.get('TILE_ROUTES_TTL') or 300)
+    # Age (s) and size (bytes) budgets of the data/tiles cache, swept apart
+    # from the routing files so neither evicts the other
+    TILE_CACHE_MAX_AGE = int(os.environ.get('TILE_CACHE_MAX_AGE') or 30 * 24 * 3600)
+    TILE_CACHE_MAX_BYTES = int(os.environ.get('TILE_CACHE_MAX_BYTES') or 512 * 1024 ** 2)
+
+    # Load routes and points from GeoParquet caches of the data files, built
+    # on the first start after a data file changed (needs pyarrow)
+    FRAME_CACHE = (os.environ.get('FRAME_CACHE') or '1') != '0'
+
+    # Age (s) and size (bytes) budgets of routing_data/ and data/{zip_start,zip_end,routes}
+    ROUTING_FILES_MAX_AGE = int(os.environ.get('ROUTING_FILES_MAX_AGE') or 7 * 24 * 3600)
+    ROUTING_FILES_MAX_BYTES = int(os.environ.get('ROUTING_FILES_MAX_BYTES') or 1024 ** 3)
+    ROUTING_FILES_SWEEP_INTERVAL = int(os.environ.get('ROUTING_FILES_SWEEP_INTERVAL') or 600)
+
+    # Batch routing jobs (/jobs): worker threads, destinations routed per run,
+    # largest batch and seconds before a silent running job is taken over
+    BATCH_WORKERS = int(os.environ.get('BATCH_WORKERS') or 2)
+    BATCH_CHUNK_SIZE = int(os.environ.get('BATCH_CHUNK_SIZE') or 50)
+    BATCH_MAX_DESTINATIONS = int(os.environ.get('BATCH_MAX_DESTINATIONS') or 5000)
+    BATCH_JOB_STALE_AFTER = int(os.environ.get('BATCH_JOB_STALE_AFTER') or 600)
+
+    # Largest page /suggest returns
+    SUGGEST_MAX_LIMIT = int(os.environ.get('SUGGEST_MAX_LIMIT') or 50)
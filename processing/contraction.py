@@ -0,0 +1,428 @@
+"""
+Contraction Hierarchies
+Offline preprocessing of the routing graph (node ordering + shortcut edges)
+and a bidirectional query answering point-to-point routes in well under a
+millisecond. Hierarchies are stored next to the network file, one per strategy.
+
+Build them with:
+    python processing/contraction.py data/viteze_drum300.gpkg
+"""
+
+import argparse
+import heapq
+import math
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+from network_graph import (
+    RoutingGraph,
+    DEFAULT_SPEED,
+    TOPOLOGY_TOLERANCE,
+    STRATEGY_SHORTEST,
+    STRATEGY_FASTEST,
+    _strategy_index,
+)
+
+
+STRATEGY_NAMES = {STRATEGY_SHORTEST: 'shortest', STRATEGY_FASTEST: 'fastest'}
+FORMAT_VERSION = 1
+
+
+def hierarchy_path(network_file, strategy):
+    """Location of the stored hierarchy for a network file and strategy"""
+    stem, _ = os.path.splitext(network_file)
+    return f"{stem}.{STRATEGY_NAMES[_strategy_index(strategy)]}.ch.npz"
+
+
+def _cost_checksum(graph, strategy):
+    costs = graph.seg_time if strategy == STRATEGY_FASTEST else graph.seg_length
+    return float(costs.sum())
+
+
+def _to_csr(node_count, index, columns):
+    """Sort arc columns by `index` and return (indptr, sorted columns)"""
+    index = np.asarray(index, dtype=np.int64)
+    order = np.argsort(index, kind='stable')
+    indptr = np.zeros(node_count + 1, dtype=np.int64)
+    np.cumsum(np.bincount(index, minlength=node_count), out=indptr[1:])
+    return indptr, [np.asarray(col)[order] for col in columns]
+
+
+def build_hierarchy(graph, strategy=STRATEGY_FASTEST, settle_limit=60, verbose=True):
+    """
+    Contract every node of the graph
+
+    Nodes are ordered lazily by edge difference plus the number of already
+    contracted neighbours. A shortcut u->w replacing u->v->w is only added
+    when a witness search from u (bounded by `settle_limit` settled nodes)
+    finds no path of equal or lower cost avoiding v.
+
+    Args:
+        graph: RoutingGraph
+        strategy: 0 (Shortest) or 1 (Fastest)
+        settle_limit: Work limit of each witness search
+        verbose: Print progress
+
+    Returns:
+        ContractionHierarchy
+    """
+    strategy = _strategy_index(strategy)
+    n = graph.node_count
+    weights = graph.edge_weights[strategy]
+    src = np.repeat(np.arange(n), np.diff(graph.indptr))
+
+    # arc value: (cost, length, duration, middle node or -1)
+    out_adj = [dict() for _ in range(n)]
+    in_adj = [dict() for _ in range(n)]
+    for u, v, cost, seg in zip(src.tolist(), graph.edge_dst.tolist(), weights.tolist(),
+                               graph.edge_seg.tolist()):
+        if u == v:
+            continue
+        current = out_adj[u].get(v)
+        if current is None or cost < current[0]:
+            arc = (cost, float(graph.seg_length[seg]), float(graph.seg_time[seg]), -1)
+            out_adj[u][v] = arc
+            in_adj[v][u] = arc
+
+    def witness_dist(source, skip, max_cost):
+        dist = {source: 0.0}
+        heap = [(0.0, source)]
+        settled = 0
+        while heap:
+            d, x = heapq.heappop(heap)
+            if d > dist[x]:
+                continue
+            if d > max_cost or settled >= settle_limit:
+                break
+            settled += 1
+            for y, arc in out_adj[x].items():
+                if y == skip:
+                    continue
+                nd = d + arc[0]
+                if nd < dist.get(y, math.inf):
+                    dist[y] = nd
+                    heapq.heappush(heap, (nd, y))
+        return dist
+
+    def shortcuts_for(v):
+        shortcuts = []
+        outs = out_adj[v]
+        for u, (cu, lu, du, _) in in_adj[v].items():
+            candidates = {w: cu + arc[0] for w, arc in outs.items() if w != u}
+            if not candidates:
+                continue
+            dist = witness_dist(u, v, max(candidates.values()))
+            for w, cost in candidates.items():
+                if dist.get(w, math.inf) > cost:
+                    _, lw, dw, _ = outs[w]
+                    shortcuts.append((u, w, cost, lu + lw, du + dw))
+        return shortcuts
+
+    deleted_neighbours = [0] * n
+
+    def priority(v):
+        shortcuts = shortcuts_for(v)
+        edge_difference = len(shortcuts) - len(in_adj[v]) - len(out_adj[v])
+        return edge_difference + deleted_neighbours[v], shortcuts
+
+    heap = [(priority(v)[0], v) for v in range(n)]
+    heapq.heapify(heap)
+
+    rank = np.empty(n, dtype=np.int64)
+    contracted = bytearray(n)
+    up = ([], [], [], [], [], [])      # src, dst, cost, length, duration, middle
+    down = ([], [], [], [], [], [])    # lower node, higher node, cost, length, duration, middle
+    order = 0
+    started = time.time()
+
+    while heap:
+        _, v = heapq.heappop(heap)
+        if contracted[v]:
+            continue
+        prio, shortcuts = priority(v)
+        if heap and prio > heap[0][0]:
+            heapq.heappush(heap, (prio, v))
+            continue
+
+        rank[v] = order
+        order += 1
+        contracted[v] = 1
+
+        for w, (cost, length, duration, middle) in out_adj[v].items():
+            for column, value in zip(up, (v, w, cost, length, duration, middle)):
+                column.append(value)
+            del in_adj[w][v]
+            deleted_neighbours[w] += 1
+        for u, (cost, length, duration, middle) in in_adj[v].items():
+            for column, value in zip(down, (v, u, cost, length, duration, middle)):
+                column.append(value)
+            del out_adj[u][v]
+            deleted_neighbours[u] += 1
+        out_adj[v] = {}
+        in_adj[v] = {}
+
+        for u, w, cost, length, duration in shortcuts:
+            current = out_adj[u].get(w)
+            if current is None or cost < current[0]:
+                arc = (cost, length, duration, v)
+                out_adj[u][w] = arc
+                in_adj[w][u] = arc
+
+        if verbose and order % 50000 == 0:
+            print(f"DEBUG: Contracted {order}/{n} nodes in {time.time() - started:.1f}s")
+
+    up_indptr, up_cols = _to_csr(n, up[0], up[1:])
+    down_indptr, down_cols = _to_csr(n, down[0], down[1:])
+    if verbose:
+        shortcut_count = sum(1 for m in up[5] if m >= 0) + sum(1 for m in down[5] if m >= 0)
+        print(f"✅ Built {STRATEGY_NAMES[strategy]} hierarchy: {n} nodes, "
+              f"{len(up[0]) + len(down[0])} arcs ({shortcut_count} shortcuts) "
+              f"in {time.time() - started:.1f}s")
+
+    return ContractionHierarchy(graph, strategy, rank, up_indptr, up_cols, down_indptr, down_cols)
+
+
+class ContractionHierarchy:
+    """
+    Upward/downward arc arrays of a contracted graph
+
+    `up` is indexed by the lower node and holds arcs to higher ranked nodes
+    (forward search); `down` is indexed by the lower node and holds arcs
+    arriving from higher ranked nodes (backward search). Both store cost,
+    length, duration and the contracted middle node (-1 for road segments).
+    """
+
+    def __init__(self, graph, strategy, rank, up_indptr, up_cols, down_indptr, down_cols):
+        self.graph = graph
+        self.strategy = strategy
+        self.rank = rank
+        self.up_indptr = up_indptr
+        self.up_dst, self.up_cost, self.up_length, self.up_duration, self.up_middle = up_cols
+        self.down_indptr = down_indptr
+        self.down_src, self.down_cost, self.down_length, self.down_duration, self.down_middle = down_cols
+
+        self._up = (up_indptr.tolist(), self.up_dst.tolist(), self.up_cost.tolist())
+        self._down = (down_indptr.tolist(), self.down_src.tolist(), self.down_cost.tolist())
+        self._up_middle = self.up_middle.tolist()
+        self._down_middle = self.down_middle.tolist()
+
+    # -- persistence --------------------------------------------------------
+
+    def save(self, path):
+        np.savez(
+            path,
+            meta=np.array([FORMAT_VERSION, self.graph.node_count, self.graph.edge_count, self.strategy]),
+            checksum=np.array([_cost_checksum(self.graph, self.strategy)]),
+            rank=self.rank,
+            up_indptr=self.up_indptr, up_dst=self.up_dst, up_cost=self.up_cost,
+            up_length=self.up_length, up_duration=self.up_duration, up_middle=self.up_middle,
+            down_indptr=self.down_indptr, down_src=self.down_src, down_cost=self.down_cost,
+            down_length=self.down_length, down_duration=self.down_duration, down_middle=self.down_middle,
+        )
+
+    @classmethod
+    def load(cls, graph, path):
+        """
+        Load a stored hierarchy for `graph`
+
+        Raises:
+            ValueError if the file was built from a different graph or strategy
+        """
+        with np.load(path) as data:
+            version, node_count, edge_count, strategy = data['meta'].tolist()
+            if version != FORMAT_VERSION or node_count != graph.node_count or edge_count != graph.edge_count:
+                raise ValueError(f"Hierarchy {path} does not match the loaded network")
+            if not np.isclose(data['checksum'][0], _cost_checksum(graph, strategy)):
+                raise ValueError(f"Hierarchy {path} was built with different speeds or parameters")
+            up_cols = [data[k] for k in ('up_dst', 'up_cost', 'up_length', 'up_duration', 'up_middle')]
+            down_cols = [data[k] for k in ('down_src', 'down_cost', 'down_length', 'down_duration', 'down_middle')]
+            return cls(graph, strategy, data['rank'], data['up_indptr'], up_cols, data['down_indptr'], down_cols)
+
+    # -- query --------------------------------------------------------------
+
+    def _search(self, seeds, entries):
+        """
+        Bidirectional upward search between seeded start and end nodes
+
+        Returns:
+            (cost, meeting node, forward pred, backward pred)
+        """
+        up_indptr, up_dst, up_cost = self._up
+        down_indptr, down_src, down_cost = self._down
+
+        dist_f, dist_b, pred_f, pred_b = {}, {}, {}, {}
+        heap_f, heap_b = [], []
+        for node, cost in seeds:
+            if cost < dist_f.get(node, math.inf):
+                dist_f[node] = cost
+                pred_f[node] = (-1, -1)
+                heap_f.append((cost, node))
+        for node, cost in entries:
+            if cost < dist_b.get(node, math.inf):
+                dist_b[node] = cost
+                pred_b[node] = (-1, -1)
+                heap_b.append((cost, node))
+        heapq.heapify(heap_f)
+        heapq.heapify(heap_b)
+
+        best, meet = math.inf, -1
+        while heap_f or heap_b:
+            forward = heap_f and (not heap_b or heap_f[0][0] <= heap_b[0][0])
+            heap, dist, other, pred = (heap_f, dist_f, dist_b, pred_f) if forward else (heap_b, dist_b, dist_f, pred_b)
+            indptr, adj, cost = (up_indptr, up_dst, up_cost) if forward else (down_indptr, down_src, down_cost)
+
+            d, u = heapq.heappop(heap)
+            if d > dist[u]:
+                continue
+            if d >= best:
+                # Nothing cheaper can be found in this direction any more
+                heap.clear()
+                continue
+            if u in other and d + other[u] < best:
+                best, meet = d + other[u], u
+            for a in range(indptr[u], indptr[u + 1]):
+                v = adj[a]
+                nd = d + cost[a]
+                if nd < dist.get(v, math.inf):
+                    dist[v] = nd
+                    pred[v] = (u, a)
+                    heapq.heappush(heap, (nd, v))
+        return best, meet, pred_f, pred_b
+
+    def _up_arc(self, lower, higher):
+        start, end = self.up_indptr[lower], self.up_indptr[lower + 1]
+        return start + int(np.nonzero(self.up_dst[start:end] == higher)[0][0])
+
+    def _down_arc(self, lower, higher):
+        start, end = self.down_indptr[lower], self.down_indptr[lower + 1]
+        return start + int(np.nonzero(self.down_src[start:end] == higher)[0][0])
+
+    def _unpack(self, a, b, middle, nodes):
+        """Append the road nodes after `a` up to `b` of the arc a->b"""
+        stack = [(a, b, middle)]
+        while stack:
+            a, b, middle = stack.pop()
+            if middle < 0:
+                nodes.append(b)
+                continue
+            # a->middle is a downward arc, middle->b an upward one
+            stack.append((middle, b, self._up_middle[self._up_arc(middle, b)]))
+            stack.append((a, middle, self._down_middle[self._down_arc(middle, a)]))
+
+    def route_snaps(self, start_snap, end_snap):
+        """Route between two snapped points (see RoutingGraph.snap)"""
+        graph = self.graph
+        seeds = {s[0]: s for s in sorted(graph.seeds(start_snap, self.strategy), key=lambda s: -s[1])}
+        entries = {e[0]: e for e in sorted(graph.entries(end_snap, self.strategy), key=lambda e: -e[1])}
+
+        best, meet, pred_f, pred_b = self._search(
+            [(s[0], s[1]) for s in seeds.values()],
+            [(e[0], e[1]) for e in entries.values()]
+        )
+        if meet < 0:
+            return graph.assemble_route(start_snap, end_snap, self.strategy, math.inf, None, 0.0, 0.0)
+
+        # Forward half: seed -> meet over upward arcs
+        arcs = []
+        node = meet
+        while pred_f[node][0] >= 0:
+            prev, a = pred_f[node]
+            arcs.append((prev, node, a))
+            node = prev
+        first = node
+        nodes = [first]
+        length = seeds[first][2]
+        duration = seeds[first][3]
+        for prev, node, a in reversed(arcs):
+            self._unpack(prev, node, self._up_middle[a], nodes)
+            length += float(self.up_length[a])
+            duration += float(self.up_duration[a])
+
+        # Backward half: meet -> entry over downward arcs
+        node = meet
+        while pred_b[node][0] >= 0:
+            nxt, a = pred_b[node]
+            self._unpack(node, nxt, self._down_middle[a], nodes)
+            length += float(self.down_length[a])
+            duration += float(self.down_duration[a])
+            node = nxt
+        length += entries[node][2]
+        duration += entries[node][3]
+
+        return graph.assemble_route(start_snap, end_snap, self.strategy, best, nodes, length, duration)
+
+    def route(self, start_xy, end_xy):
+        """Route between two points given in EPSG:4326"""
+        return self.route_snaps(self.graph.snap_lonlat(*start_xy), self.graph.snap_lonlat(*end_xy))
+
+    def route_many(self, start_xy, end_xys):
+        """One bidirectional query per end point, same result shape as RoutingGraph.route_many"""
+        start_snap = self.graph.snap_lonlat(*start_xy)
+        end_snaps = self.graph.snap_lonlat_many([xy[0] for xy in end_xys], [xy[1] for xy in end_xys])
+        return [self.route_snaps(start_snap, end_snap) for end_snap in end_snaps]
+
+
+def check_consistency(hierarchy, samples=200, seed=0, tolerance=1e-6):
+    """
+    Compare hierarchy query costs against the plain Dijkstra result
+
+    Args:
+        hierarchy: ContractionHierarchy to verify
+        samples: Number of random node pairs
+        seed: Random seed for the sample
+        tolerance: Allowed relative cost difference
+
+    Returns:
+        dict with checked, mismatches and max_error
+    """
+    graph = hierarchy.graph
+    rng = random.Random(seed)
+    mismatches = 0
+    max_error = 0.0
+    for _ in range(samples):
+        a, b = rng.randrange(graph.node_count), rng.randrange(graph.node_count)
+        start_snap = graph.snap(*graph.node_xy[a])
+        end_snap = graph.snap(*graph.node_xy[b])
+        expected = graph.route_snaps(start_snap, [end_snap], hierarchy.strategy)[0]
+        actual = hierarchy.route_snaps(start_snap, end_snap)
+        if expected is None or actual is None:
+            if expected is not actual:
+                mismatches += 1
+            continue
+        error = abs(expected['cost'] - actual['cost']) / max(expected['cost'], 1.0)
+        max_error = max(max_error, error)
+        if error > tolerance:
+            mismatches += 1
+    return {'checked': samples, 'mismatches': mismatches, 'max_error': max_error}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build contraction hierarchies for the road network")
+    parser.add_argument('network_file', nargs='?', default=os.path.join('data', 'viteze_drum300.gpkg'))
+    parser.add_argument('--default-speed', type=float, default=DEFAULT_SPEED)
+    parser.add_argument('--tolerance', type=float, default=TOPOLOGY_TOLERANCE)
+    parser.add_argument('--check', type=int, default=200, help="Random pairs compared against Dijkstra")
+    args = parser.parse_args(argv)
+
+    graph = RoutingGraph.from_file(args.network_file, default_speed=args.default_speed, tolerance=args.tolerance)
+    print(f"✅ Loaded routing graph: {graph.node_count} nodes, {graph.edge_count} edges")
+
+    ok = True
+    for strategy in (STRATEGY_SHORTEST, STRATEGY_FASTEST):
+        hierarchy = build_hierarchy(graph, strategy)
+        path = hierarchy_path(args.network_file, strategy)
+        hierarchy.save(path)
+        print(f"✅ Saved {path}")
+        if args.check:
+            report = check_consistency(hierarchy, args.check)
+            print(f"   Consistency vs Dijkstra: {report}")
+            ok = ok and report['mismatches'] == 0
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,133 @@
+"""
+Address Matching Index
+Pre-normalized address/city values and a trigram inverted index per postcode,
+built once at startup so precise point lookups do no string work on the full
+address column per request
+"""
+
+import re
+
+import numpy as np
+
+from postcode_index import PostcodeIndex
+
+
+# Characters that make a pattern behave differently under str.contains(regex=True)
+_REGEX_CHARS = re.compile(r'[.^$*+?{}\[\]\\|()]')
+_NO_ROWS = np.empty(0, dtype=np.int64)
+
+MATCH_EXACT = 'exact'
+MATCH_PARTIAL = 'partial'
+MATCH_KEY_PARTS = 'key_parts'
+MATCH_CITY = 'city'
+MATCH_FALLBACK = 'fallback'
+
+
+def _lower(value):
+    return value.lower() if isinstance(value, str) else None
+
+
+def _trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class AddressIndex(PostcodeIndex):
+    """
+    PostcodeIndex that also ranks the rows of a postcode against an address
+
+    match() reproduces the cascade of get_precise_point: exact address,
+    partial address, address letters only ("key parts"), city, and finally
+    every row of the postcode.
+    """
+
+    def __init__(self, frame, column='postcode', address_column='address', city_column='city'):
+        super().__init__(frame, column)
+        addresses = frame[address_column].tolist() if address_column in frame.columns else [None] * len(frame)
+        cities = frame[city_column].tolist() if city_column in frame.columns else [None] * len(frame)
+
+        self.address_lower = [_lower(a) for a in addresses]
+        self.city_lower = [_lower(c) for c in cities]
+
+        self._exact = {}
+        self._ngrams = {}
+        for postcode, rows in self.positions.items():
+            exact = {}
+            ngrams = {}
+            for pos in rows.tolist():
+                address = self.address_lower[pos]
+                if address is None:
+                    continue
+                exact.setdefault(address.strip(), []).append(pos)
+                for gram in _trigrams(address):
+                    ngrams.setdefault(gram, []).append(pos)
+            self._exact[postcode] = exact
+            self._ngrams[postcode] = ngrams
+
+    def _search(self, values, rows, pattern, ngrams=None):
+        """Rows whose value matches `pattern` like Series.str.contains(pattern, case=False, na=False)"""
+        if _REGEX_CHARS.search(pattern):
+            try:
+                regex = re.compile(pattern, re.IGNORECASE)
+            except re.error:
+                return []
+            return [p for p in rows if values[p] is not None and regex.search(values[p])]
+
+        pattern = pattern.lower()
+        candidates = rows
+        grams = _trigrams(pattern) if ngrams is not None else None
+        if grams:
+            postings = [ngrams.get(gram) for gram in grams]
+            if any(p is None for p in postings):
+                return []
+            # Start from the rarest trigram
+            postings.sort(key=len)
+            candidates = set(postings[0]).intersection(*postings[1:])
+            candidates = sorted(candidates)
+        return [p for p in candidates if values[p] is not None and pattern in values[p]]
+
+    def match(self, postcode, address=None, city=None):
+        """
+        Rank the rows of a postcode against an address and city
+
+        Args:
+            postcode: Zipcode/postcode
+            address: Optional specific address
+            city: Optional specific city
+
+        Returns:
+            (positions, level): row positions in frame order for the first
+            cascade level that matched, and that level's name; level is None
+            when the postcode is unknown
+        """
+        rows = self.positions.get(postcode)
+        if rows is None:
+            return _NO_ROWS, None
+        row_list = rows.tolist()
+
+        if address:
+            normalized = address.lower().strip()
+
+            exact = self._exact[postcode].get(normalized)
+            if exact:
+                return np.asarray(exact, dtype=np.int64), MATCH_EXACT
+
+            partial = self._search(self.address_lower, row_list, normalized, self._ngrams[postcode])
+            if partial:
+                return np.asarray(partial, dtype=np.int64), MATCH_PARTIAL
+
+            key_parts = re.sub(r'[^a-zA-Z\s]', '', normalized).strip()
+            if key_parts:
+                key_match = self._search(self.address_lower, row_list, key_parts, self._ngrams[postcode])
+                if key_match:
+                    return np.asarray(key_match, dtype=np.int64), MATCH_KEY_PARTS
+
+        if city:
+            city_match = self._search(self.city_lower, row_list, city)
+            if city_match:
+                return np.asarray(city_match, dtype=np.int64), MATCH_CITY
+
+        return rows, MATCH_FALLBACK
+
+    def rows(self, positions):
+        """Sub-frame for positions returned by match()"""
+        return self.frame.iloc[positions]
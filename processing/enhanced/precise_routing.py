@@ -8,8 +8,20 @@ import geopandas as gpd
 import pandas as pd
 from shapely.wkt import loads as wkt_loads
 
+from enhanced.address_index import AddressIndex
 
-def get_precise_point(points_gdf, postcode, address=None, city=None):
+
+def _indexed_match(index, kind, postcode, address, city):
+    """Run the address cascade on a prebuilt AddressIndex and log the level used"""
+    positions, level = index.match(postcode, address, city)
+    if level is None:
+        print(f"WARNING: No {kind} found for postcode {postcode}")
+    else:
+        print(f"DEBUG: {level} {kind} match for postcode={postcode}, address={address}, city={city}: {len(positions)} rows")
+    return index.rows(positions)
+
+
+def get_precise_point(points_gdf, postcode, address=None, city=None, index=None):
     """
     Get precise point based on postcode and optional address/city
     Falls back to postcode-only if specific address not found
@@ -19,14 +31,22 @@ def get_precise_point(points_gdf, postcode, address=None, city=None):
         postcode: Zipcode/postcode
         address: Optional specific address
         city: Optional specific city
+        index: Optional PostcodeIndex over points_gdf for O(1) postcode lookup;
+            an AddressIndex also answers the address/city cascade
         
     Returns:
         GeoDataFrame with matching points (single most precise match)
     """
     print(f"DEBUG: get_precise_point called with postcode={postcode}, address={address}, city={city}")
     
+    if isinstance(index, AddressIndex):
+        return _indexed_match(index, 'points', postcode, address, city).head(1)
+    
     # Start with postcode filter
-    filtered_points = points_gdf[points_gdf['postcode'] == postcode]
+    if index is not None:
+        filtered_points = index.get(postcode)
+    else:
+        filtered_points = points_gdf[points_gdf['postcode'] == postcode]
     
     if filtered_points.empty:
         print(f"WARNING: No points found for postcode {postcode}")
@@ -84,7 +104,7 @@ def get_precise_point(points_gdf, postcode, address=None, city=None):
     return filtered_points.head(1)
 
 
-def get_precise_route_points(routes_gdf, postcode, address=None, city=None):
+def get_precise_route_points(routes_gdf, postcode, address=None, city=None, index=None):
     """
     Get precise route data based on postcode and optional address/city
     
@@ -93,14 +113,22 @@ def get_precise_route_points(routes_gdf, postcode, address=None, city=None):
         postcode: Zipcode/postcode
         address: Optional specific address
         city: Optional specific city
+        index: Optional PostcodeIndex over routes_gdf for O(1) postcode lookup;
+            an AddressIndex also answers the address/city cascade
         
     Returns:
         GeoDataFrame with matching route data
     """
     print(f"DEBUG: get_precise_route_points called with postcode={postcode}, address={address}, city={city}")
     
+    if isinstance(index, AddressIndex):
+        return _indexed_match(index, 'routes', postcode, address, city)
+    
     # Start with postcode filter
-    filtered_routes = routes_gdf[routes_gdf['postcode'] == postcode]
+    if index is not None:
+        filtered_routes = index.get(postcode)
+    else:
+        filtered_routes = routes_gdf[routes_gdf['postcode'] == postcode]
     
     if filtered_routes.empty:
         print(f"WARNING: No routes found for postcode {postcode}")
@@ -0,0 +1,190 @@
+"""
+GeoParquet Frame Cache
+Stores the layers loaded at app start (routes, postcode points) as
+GeoParquet, already reprojected, so worker starts and debug reloads read a
+columnar file instead of parsing GPKG/GeoJSON with GDAL. A sidecar JSON file
+records the size, mtime and SHA-256 of the source the cache was built from.
+
+Build the caches with:
+    python processing/frame_cache.py data/route.gpkg:4326 data/unique_cluj.geojson
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+import geopandas as gpd
+
+from network_fingerprint import file_digest
+
+
+# Bump when the way cached frames are written changes
+FORMAT_VERSION = 1
+
+
+def cache_path(source, crs=None):
+    """Location of the cached frame for a source file and target EPSG code"""
+    stem, _ = os.path.splitext(source)
+    return f"{stem}.{crs}.parquet" if crs is not None else f"{stem}.parquet"
+
+
+def _signature_path(path):
+    return f"{path}.json"
+
+
+def _read_signature(path):
+    try:
+        with open(_signature_path(path)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_signature(path, signature):
+    tmp = f"{_signature_path(path)}.{os.getpid()}.tmp"
+    with open(tmp, 'w') as f:
+        json.dump(signature, f)
+    os.replace(tmp, _signature_path(path))
+
+
+def source_signature(source, crs=None):
+    """Size, mtime and content hash of `source`, plus the target CRS and format version"""
+    stat = os.stat(source)
+    return {
+        'version': FORMAT_VERSION,
+        'source': os.path.basename(source),
+        'size': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns,
+        'sha256': file_digest(source),
+        'crs': crs,
+    }
+
+
+def is_fresh(source, crs=None):
+    """
+    Whether the cached frame of `source` was built from its current content
+
+    Size and mtime are compared first; the source is only hashed when they
+    differ (a checkout or copy that kept the content), and a matching hash
+    refreshes the recorded mtime so the next start skips hashing again.
+    """
+    path = cache_path(source, crs)
+    signature = _read_signature(path)
+    if signature is None or not os.path.exists(path):
+        return False
+    if signature.get('version') != FORMAT_VERSION or signature.get('crs') != crs:
+        return False
+    try:
+        stat = os.stat(source)
+    except OSError:
+        return False
+    if signature.get('size') == stat.st_size and signature.get('mtime_ns') == stat.st_mtime_ns:
+        return True
+    if signature.get('size') != stat.st_size or signature.get('sha256') != file_digest(source):
+        return False
+    try:
+        _write_signature(path, {**signature, 'mtime_ns': stat.st_mtime_ns})
+    except OSError:
+        pass
+    return True
+
+
+def read_source(source, crs=None):
+    """The source layer read with GDAL and reprojected to EPSG:`crs` if given"""
+    frame = gpd.read_file(source)
+    if crs is not None:
+        frame = frame.to_crs(epsg=crs)
+    return frame
+
+
+def build_cache(source, crs=None, frame=None):
+    """
+    Write the cached frame of `source`
+
+    Args:
+        source: GPKG/GeoJSON/... file
+        crs: EPSG code to reproject to, None to keep the source CRS
+        frame: The already loaded (and reprojected) frame, read from `source` if None
+
+    Returns:
+        Path of the cache file
+    """
+    signature = source_signature(source, crs)
+    if frame is None:
+        frame = read_source(source, crs)
+    path = cache_path(source, crs)
+    # Without a signature a half-replaced cache is never taken as fresh
+    if os.path.exists(_signature_path(path)):
+        os.remove(_signature_path(path))
+    tmp = f"{path}.{os.getpid()}.tmp"
+    try:
+        frame.to_parquet(tmp, index=False)
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+    _write_signature(path, signature)
+    return path
+
+
+def load_frame(source, crs=None, build=True):
+    """
+    GeoDataFrame of `source`, from its GeoParquet cache when that is fresh
+
+    Args:
+        source: GPKG/GeoJSON/... file
+        crs: EPSG code the frame is returned in, None to keep the source CRS
+        build: Write (or rewrite) the cache after reading a missing or stale one
+
+    Returns:
+        The frame; falls back to reading `source` when pyarrow is missing or the
+        cache cannot be read
+    """
+    path = cache_path(source, crs)
+    if is_fresh(source, crs):
+        try:
+            # Memory-mapped so the columns are paged in instead of copied
+            return gpd.read_parquet(path, memory_map=True)
+        except ImportError:
+            build = False
+        except Exception as e:
+            print(f"❌ Error reading cached frame {path}: {e}")
+
+    frame = read_source(source, crs)
+    if build:
+        try:
+            build_cache(source, crs, frame=frame)
+            print(f"✅ Cached {source} as {path}")
+        except ImportError:
+            pass
+        except Exception as e:
+            print(f"❌ Error caching {source}: {e}")
+    return frame
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build the GeoParquet caches of the layers loaded at app start")
+    parser.add_argument('sources', nargs='*', metavar='FILE[:EPSG]',
+                        default=[os.path.join('data', 'route.gpkg:4326'), os.path.join('data', 'unique_cluj.geojson')],
+                        help="Source layer, optionally with the EPSG code to reproject to")
+    parser.add_argument('--force', action='store_true', help="Rebuild caches that are still fresh")
+    args = parser.parse_args(argv)
+
+    for spec in args.sources:
+        source, _, crs = spec.rpartition(':')
+        if not crs.isdigit():
+            source, crs = spec, None
+        crs = int(crs) if crs else None
+        if not args.force and is_fresh(source, crs):
+            print(f"✅ {cache_path(source, crs)} is up to date")
+            continue
+        start = time.perf_counter()
+        path = build_cache(source, crs)
+        print(f"✅ Saved {path} in {time.perf_counter() - start:.1f}s")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
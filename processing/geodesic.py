@@ -0,0 +1,82 @@
+"""
+Geodesic Distances
+Vectorized haversine (great-circle) distances in meters between lon/lat
+arrays: pairwise, one-to-many and full matrices. Much cheaper than a road
+search, so it serves as a straight-line fallback and as a pre-filter for
+nearest-postcode and tour heuristics
+"""
+
+import numpy as np
+
+
+EARTH_RADIUS = 6371000.0  # meters
+
+
+def haversine(lon1, lat1, lon2, lat2):
+    """
+    Great-circle distance in meters, broadcast over the arguments
+
+    Args:
+        lon1, lat1: Origin longitude/latitude in degrees (scalars or arrays)
+        lon2, lat2: Destination longitude/latitude in degrees (scalars or arrays)
+
+    Returns:
+        float for scalar arguments, otherwise an array of the broadcast shape
+    """
+    lon1, lat1, lon2, lat2 = (np.radians(np.asarray(v, dtype=float)) for v in (lon1, lat1, lon2, lat2))
+    a = (np.sin((lat2 - lat1) / 2) ** 2
+         + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2)
+    # Clip guards against rounding slightly above 1 for antipodal points
+    distance = 2 * EARTH_RADIUS * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+    return float(distance) if distance.ndim == 0 else distance
+
+
+def distances_from(lon, lat, lons, lats):
+    """Distances in meters from one point to every point of the lons/lats arrays"""
+    return haversine(lon, lat, lons, lats)
+
+
+def distance_matrix(lons, lats, to_lons=None, to_lats=None):
+    """
+    Dense straight-line distance matrix in meters
+
+    Args:
+        lons, lats: Origin coordinates (length n)
+        to_lons, to_lats: Destination coordinates (length m), the origins if omitted
+
+    Returns:
+        (n, m) array
+    """
+    lons = np.asarray(lons, dtype=float)
+    lats = np.asarray(lats, dtype=float)
+    if to_lons is None:
+        to_lons, to_lats = lons, lats
+    return haversine(lons[:, None], lats[:, None], np.asarray(to_lons, dtype=float)[None, :],
+                     np.asarray(to_lats, dtype=float)[None, :])
+
+
+def coordinates(frame):
+    """
+    Longitude and latitude arrays of a point GeoDataFrame/GeoSeries in EPSG:4326
+
+    Returns:
+        (lons, lats) float arrays in row order
+    """
+    geometry = frame.geometry if hasattr(frame, 'geometry') else frame
+    return np.asarray(geometry.x, dtype=float), np.asarray(geometry.y, dtype=float)
+
+
+def nearest(lon, lat, lons, lats, k=1):
+    """
+    Positions of the k points closest to (lon, lat), closest first
+
+    Returns:
+        (positions, distances in meters)
+    """
+    distances = distances_from(lon, lat, lons, lats)
+    k = min(int(k), len(distances))
+    if k <= 0:
+        return np.empty(0, dtype=np.int64), np.empty(0)
+    candidates = np.argpartition(distances, k - 1)[:k] if k < len(distances) else np.arange(len(distances))
+    order = candidates[np.argsort(distances[candidates], kind='stable')]
+    return order, distances[order]
@@ -0,0 +1,102 @@
+"""
+Travel Distance/Duration Matrix
+Many-to-many road distances and travel times between sets of locations,
+computed with one one-to-many search per source and cached per cell
+"""
+
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from network_graph import STRATEGY_FASTEST, _strategy_index
+
+
+class MatrixCache:
+    """Bounded LRU of (strategy, source, target) -> (length, duration)"""
+
+    def __init__(self, max_entries=200000):
+        self.max_entries = max_entries
+        self._cells = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            value = self._cells.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._cells.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._cells[key] = value
+            self._cells.move_to_end(key)
+            while len(self._cells) > self.max_entries:
+                self._cells.popitem(last=False)
+
+    def stats(self):
+        return {'entries': len(self._cells), 'hits': self.hits, 'misses': self.misses}
+
+
+def _location_key(lonlat):
+    # ~1 cm, so the same postcode point always maps to the same cell
+    return (round(float(lonlat[0]), 7), round(float(lonlat[1]), 7))
+
+
+def travel_matrix(graph, sources, targets, strategy=STRATEGY_FASTEST, cache=None):
+    """
+    Dense distance and duration matrices between two lists of locations
+
+    Args:
+        graph: RoutingGraph
+        sources: list of (lon, lat) origins
+        targets: list of (lon, lat) destinations
+        strategy: 0 (Shortest) or 1 (Fastest) path between each pair
+        cache: Optional MatrixCache shared across requests
+
+    Returns:
+        (distances, durations) float arrays of shape (len(sources), len(targets))
+        in metres and seconds, NaN where a target cannot be reached
+    """
+    strategy = _strategy_index(strategy)
+    distances = np.full((len(sources), len(targets)), np.nan)
+    durations = np.full((len(sources), len(targets)), np.nan)
+    target_keys = [_location_key(t) for t in targets]
+    target_snaps = {}
+
+    for i, source in enumerate(sources):
+        source_key = _location_key(source)
+        missing = []
+        for j, target_key in enumerate(target_keys):
+            cell = cache.get((strategy, source_key, target_key)) if cache is not None else None
+            if cell is None:
+                missing.append(j)
+            else:
+                distances[i, j], durations[i, j] = cell
+
+        if not missing:
+            continue
+
+        for j in missing:
+            if j not in target_snaps:
+                target_snaps[j] = graph.snap_lonlat(*targets[j])
+
+        # One search tree from this source covers all of its missing targets
+        results = graph.route_snaps(
+            graph.snap_lonlat(*source),
+            [target_snaps[j] for j in missing],
+            strategy,
+            geometry=False
+        )
+        for j, result in zip(missing, results):
+            cell = (result['length'], result['duration']) if result is not None else (np.nan, np.nan)
+            distances[i, j], durations[i, j] = cell
+            if cache is not None:
+                cache.put((strategy, source_key, target_keys[j]), cell)
+
+    return distances, durations
@@ -0,0 +1,56 @@
+"""
+Network Fingerprint
+Short hash of the road network file and the routing parameters, used to
+namespace cached routes so new speed data or model settings never serve
+routes computed on the old ones
+"""
+
+import hashlib
+import os
+
+
+# Bump when the layout of cached route documents changes
+CACHE_VERSION = 1
+
+_digests = {}
+
+
+def file_digest(path):
+    """
+    SHA-256 of a file's content, memoized on (path, size, mtime)
+
+    Returns:
+        Hex digest, or 'missing' if the file does not exist
+    """
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return 'missing'
+    key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+    digest = _digests.get(key)
+    if digest is None:
+        sha = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                sha.update(chunk)
+        digest = sha.hexdigest()
+        _digests[key] = digest
+    return digest
+
+
+def network_fingerprint(network_file, *params):
+    """
+    Cache namespace for routes computed on `network_file` with `params`
+
+    Args:
+        network_file: Path to the road network layer
+        *params: Anything else that changes the computed routes (strategy,
+            default speed, tolerance, model file digests, ...)
+
+    Returns:
+        String like 'v1-3f9a0c1b2d4e'
+    """
+    sha = hashlib.sha256(file_digest(network_file).encode())
+    for param in params:
+        sha.update(b'\0' + repr(param).encode())
+    return f"v{CACHE_VERSION}-{sha.hexdigest()[:12]}"
@@ -0,0 +1,525 @@
+"""
+Native Network Graph Routing Engine
+Loads the road network (viteze_drum300.gpkg) once into CSR adjacency arrays and
+answers shortest/fastest queries with a heap-based Dijkstra, reproducing the
+parameters of the ShortestPathPointToLayer_zipcodes_v5 QGIS model in-process
+"""
+
+import heapq
+import math
+
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+import shapely
+from pyproj import Transformer
+from shapely.geometry import LineString
+
+
+# Same values run_routing.py passes to the QGIS model
+STRATEGY_SHORTEST = 0
+STRATEGY_FASTEST = 1
+DEFAULT_SPEED = 50          # km/h, used when speed_class is missing
+TOPOLOGY_TOLERANCE = 0      # metres
+
+DIRECTION_FIELD = 'oneway'
+SPEED_FIELD = 'speed_class'
+VALUE_FORWARD = 'yes'       # VALUE_BACKWARD/VALUE_BOTH are empty: default is both
+
+KMH_TO_MS = 1000.0 / 3600.0
+
+
+def _strategy_index(strategy):
+    """Accept 0/1 or 'Shortest'/'Fastest' like the model parameters"""
+    if isinstance(strategy, str):
+        return STRATEGY_SHORTEST if strategy.strip().lower() == 'shortest' else STRATEGY_FASTEST
+    return STRATEGY_FASTEST if int(strategy) else STRATEGY_SHORTEST
+
+
+def parse_strategy(strategy):
+    """
+    Strictly parse a strategy given by a client
+
+    Args:
+        strategy: 0/1 (int or numeric string) or 'Shortest'/'Fastest' in any case
+
+    Returns:
+        STRATEGY_SHORTEST or STRATEGY_FASTEST
+
+    Raises:
+        ValueError: for any other value
+    """
+    if isinstance(strategy, str):
+        name = strategy.strip().lower()
+        if name in ('shortest', '0'):
+            return STRATEGY_SHORTEST
+        if name in ('fastest', '1'):
+            return STRATEGY_FASTEST
+    elif not isinstance(strategy, bool) and strategy in (STRATEGY_SHORTEST, STRATEGY_FASTEST):
+        return int(strategy)
+    raise ValueError(f"Unknown strategy {strategy!r}, expected 0/1 or 'Shortest'/'Fastest'")
+
+
+def _lonlat_key(lon, lat):
+    # ~1 cm, the same rounding as the travel matrix cache
+    return (round(float(lon), 7), round(float(lat), 7))
+
+
+def _merge_vertices(coords, tolerance):
+    """
+    Assign a node id to every vertex, merging vertices closer than `tolerance`
+
+    With tolerance 0 only identical coordinates are merged, otherwise vertices
+    are clustered greedily through a grid of `tolerance`-sized cells.
+
+    Returns:
+        (node_of_vertex, node_xy)
+    """
+    if tolerance <= 0:
+        node_xy, node_of_vertex = np.unique(coords, axis=0, return_inverse=True)
+        return node_of_vertex.reshape(-1), node_xy
+
+    cells = {}
+    node_xy = []
+    node_of_vertex = np.empty(len(coords), dtype=np.int64)
+    tol_sq = tolerance * tolerance
+    for i, (x, y) in enumerate(coords.tolist()):
+        cx, cy = math.floor(x / tolerance), math.floor(y / tolerance)
+        found = -1
+        for gx in (cx - 1, cx, cx + 1):
+            for gy in (cy - 1, cy, cy + 1):
+                for node in cells.get((gx, gy), ()):
+                    nx, ny = node_xy[node]
+                    if (nx - x) ** 2 + (ny - y) ** 2 <= tol_sq:
+                        found = node
+                        break
+                if found >= 0:
+                    break
+            if found >= 0:
+                break
+        if found < 0:
+            found = len(node_xy)
+            node_xy.append((x, y))
+            cells.setdefault((cx, cy), []).append(found)
+        node_of_vertex[i] = found
+    return node_of_vertex, np.asarray(node_xy, dtype=float)
+
+
+class RoutingGraph:
+    """
+    Directed road graph stored as CSR arrays
+
+    Every segment of every network line becomes an edge; lines whose
+    `oneway` value is 'yes' are only traversable in digitizing direction,
+    all others in both directions. Edge costs are the segment length
+    (Shortest) or the travel time in seconds at `speed_class` km/h (Fastest).
+    """
+
+    def __init__(self, node_xy, seg_a, seg_b, seg_speed, seg_oneway, crs):
+        self.crs = crs
+        self.node_xy = node_xy
+        self.seg_a = seg_a
+        self.seg_b = seg_b
+        self.seg_length = np.hypot(*(node_xy[seg_b] - node_xy[seg_a]).T)
+        self.seg_speed = seg_speed
+        self.seg_oneway = seg_oneway
+        self.seg_time = self.seg_length / (seg_speed * KMH_TO_MS)
+
+        # Directed edges: every segment forward, two-way segments backward too
+        two_way = ~seg_oneway
+        src = np.concatenate([seg_a, seg_b[two_way]])
+        dst = np.concatenate([seg_b, seg_a[two_way]])
+        seg = np.concatenate([np.arange(len(seg_a)), np.nonzero(two_way)[0]])
+
+        order = np.argsort(src, kind='stable')
+        self.edge_dst = dst[order]
+        self.edge_seg = seg[order]
+        self.indptr = np.zeros(len(node_xy) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(src, minlength=len(node_xy)), out=self.indptr[1:])
+
+        self.edge_weights = (
+            self.seg_length[self.edge_seg],
+            self.seg_time[self.edge_seg],
+        )
+
+        # Plain lists are much faster than numpy scalars inside the Dijkstra loop
+        self._indptr = self.indptr.tolist()
+        self._dst = self.edge_dst.tolist()
+        self._weights = tuple(w.tolist() for w in self.edge_weights)
+
+        self._tree = shapely.STRtree(
+            shapely.linestrings(np.stack([node_xy[seg_a], node_xy[seg_b]], axis=1))
+        )
+        self._to_graph = Transformer.from_crs('EPSG:4326', crs, always_xy=True)
+        self._to_wgs84 = Transformer.from_crs(crs, 'EPSG:4326', always_xy=True)
+        self._node_tree = None
+        # (lon, lat) -> snap of points snapped ahead of time
+        self._snap_table = {}
+
+    @property
+    def node_count(self):
+        return len(self.node_xy)
+
+    @property
+    def edge_count(self):
+        return len(self.edge_dst)
+
+    @classmethod
+    def from_file(cls, network_file, **kwargs):
+        """Load the network line layer and build the graph"""
+        return cls.from_gdf(gpd.read_file(network_file), **kwargs)
+
+    @classmethod
+    def from_gdf(cls, network_gdf, default_speed=DEFAULT_SPEED, tolerance=TOPOLOGY_TOLERANCE,
+                 direction_field=DIRECTION_FIELD, speed_field=SPEED_FIELD,
+                 value_forward=VALUE_FORWARD):
+        """
+        Build the graph from a GeoDataFrame of lines
+
+        Args:
+            network_gdf: Road network lines
+            default_speed: Speed (km/h) for lines without a usable speed_class
+            tolerance: Topology tolerance in metres
+            direction_field: Field holding the line direction
+            speed_field: Field holding the speed in km/h
+            value_forward: Direction value meaning "digitizing direction only"
+
+        Returns:
+            RoutingGraph
+        """
+        lines = network_gdf[network_gdf.geometry.notna() & ~network_gdf.geometry.is_empty]
+        if lines.crs is None:
+            lines = lines.set_crs('EPSG:4326')
+        if lines.crs.is_geographic:
+            # Lengths and the tolerance are in metres
+            lines = lines.to_crs(lines.estimate_utm_crs())
+        lines = lines.explode(index_parts=False).reset_index(drop=True)
+
+        if speed_field in lines.columns:
+            speeds = pd.to_numeric(lines[speed_field], errors='coerce').to_numpy(dtype=float)
+            speeds = np.where(np.isfinite(speeds) & (speeds > 0), speeds, default_speed)
+        else:
+            speeds = np.full(len(lines), float(default_speed))
+
+        if direction_field in lines.columns:
+            direction = lines[direction_field].fillna('').astype(str).str.strip()
+            oneway = (direction == value_forward).to_numpy()
+        else:
+            oneway = np.zeros(len(lines), dtype=bool)
+
+        coords, line_of_vertex = shapely.get_coordinates(lines.geometry.values, return_index=True)
+        node_of_vertex, node_xy = _merge_vertices(coords, tolerance)
+
+        same_line = line_of_vertex[:-1] == line_of_vertex[1:]
+        seg_a = node_of_vertex[:-1][same_line]
+        seg_b = node_of_vertex[1:][same_line]
+        seg_line = line_of_vertex[:-1][same_line]
+
+        # Vertices merged by the tolerance produce zero-length loops
+        keep = seg_a != seg_b
+        seg_a, seg_b, seg_line = seg_a[keep], seg_b[keep], seg_line[keep]
+
+        return cls(node_xy, seg_a, seg_b, speeds[seg_line], oneway[seg_line], lines.crs)
+
+    # -- snapping -----------------------------------------------------------
+
+    def from_lonlat(self, lons, lats):
+        """Graph CRS (xs, ys) arrays of EPSG:4326 points"""
+        xs, ys = self._to_graph.transform(np.asarray(lons, dtype=float), np.asarray(lats, dtype=float))
+        return np.asarray(xs), np.asarray(ys)
+
+    def to_lonlat(self, xs, ys):
+        """EPSG:4326 (lons, lats) arrays of points given in the graph CRS"""
+        lons, lats = self._to_wgs84.transform(np.asarray(xs, dtype=float), np.asarray(ys, dtype=float))
+        return np.asarray(lons), np.asarray(lats)
+
+    def snap(self, x, y):
+        """
+        Snap a point (graph CRS) onto the nearest network segment
+
+        Returns:
+            dict with the segment index, the fraction `t` along it (from seg_a
+            to seg_b), the offset along it in metres, the projected point and
+            the snapping distance
+        """
+        return self.snap_many([x], [y])[0]
+
+    def snap_many(self, xs, ys):
+        """snap() for many points (graph CRS) with one STRtree query and vectorized projection"""
+        xs = np.asarray(xs, dtype=float)
+        ys = np.asarray(ys, dtype=float)
+        if len(xs) == 0:
+            return []
+        segs = np.asarray(self._tree.nearest(shapely.points(xs, ys)), dtype=np.int64)
+        a = self.node_xy[self.seg_a[segs]]
+        d = self.node_xy[self.seg_b[segs]] - a
+        denom = (d * d).sum(axis=1)
+        along = (xs - a[:, 0]) * d[:, 0] + (ys - a[:, 1]) * d[:, 1]
+        t = np.clip(np.divide(along, denom, out=np.zeros_like(along), where=denom > 0), 0.0, 1.0)
+        px = a[:, 0] + t * d[:, 0]
+        py = a[:, 1] + t * d[:, 1]
+        distance = np.hypot(xs - px, ys - py)
+        offset = t * self.seg_length[segs]
+        return [
+            {'segment': seg, 't': tt, 'point': (x, y), 'distance': dist, 'offset': off}
+            for seg, tt, x, y, dist, off in zip(
+                segs.tolist(), t.tolist(), px.tolist(), py.tolist(), distance.tolist(), offset.tolist())
+        ]
+
+    def snap_lonlat(self, lon, lat):
+        snap = self._snap_table.get(_lonlat_key(lon, lat))
+        if snap is not None:
+            return snap
+        x, y = self._to_graph.transform(lon, lat)
+        return self.snap(x, y)
+
+    def snap_lonlat_many(self, lons, lats):
+        """snap_lonlat() for many EPSG:4326 points; precomputed snaps are reused"""
+        snaps = [self._snap_table.get(_lonlat_key(lon, lat)) for lon, lat in zip(lons, lats)]
+        missing = [i for i, snap in enumerate(snaps) if snap is None]
+        if missing:
+            xs, ys = self._to_graph.transform(
+                np.asarray(lons, dtype=float)[missing], np.asarray(lats, dtype=float)[missing])
+            for i, snap in zip(missing, self.snap_many(xs, ys)):
+                snaps[i] = snap
+        return snaps
+
+    def precompute_snaps(self, lons, lats):
+        """
+        Snap a fixed set of EPSG:4326 points (the postcode points) once; later
+        snap_lonlat() calls for these coordinates are a dict lookup
+
+        Returns:
+            Number of points in the snap table
+        """
+        lons = np.asarray(lons, dtype=float)
+        lats = np.asarray(lats, dtype=float)
+        xs, ys = self._to_graph.transform(lons, lats)
+        snaps = self.snap_many(xs, ys)
+        self._snap_table.update(
+            (_lonlat_key(lon, lat), snap) for lon, lat, snap in zip(lons.tolist(), lats.tolist(), snaps))
+        return len(self._snap_table)
+
+    def nearest_nodes(self, xs, ys):
+        """
+        Nearest graph node of each point (graph CRS)
+
+        Returns:
+            (node ids, distances) arrays
+        """
+        if self._node_tree is None:
+            self._node_tree = shapely.STRtree(shapely.points(self.node_xy))
+        points = shapely.points(np.asarray(xs, dtype=float), np.asarray(ys, dtype=float))
+        nodes = np.asarray(self._node_tree.nearest(points), dtype=np.int64)
+        return nodes, shapely.distance(points, shapely.points(self.node_xy[nodes]))
+
+    def _segment_costs(self, seg, strategy):
+        weight = self.seg_time[seg] if strategy == STRATEGY_FASTEST else self.seg_length[seg]
+        return float(weight), float(self.seg_length[seg]), float(self.seg_time[seg])
+
+    def seeds(self, snap, strategy):
+        """Costs from a snapped start point to the ends of its segment"""
+        seg, t = snap['segment'], snap['t']
+        cost, length, duration = self._segment_costs(seg, strategy)
+        seeds = [(int(self.seg_b[seg]), (1 - t) * cost, (1 - t) * length, (1 - t) * duration)]
+        if not self.seg_oneway[seg] or t == 0:
+            seeds.append((int(self.seg_a[seg]), t * cost, t * length, t * duration))
+        return seeds
+
+    def entries(self, snap, strategy):
+        """Costs from the ends of its segment to a snapped end point"""
+        seg, t = snap['segment'], snap['t']
+        cost, length, duration = self._segment_costs(seg, strategy)
+        entries = [(int(self.seg_a[seg]), t * cost, t * length, t * duration)]
+        if not self.seg_oneway[seg] or t == 1:
+            entries.append((int(self.seg_b[seg]), (1 - t) * cost, (1 - t) * length, (1 - t) * duration))
+        return entries
+
+    # -- search -------------------------------------------------------------
+
+    def dijkstra(self, seeds, strategy=STRATEGY_FASTEST, targets=None):
+        """
+        Heap-based Dijkstra from one or more seeded nodes
+
+        Args:
+            seeds: list of (node, initial_cost) pairs
+            strategy: 0 (Shortest) or 1 (Fastest)
+            targets: Optional set of nodes; the search stops once all are settled
+
+        Returns:
+            (dist, pred) dicts; pred maps node -> (previous node, edge index)
+        """
+        weights = self._weights[_strategy_index(strategy)]
+        indptr, dst = self._indptr, self._dst
+        dist = {}
+        pred = {}
+        heap = []
+        for node, cost in seeds:
+            if cost < dist.get(node, math.inf):
+                dist[node] = cost
+                pred[node] = (-1, -1)
+                heap.append((cost, node))
+        heapq.heapify(heap)
+
+        remaining = set(targets) if targets is not None else None
+        settled = set()
+        while heap:
+            d, u = heapq.heappop(heap)
+            if u in settled:
+                continue
+            settled.add(u)
+            if remaining is not None:
+                remaining.discard(u)
+                if not remaining:
+                    break
+            for e in range(indptr[u], indptr[u + 1]):
+                v = dst[e]
+                nd = d + weights[e]
+                if nd < dist.get(v, math.inf):
+                    dist[v] = nd
+                    pred[v] = (u, e)
+                    heapq.heappush(heap, (nd, v))
+        return dist, pred
+
+    def _path_edges(self, pred, node):
+        edges = []
+        while True:
+            prev, edge = pred[node]
+            if prev < 0:
+                return node, edges[::-1]
+            edges.append(edge)
+            node = prev
+
+    def _build_route(self, pred, entry, seed_costs):
+        """Nodes, length and duration of the route reaching the end point through `entry`"""
+        entry_node, _, entry_length, entry_duration = entry
+        first_node, edges = self._path_edges(pred, entry_node)
+        _, _, seed_length, seed_duration = seed_costs[first_node]
+
+        segs = self.edge_seg[edges] if edges else np.empty(0, dtype=np.int64)
+        length = seed_length + float(self.seg_length[segs].sum()) + entry_length
+        duration = seed_duration + float(self.seg_time[segs].sum()) + entry_duration
+
+        nodes = [first_node] + [self._dst[e] for e in edges]
+        return nodes, length, duration
+
+    def route(self, start_xy, end_xy, strategy=STRATEGY_FASTEST):
+        """
+        Shortest or fastest route between two points given in EPSG:4326
+
+        Returns:
+            dict with `coordinates` (lon/lat), `length` (m), `duration` (s) and
+            `cost`, or None if the end point cannot be reached
+        """
+        routes = self.route_many(start_xy, [end_xy], strategy)
+        return routes[0]
+
+    def route_many(self, start_xy, end_xys, strategy=STRATEGY_FASTEST):
+        """Routes from one start point to several end points (EPSG:4326)"""
+        start_snap = self.snap_lonlat(*start_xy)
+        end_snaps = self.snap_lonlat_many([xy[0] for xy in end_xys], [xy[1] for xy in end_xys])
+        return self.route_snaps(start_snap, end_snaps, strategy)
+
+    def route_snaps(self, start_snap, end_snaps, strategy=STRATEGY_FASTEST, geometry=True):
+        """
+        Routes between points already snapped with snap()/snap_lonlat()
+
+        With geometry=False only length, duration and cost are returned, which
+        skips building and reprojecting the coordinates.
+        """
+        strategy = _strategy_index(strategy)
+        seeds = self.seeds(start_snap, strategy)
+        seed_costs = {}
+        for seed in seeds:
+            if seed[0] not in seed_costs or seed[1] < seed_costs[seed[0]][1]:
+                seed_costs[seed[0]] = seed
+
+        targets = {entry[0] for snap in end_snaps for entry in self.entries(snap, strategy)}
+        dist, pred = self.dijkstra([(s[0], s[1]) for s in seed_costs.values()], strategy, targets)
+
+        return [self._finish(start_snap, snap, dist, pred, seed_costs, strategy, geometry) for snap in end_snaps]
+
+    def _finish(self, start_snap, end_snap, dist, pred, seed_costs, strategy, geometry=True):
+        best = None
+        best_cost = math.inf
+        for entry in self.entries(end_snap, strategy):
+            cost = dist.get(entry[0], math.inf) + entry[1]
+            if cost < best_cost:
+                best, best_cost = entry, cost
+
+        if best is None:
+            return self.assemble_route(start_snap, end_snap, strategy, math.inf, None, 0.0, 0.0, geometry)
+        nodes, length, duration = self._build_route(pred, best, seed_costs)
+        return self.assemble_route(start_snap, end_snap, strategy, best_cost, nodes, length, duration, geometry)
+
+    def assemble_route(self, start_snap, end_snap, strategy, cost, nodes, length, duration, geometry=True):
+        """
+        Turn a node path between two snapped points into a route result
+
+        Args:
+            start_snap, end_snap: Snapped end points of the route
+            strategy: 0 (Shortest) or 1 (Fastest)
+            cost: Total cost of the path, math.inf if none was found
+            nodes: Graph nodes from the start segment to the end segment, or None
+            length, duration: Totals of the path including the partial segments
+            geometry: Include the lon/lat coordinates of the route
+
+        Returns:
+            Route dict (see route()) or None
+        """
+        xy = None
+        if nodes is not None:
+            xy = [start_snap['point'], end_snap['point']]
+            if geometry:
+                xy[1:1] = [tuple(p) for p in self.node_xy[nodes].tolist()]
+
+        # Start and end on the same segment may not need to leave it at all
+        if start_snap['segment'] == end_snap['segment']:
+            seg = start_snap['segment']
+            ts, te = start_snap['t'], end_snap['t']
+            if te >= ts or not self.seg_oneway[seg]:
+                seg_cost, seg_length, seg_duration = self._segment_costs(seg, strategy)
+                fraction = abs(te - ts)
+                if fraction * seg_cost <= cost:
+                    cost = fraction * seg_cost
+                    xy = [start_snap['point'], end_snap['point']]
+                    length, duration = fraction * seg_length, fraction * seg_duration
+
+        if xy is None:
+            return None
+
+        result = {'length': length, 'duration': duration, 'cost': cost}
+        if geometry:
+            lon, lat = self._to_wgs84.transform(*zip(*xy))
+            result['coordinates'] = list(zip(lon, lat))
+        return result
+
+
+def routes_to_gdf(start_xy, routes, end_points):
+    """
+    Build the same output table as the QGIS model (FinalShortestPath)
+
+    Args:
+        start_xy: (lon, lat) of the start point
+        routes: Results of RoutingGraph.route_many, aligned with end_points
+        end_points: GeoDataFrame of end points in EPSG:4326
+
+    Returns:
+        GeoDataFrame with start, end, postcode, city, address, length
+    """
+    rows = []
+    for (_, end_row), result in zip(end_points.iterrows(), routes):
+        if result is None:
+            continue
+        end_geom = end_row.geometry
+        rows.append({
+            'start': f"{start_xy[0]},{start_xy[1]}",
+            'end': f"{end_geom.x},{end_geom.y}",
+            'postcode': end_row.get('postcode'),
+            'city': end_row.get('city'),
+            'address': end_row.get('address'),
+            'length': round(result['length'], 2),
+            'geometry': LineString(result['coordinates']),
+        })
+    columns = ['start', 'end', 'postcode', 'city', 'address', 'length', 'geometry']
+    return gpd.GeoDataFrame(rows, columns=columns, geometry='geometry', crs='EPSG:4326')
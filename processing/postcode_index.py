@@ -0,0 +1,72 @@
+"""
+Postcode Hash Index
+Maps each postcode to the row positions of a GeoDataFrame so lookups are a
+dict access instead of a boolean-mask scan over the whole frame
+"""
+
+import numpy as np
+
+import geodesic
+
+
+class PostcodeIndex:
+    """
+    postcode -> row positions of `frame`, with the matching sub-frames cached
+
+    Returned sub-frames are shared between requests and must be treated as
+    read-only; copy() them before adding columns.
+    """
+
+    def __init__(self, frame, column='postcode'):
+        self.frame = frame
+        self.column = column
+        self.positions = {
+            key: np.asarray(rows, dtype=np.int64)
+            for key, rows in frame.groupby(column, sort=False).indices.items()
+        }
+        self._empty = frame.iloc[0:0]
+        self._groups = {}
+        self._coordinates = None
+
+    def __contains__(self, postcode):
+        return postcode in self.positions
+
+    def __len__(self):
+        return len(self.positions)
+
+    def get(self, postcode):
+        """Rows for one postcode (same result as frame[frame[column] == postcode])"""
+        group = self._groups.get(postcode)
+        if group is None:
+            rows = self.positions.get(postcode)
+            if rows is None:
+                return self._empty
+            group = self.frame.iloc[rows]
+            self._groups[postcode] = group
+        return group
+
+    def get_many(self, postcodes):
+        """Rows for several postcodes, in frame order like frame[column].isin(postcodes)"""
+        rows = [self.positions[p] for p in set(postcodes) if p in self.positions]
+        if not rows:
+            return self._empty
+        return self.frame.iloc[np.sort(np.concatenate(rows))]
+
+    def coordinates(self):
+        """Longitude and latitude arrays of the frame's points, extracted once"""
+        if self._coordinates is None:
+            self._coordinates = geodesic.coordinates(self.frame)
+        return self._coordinates
+
+    def nearest(self, lon, lat, k=1):
+        """
+        The k rows closest to (lon, lat) in straight-line distance, closest first
+
+        Returns:
+            Sub-frame with a `distance` column in meters (a copy)
+        """
+        lons, lats = self.coordinates()
+        rows, distances = geodesic.nearest(lon, lat, lons, lats, k)
+        nearest_rows = self.frame.iloc[rows].copy()
+        nearest_rows['distance'] = distances
+        return nearest_rows
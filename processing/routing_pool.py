@@ -0,0 +1,353 @@
+"""
+Persistent QGIS Routing Worker Pool
+Keeps a set of pre-initialized QGIS processes alive so routing requests skip
+the QgsApplication/Processing start-up and the network layer reload
+"""
+
+import multiprocessing
+import os
+import queue
+import sys
+import threading
+import time
+
+
+PROCESSING_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def _worker_main(conn, network_file):
+    """
+    Entry point of a routing worker process
+
+    Initializes QGIS once, loads the network layer once and then answers
+    messages received over the pipe until it is told to stop:
+        ('ping',)                      -> ('pong', pid)
+        ('route', start, end, output)  -> ('ok', output) or ('error', message)
+        ('route_features', starts, ends, progress)
+                                       -> ('ok', [(wkb, attributes), ...])
+                                          or ('error', message), preceded by
+                                          ('progress', percent) messages when
+                                          progress is true
+        ('stop',)                      -> exits
+    """
+    if PROCESSING_DIR not in sys.path:
+        sys.path.insert(0, PROCESSING_DIR)
+
+    import run_routing
+
+    qgs = run_routing.init_qgis()
+    try:
+        network = run_routing.load_network(network_file)
+    except Exception as e:
+        conn.send(('error', str(e)))
+        qgs.exitQgis()
+        return
+
+    conn.send(('ready', os.getpid()))
+
+    while True:
+        try:
+            message = conn.recv()
+        except (EOFError, OSError):
+            break
+
+        kind = message[0]
+        if kind == 'ping':
+            conn.send(('pong', os.getpid()))
+        elif kind == 'route':
+            _, start, end, output = message
+            try:
+                # Intermediate steps stay in memory so concurrent workers never
+                # write to the same GPKG in the working directory
+                run_routing.route(
+                    start, end, output, network=network,
+                    length_output='TEMPORARY_OUTPUT',
+                    shortest_path_output='TEMPORARY_OUTPUT'
+                )
+                conn.send(('ok', output))
+            except Exception as e:
+                conn.send(('error', str(e)))
+        elif kind == 'route_features':
+            _, starts, ends, progress = message
+            try:
+                feedback = _progress_feedback(conn) if progress else None
+                conn.send(('ok', run_routing.route_features(starts, ends, network=network, feedback=feedback)))
+            except Exception as e:
+                conn.send(('error', str(e)))
+        elif kind == 'stop':
+            break
+
+    qgs.exitQgis()
+
+
+def _progress_feedback(conn):
+    """Processing feedback forwarding whole-percent model progress over the pipe"""
+    from qgis.core import QgsProcessingFeedback
+
+    feedback = QgsProcessingFeedback()
+    last = [-1]
+
+    def send(percent):
+        if int(percent) != last[0]:
+            last[0] = int(percent)
+            conn.send(('progress', float(percent)))
+
+    feedback.progressChanged.connect(send)
+    return feedback
+
+
+class _Worker:
+    """Handle on one worker process and the parent end of its pipe"""
+
+    def __init__(self, context, network_file):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(
+            target=_worker_main,
+            args=(child_conn, network_file),
+            daemon=True
+        )
+        self.process.start()
+        child_conn.close()
+        self.pid = self.process.pid
+        self.jobs_done = 0
+
+    def wait_ready(self, timeout):
+        if not self.conn.poll(timeout):
+            raise TimeoutError(f"Routing worker {self.pid} did not start in {timeout}s")
+        status, payload = self.conn.recv()
+        if status != 'ready':
+            raise RuntimeError(f"Routing worker {self.pid} failed to start: {payload}")
+
+    def request(self, message, timeout, on_progress=None):
+        self.conn.send(message)
+        deadline = time.monotonic() + timeout
+        while True:
+            if not self.conn.poll(max(0, deadline - time.monotonic())):
+                raise TimeoutError(f"Routing worker {self.pid} did not answer in {timeout}s")
+            reply = self.conn.recv()
+            if reply[0] != 'progress':
+                return reply
+            if on_progress is not None:
+                try:
+                    on_progress(reply[1])
+                except Exception as e:
+                    # Keep draining: the rest of this run must not be left in the pipe
+                    print(f"❌ Routing progress callback failed: {e}")
+                    on_progress = None
+
+    def is_alive(self):
+        return self.process.is_alive()
+
+    def stop(self, timeout=5):
+        try:
+            if self.process.is_alive():
+                self.conn.send(('stop',))
+            self.process.join(timeout)
+        except (OSError, BrokenPipeError):
+            pass
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join(timeout)
+        self.conn.close()
+
+
+class RoutingWorkerPool:
+    """
+    Pool of long-lived QGIS routing workers
+
+    Jobs are handed to an idle worker over its pipe; a crashed or hung worker
+    is replaced by a fresh one, and a monitor thread pings idle workers every
+    `health_interval` seconds.
+    """
+
+    def __init__(self, size=2, network_file=None, job_timeout=300,
+                 startup_timeout=120, health_interval=30):
+        self.size = max(1, int(size))
+        self.network_file = network_file or os.path.join('.', 'data', 'viteze_drum300.gpkg')
+        self.job_timeout = job_timeout
+        self.startup_timeout = startup_timeout
+        self.health_interval = health_interval
+
+        self._context = multiprocessing.get_context('spawn')
+        self._idle = queue.Queue()
+        self._workers = {}
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._monitor = None
+        self.restarts = 0
+
+    def start(self):
+        """Spawn all workers and wait until they report ready"""
+        for _ in range(self.size):
+            self._idle.put(self._spawn())
+
+        self._monitor = threading.Thread(target=self._monitor_loop, daemon=True)
+        self._monitor.start()
+        print(f"✅ Routing worker pool started with {self.size} workers")
+        return self
+
+    def _spawn(self):
+        worker = _Worker(self._context, self.network_file)
+        try:
+            worker.wait_ready(self.startup_timeout)
+        except Exception:
+            worker.stop()
+            raise
+        with self._lock:
+            self._workers[worker.pid] = worker
+        return worker
+
+    def _replace(self, worker):
+        """Stop a broken worker and return a freshly started one"""
+        with self._lock:
+            self._workers.pop(worker.pid, None)
+            self.restarts += 1
+        worker.stop()
+        print(f"❌ Restarting routing worker {worker.pid}")
+        return self._spawn()
+
+    def _release(self, worker, healthy):
+        if not healthy or not worker.is_alive():
+            try:
+                worker = self._replace(worker)
+            except Exception as e:
+                print(f"❌ Could not restart routing worker: {e}")
+                # Keep the pool size constant; the next health check retries
+                with self._lock:
+                    self._workers.pop(worker.pid, None)
+                self._idle.put(None)
+                return
+        self._idle.put(worker)
+
+    def _acquire(self, timeout):
+        worker = self._idle.get(timeout=timeout)
+        if worker is None:
+            # Placeholder left by a failed restart
+            try:
+                worker = self._spawn()
+            except Exception:
+                self._idle.put(None)
+                raise
+        return worker
+
+    def submit(self, start, end, output, timeout=None):
+        """
+        Run one routing job on an idle worker
+
+        Args:
+            start: Path to the starting point layer
+            end: Path to the end point layer
+            output: Path of the final shortest path output
+            timeout: Seconds to wait for the result (defaults to job_timeout)
+
+        Returns:
+            The output path, or None if routing failed
+        """
+        return self._run(('route', start, end, output), timeout)
+
+    def submit_features(self, starts, ends, timeout=None, on_progress=None):
+        """
+        Run one routing job on in-memory layers, with no files on either side
+
+        Args:
+            starts: list of (lon, lat, attributes) start points
+            ends: list of (lon, lat, attributes) end points
+            timeout: Seconds to wait for the result (defaults to job_timeout)
+            on_progress: Optional callable receiving the model progress (0-100)
+
+        Returns:
+            list of (wkb, attributes) route features, or None if routing failed
+        """
+        return self._run(('route_features', starts, ends, on_progress is not None), timeout, on_progress)
+
+    def _run(self, message, timeout, on_progress=None):
+        if self._stopped.is_set():
+            raise RuntimeError("Routing worker pool is shut down")
+
+        timeout = timeout or self.job_timeout
+        worker = self._acquire(timeout)
+        healthy = True
+        try:
+            status, payload = worker.request(message, timeout, on_progress)
+            worker.jobs_done += 1
+            if status != 'ok':
+                print(f"❌ Routing worker {worker.pid} failed: {payload}")
+                return None
+            return payload
+        except (TimeoutError, EOFError, OSError) as e:
+            print(f"❌ Routing worker {worker.pid} crashed: {e}")
+            healthy = False
+            return None
+        except BaseException:
+            # The pipe may still hold part of this run; never hand the worker to another job
+            healthy = False
+            raise
+        finally:
+            self._release(worker, healthy)
+
+    def health_check(self, timeout=5):
+        """
+        Ping every idle worker and restart the ones that do not answer
+
+        Returns:
+            list of dicts with pid, alive and jobs_done per checked worker
+        """
+        report = []
+        checked = []
+        while True:
+            try:
+                worker = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            checked.append(worker)
+
+        for worker in checked:
+            if worker is None:
+                self._release(_DeadWorker(), False)
+                continue
+            healthy = True
+            try:
+                healthy = worker.is_alive() and worker.request(('ping',), timeout)[0] == 'pong'
+            except (TimeoutError, EOFError, OSError):
+                healthy = False
+            report.append({'pid': worker.pid, 'alive': healthy, 'jobs_done': worker.jobs_done})
+            self._release(worker, healthy)
+        return report
+
+    def stats(self):
+        with self._lock:
+            pids = list(self._workers)
+        return {
+            'size': self.size,
+            'workers': pids,
+            'idle': self._idle.qsize(),
+            'restarts': self.restarts,
+        }
+
+    def _monitor_loop(self):
+        while not self._stopped.wait(self.health_interval):
+            try:
+                self.health_check()
+            except Exception as e:
+                print(f"❌ Routing pool health check failed: {e}")
+
+    def shutdown(self):
+        """Stop the monitor and all worker processes"""
+        self._stopped.set()
+        with self._lock:
+            workers = list(self._workers.values())
+            self._workers.clear()
+        for worker in workers:
+            worker.stop()
+
+
+class _DeadWorker:
+    """Stand-in passed to _release to replace a missing pool slot"""
+
+    pid = None
+
+    def is_alive(self):
+        return False
+
+    def stop(self, timeout=5):
+        pass
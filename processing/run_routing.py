@@ -2,11 +2,18 @@ import os
 import sys
 from qgis.core import (
     QgsApplication,
+    QgsFeature,
+    QgsField,
+    QgsGeometry,
+    QgsPointXY,
+    QgsProcessingContext,
+    QgsProcessingUtils,
     QgsVectorLayer,
     QgsVectorFileWriter,
     QgsWkbTypes
 )
 from qgis.analysis import QgsNativeAlgorithms
+from qgis.PyQt.QtCore import QVariant
 from processing.core.Processing import Processing
 from qgis import processing
 from shortest_path import ShortestPathPointToLayer_zipcodes_v5
@@ -17,37 +24,170 @@ from shortest_path import ShortestPathPointToLayer_zipcodes_v5
 os.environ["QT_QPA_PLATFORM"] = "offscreen"
 # Set the QGIS prefix path
 QGIS_PREFIX_PATH = "C:/Program Files/QGIS 3.32.3/apps/qgis"
-# Initialize the QGIS Application
-QgsApplication.setPrefixPath(QGIS_PREFIX_PATH, True)
-qgs = QgsApplication([], False)
-qgs.initQgis()
-Processing.initialize()
-QgsApplication.processingRegistry().addProvider(QgsNativeAlgorithms())
 
+NETWORK_FILE = "./data/viteze_drum300.gpkg"
 
+# Attributes of the end points carried into the final shortest path table
+POINT_FIELDS = ("postcode", "city", "address")
 
-routing = ShortestPathPointToLayer_zipcodes_v5()
-params = {
-    "pathtypetocalculate0shortest1fastest": 1,  # Default: Fastest (1)
-    "pathtypetocalculatetypeshortestorfastest": "Fastest",  # Default: "Fastest"
 
-    "roadclassification (16)": "./data/viteze_drum300.gpkg",  # Line layer
-    "roadclassification (16) (2)": sys.argv[2],  # Point layer
-    "roadclassification (16) (2) (2)": sys.argv[1],  # Point layer
+def init_qgis():
+    """
+    Initialize the QGIS Application, Processing and the native provider.
 
-    "speedvalue": 50,  # Default speed value
-    "speedvalue (2)": 0,  # Topology tolerance 
+    Returns:
+        The running QgsApplication; call exitQgis() on it when done
+    """
+    QgsApplication.setPrefixPath(QGIS_PREFIX_PATH, True)
+    qgs = QgsApplication([], False)
+    qgs.initQgis()
+    Processing.initialize()
+    QgsApplication.processingRegistry().addProvider(QgsNativeAlgorithms())
+    return qgs
 
-    "FieldCalculatorLength": "FieldCalculatorLength_output.gpkg",  # Output sink
-    "FinalShortestPath": sys.argv[3],  # Output sink
-    "ShortestPathPointToLayer": "ShortestPathPointToLayer_output.gpkg"  # Output sink
-}
 
-processing.run(routing, params)
+def load_network(network_file=NETWORK_FILE):
+    """
+    Load the road network once so it can be reused across routing runs
 
+    Args:
+        network_file: Path to the line layer (viteze_drum300.gpkg)
 
+    Returns:
+        QgsVectorLayer with the network
+    """
+    network = QgsVectorLayer(network_file, "network", "ogr")
+    if not network.isValid():
+        raise RuntimeError(f"Could not load network layer {network_file}")
+    return network
 
-    
-    
-    
-qgs.exitQgis()
+
+def build_params(start, end, output, network=NETWORK_FILE,
+                 length_output="FieldCalculatorLength_output.gpkg",
+                 shortest_path_output="ShortestPathPointToLayer_output.gpkg"):
+    """
+    Build the parameters of the ShortestPathPointToLayer_zipcodes_v5 model
+
+    Args:
+        start: Starting point layer (path or QgsVectorLayer)
+        end: End points layer (path or QgsVectorLayer)
+        output: Output sink for the final shortest path
+        network: Line layer (path or an already loaded QgsVectorLayer)
+        length_output: Output sink for the length field calculator step
+        shortest_path_output: Output sink for the raw shortest path step
+
+    Returns:
+        dict of model parameters
+    """
+    return {
+        "pathtypetocalculate0shortest1fastest": 1,  # Default: Fastest (1)
+        "pathtypetocalculatetypeshortestorfastest": "Fastest",  # Default: "Fastest"
+
+        "roadclassification (16)": network,  # Line layer
+        "roadclassification (16) (2)": end,  # Point layer
+        "roadclassification (16) (2) (2)": start,  # Point layer
+
+        "speedvalue": 50,  # Default speed value
+        "speedvalue (2)": 0,  # Topology tolerance
+
+        "FieldCalculatorLength": length_output,  # Output sink
+        "FinalShortestPath": output,  # Output sink
+        "ShortestPathPointToLayer": shortest_path_output  # Output sink
+    }
+
+
+def route(start, end, output, network=NETWORK_FILE, **sinks):
+    """
+    Run the routing model for one start/end pair
+
+    Args:
+        start: Starting point layer
+        end: End points layer
+        output: Output sink for the final shortest path
+        network: Line layer (path or loaded QgsVectorLayer)
+        **sinks: Optional overrides for the intermediate output sinks
+
+    Returns:
+        dict with the model results
+    """
+    routing = ShortestPathPointToLayer_zipcodes_v5()
+    return processing.run(routing, build_params(start, end, output, network, **sinks))
+
+
+def memory_points(name, points):
+    """
+    Build an in-memory EPSG:4326 point layer
+
+    Args:
+        name: Layer name
+        points: list of (lon, lat, attributes) with attributes keyed by POINT_FIELDS
+
+    Returns:
+        QgsVectorLayer backed by the memory provider
+    """
+    layer = QgsVectorLayer("Point?crs=EPSG:4326", name, "memory")
+    provider = layer.dataProvider()
+    provider.addAttributes([QgsField(field, QVariant.String) for field in POINT_FIELDS])
+    layer.updateFields()
+
+    features = []
+    for lon, lat, attributes in points:
+        feature = QgsFeature(layer.fields())
+        feature.setGeometry(QgsGeometry.fromPointXY(QgsPointXY(lon, lat)))
+        feature.setAttributes([
+            None if attributes.get(field) is None else str(attributes.get(field))
+            for field in POINT_FIELDS
+        ])
+        features.append(feature)
+    provider.addFeatures(features)
+    layer.updateExtents()
+    return layer
+
+
+def _plain(value):
+    # QGIS returns NULL attributes as null QVariants, which do not pickle
+    if value is None or (isinstance(value, QVariant) and value.isNull()):
+        return None
+    return value
+
+
+def route_features(start_points, end_points, network=NETWORK_FILE, feedback=None):
+    """
+    Run the routing model on in-memory layers, without touching the disk
+
+    Args:
+        start_points: list of (lon, lat, attributes) for the start layer
+        end_points: list of (lon, lat, attributes) for the end layer
+        network: Line layer (path or loaded QgsVectorLayer)
+        feedback: Optional QgsProcessingFeedback receiving the model progress
+
+    Returns:
+        list of (wkb, attributes) for the features of the final shortest path
+    """
+    context = QgsProcessingContext()
+    params = build_params(
+        memory_points("start", start_points),
+        memory_points("end", end_points),
+        "TEMPORARY_OUTPUT",
+        network,
+        length_output="TEMPORARY_OUTPUT",
+        shortest_path_output="TEMPORARY_OUTPUT"
+    )
+    results = processing.run(ShortestPathPointToLayer_zipcodes_v5(), params, context=context, feedback=feedback)
+
+    layer = results["FinalShortestPath"]
+    if isinstance(layer, str):
+        layer = QgsProcessingUtils.mapLayerFromString(layer, context)
+    names = layer.fields().names()
+    return [
+        (bytes(feature.geometry().asWkb()), {n: _plain(v) for n, v in zip(names, feature.attributes())})
+        for feature in layer.getFeatures()
+    ]
+
+
+if __name__ == "__main__":
+    qgs = init_qgis()
+    # Only the final path is written; intermediate steps stay in memory
+    route(sys.argv[1], sys.argv[2], sys.argv[3],
+          length_output="TEMPORARY_OUTPUT", shortest_path_output="TEMPORARY_OUTPUT")
+    qgs.exitQgis()
@@ -0,0 +1,172 @@
+"""
+Zipcode Suggestion Index
+In-memory prefix trie over postcodes and a token prefix index over street and
+city names, built once at startup so the suggestion box can query the server
+instead of downloading the whole points file
+"""
+
+import re
+
+import numpy as np
+
+
+_TOKEN = re.compile(r'\w+', re.UNICODE)
+_NO_RANKS = np.empty(0, dtype=np.int64)
+
+
+def _text(value):
+    return value.strip() if isinstance(value, str) else ''
+
+
+def _tokens(text):
+    return _TOKEN.findall(text.lower())
+
+
+class _TrieNode:
+    __slots__ = ('children', 'ranks')
+
+    def __init__(self):
+        self.children = {}
+        self.ranks = []
+
+
+class SuggestIndex:
+    """
+    Ranked "ZIP - Street, City" suggestions for the zipcode inputs
+
+    Rows are ranked once like zipcodeSuggestions.js did client-side: exact
+    postcode, then postcodes starting with the query (shorter first), then
+    rows whose street/city words start with every word of the query. Each
+    trie node keeps its rows already sorted by that rank, so a page is a
+    slice of a precomputed array.
+    """
+
+    def __init__(self, frame, postcode_column='postcode', address_column='address',
+                 city_column='city', type_column='type'):
+        def column(name):
+            if name in frame.columns:
+                return [_text(v) for v in frame[name].tolist()]
+            return [''] * len(frame)
+
+        postcodes = column(postcode_column)
+        addresses = column(address_column)
+        cities = column(city_column)
+        types = column(type_column)
+
+        geometry = frame.geometry
+        if len(frame) and not (geometry.geom_type == 'Point').all():
+            geometry = geometry.representative_point()
+        lons = geometry.x.to_numpy() if len(frame) else np.empty(0)
+        lats = geometry.y.to_numpy() if len(frame) else np.empty(0)
+
+        # Rank order: shorter postcodes first, then postcode, then file order
+        rows = [i for i, postcode in enumerate(postcodes) if postcode]
+        rows.sort(key=lambda i: (len(postcodes[i]), postcodes[i].lower(), i))
+
+        self.suggestions = []
+        self._postcodes = _TrieNode()
+        tokens = {}
+        for rank, row in enumerate(rows):
+            postcode = postcodes[row]
+            address = addresses[row] if addresses[row] != '-' else ''
+            city = cities[row]
+            self.suggestions.append({
+                'postcode': postcode,
+                'address': addresses[row] or '-',
+                'city': city,
+                'type': types[row],
+                'text': f"{postcode} - {address}{', ' if address else ''}{city}",
+                'lon': float(lons[row]),
+                'lat': float(lats[row]),
+            })
+
+            node = self._postcodes
+            node.ranks.append(rank)
+            for char in postcode.lower():
+                node = node.children.setdefault(char, _TrieNode())
+                node.ranks.append(rank)
+
+            for token in set(_tokens(address) + _tokens(city)):
+                tokens.setdefault(token, []).append(rank)
+
+        # Every prefix of every street/city word -> ranks containing such a word
+        self._tokens = {}
+        for token, ranks in tokens.items():
+            for end in range(1, len(token) + 1):
+                self._tokens.setdefault(token[:end], []).append(ranks)
+        self._tokens = {
+            prefix: np.unique(np.concatenate(lists)) if len(lists) > 1 else np.asarray(lists[0], dtype=np.int64)
+            for prefix, lists in self._tokens.items()
+        }
+
+        self._freeze(self._postcodes)
+
+    def _freeze(self, root):
+        stack = [root]
+        while stack:
+            node = stack.pop()
+            node.ranks = np.asarray(node.ranks, dtype=np.int64)
+            stack.extend(node.children.values())
+
+    def __len__(self):
+        return len(self.suggestions)
+
+    def _postcode_ranks(self, query):
+        node = self._postcodes
+        for char in query:
+            node = node.children.get(char)
+            if node is None:
+                return _NO_RANKS
+        return node.ranks
+
+    def _token_ranks(self, query):
+        words = _tokens(query)
+        if not words:
+            return _NO_RANKS
+        postings = []
+        for word in words:
+            ranks = self._tokens.get(word)
+            if ranks is None:
+                return _NO_RANKS
+            postings.append(ranks)
+        postings.sort(key=len)
+        ranks = postings[0]
+        for other in postings[1:]:
+            ranks = np.intersect1d(ranks, other, assume_unique=True)
+        return ranks
+
+    def search(self, query, limit=10, offset=0):
+        """
+        Suggestions matching a partial postcode, street or city
+
+        Args:
+            query: Text typed in the zipcode input
+            limit: Page size
+            offset: Number of suggestions to skip
+
+        Returns:
+            (suggestions, total): the requested page of suggestion dicts
+            (postcode, address, city, type, text, lon, lat) and the number of
+            matches over all pages
+        """
+        query = query.strip().lower() if query else ''
+        if not query:
+            return [], 0
+
+        by_postcode = self._postcode_ranks(query)
+        by_token = self._token_ranks(query)
+        if len(by_postcode) and len(by_token):
+            by_token = by_token[~np.isin(by_token, by_postcode, assume_unique=True)]
+
+        total = len(by_postcode) + len(by_token)
+        page = []
+        for ranks in (by_postcode, by_token):
+            if len(page) >= limit:
+                break
+            if offset >= len(ranks):
+                offset -= len(ranks)
+                continue
+            chunk = ranks[offset:offset + limit - len(page)]
+            page.extend(self.suggestions[r] for r in chunk.tolist())
+            offset = 0
+        return page, total
@@ -0,0 +1,117 @@
+"""
+Round Trip Tour Optimization
+Orders the waypoints of a round trip (start → … → start) with a nearest
+neighbour construction improved by 2-opt and Or-opt moves, bounded in time
+so large round trips stay interactive
+"""
+
+import time
+
+import numpy as np
+
+
+def tour_cost(costs, order):
+    """Cost of visiting `order` and returning to its first stop"""
+    closed = list(order) + [order[0]]
+    return float(sum(costs[a][b] for a, b in zip(closed, closed[1:])))
+
+
+def _prefix_costs(c, ext):
+    """Forward and reversed cumulative costs along the closed tour `ext`"""
+    forward = [0.0]
+    backward = [0.0]
+    for a, b in zip(ext, ext[1:]):
+        forward.append(forward[-1] + c[a][b])
+        backward.append(backward[-1] + c[b][a])
+    return forward, backward
+
+
+def _two_opt_pass(c, ext, deadline):
+    """Apply the first improving segment reversal; works on asymmetric costs"""
+    n = len(ext) - 1
+    forward, backward = _prefix_costs(c, ext)
+    for i in range(1, n - 1):
+        a, first = ext[i - 1], ext[i]
+        for j in range(i + 1, n):
+            last, b = ext[j], ext[j + 1]
+            old = c[a][first] + (forward[j] - forward[i]) + c[last][b]
+            new = c[a][last] + (backward[j] - backward[i]) + c[first][b]
+            if new < old - 1e-9:
+                ext[i:j + 1] = ext[i:j + 1][::-1]
+                return True
+        if time.perf_counter() > deadline:
+            return False
+    return False
+
+
+def _or_opt_pass(c, ext, deadline, max_segment=3):
+    """Move a run of up to `max_segment` stops to a cheaper position"""
+    n = len(ext) - 1
+    for k in range(1, max_segment + 1):
+        for i in range(1, n - k + 1):
+            a, first, last, b = ext[i - 1], ext[i], ext[i + k - 1], ext[i + k]
+            removed = c[a][first] + c[last][b] - c[a][b]
+            for p in range(0, n):
+                if i - 1 <= p <= i + k - 1:
+                    continue
+                x, y = ext[p], ext[p + 1]
+                added = c[x][first] + c[last][y] - c[x][y]
+                if added < removed - 1e-9:
+                    segment = ext[i:i + k]
+                    del ext[i:i + k]
+                    insert_at = p + 1 if p < i else p + 1 - k
+                    ext[insert_at:insert_at] = segment
+                    return True
+            if time.perf_counter() > deadline:
+                return False
+    return False
+
+
+def solve_tour(costs, time_limit=1.0):
+    """
+    Order the stops of a round trip that starts and ends at stop 0
+
+    Args:
+        costs: Square matrix (list or array, may be asymmetric) of travel
+            costs between stops; NaN/inf marks unreachable pairs
+        time_limit: Seconds allowed for the improvement phase
+
+    Returns:
+        (order, total) where order starts with 0 and lists every stop once
+        (the return to 0 is implied) and total is the round trip cost
+    """
+    costs = np.asarray(costs, dtype=float)
+    n = len(costs)
+    if n <= 2:
+        order = list(range(n))
+        return order, tour_cost(costs, order) if n else 0.0
+    if n == 3:
+        # Only two tours exist; they differ on asymmetric (oneway) costs
+        forward, backward = [0, 1, 2], [0, 2, 1]
+        forward_cost, backward_cost = tour_cost(costs, forward), tour_cost(costs, backward)
+        return (backward, backward_cost) if backward_cost < forward_cost else (forward, forward_cost)
+
+    # Unreachable pairs stay usable but are avoided whenever possible
+    finite = costs[np.isfinite(costs)]
+    penalty = (float(finite.max()) if finite.size else 1.0) * n * 10
+    c = np.where(np.isfinite(costs), costs, penalty).tolist()
+    deadline = time.perf_counter() + time_limit
+
+    order = [0]
+    remaining = set(range(1, n))
+    while remaining:
+        last = order[-1]
+        nearest = min(remaining, key=lambda j: c[last][j])
+        order.append(nearest)
+        remaining.remove(nearest)
+
+    ext = order + [0]
+    while time.perf_counter() < deadline:
+        if _two_opt_pass(c, ext, deadline):
+            continue
+        if _or_opt_pass(c, ext, deadline):
+            continue
+        break
+
+    order = ext[:-1]
+    return order, tour_cost(costs, order)
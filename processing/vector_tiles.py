@@ -0,0 +1,247 @@
+"""
+Mapbox Vector Tiles
+Cuts web mercator tiles from point and line layers and encodes them in the
+Mapbox Vector Tile format (protobuf, spec version 2) without extra
+dependencies, so the map only downloads the features that are visible
+"""
+
+import math
+import struct
+
+import numpy as np
+import shapely
+from shapely import STRtree
+
+
+EXTENT = 4096
+BUFFER = 64
+MERCATOR_RADIUS = 6378137.0
+MERCATOR_HALF = math.pi * MERCATOR_RADIUS
+MAX_LATITUDE = 85.0511287798
+
+_MOVE_TO, _LINE_TO = 1, 2
+_POINT, _LINESTRING = 1, 2
+
+
+def to_mercator(lonlat):
+    """EPSG:4326 -> EPSG:3857 for an (n, 2) coordinate array (shapely.transform callback)"""
+    lon = np.radians(lonlat[:, 0])
+    lat = np.radians(np.clip(lonlat[:, 1], -MAX_LATITUDE, MAX_LATITUDE))
+    return np.column_stack([MERCATOR_RADIUS * lon, MERCATOR_RADIUS * np.log(np.tan(np.pi / 4 + lat / 2))])
+
+
+def tile_bounds(z, x, y):
+    """(minx, miny, maxx, maxy) of tile z/x/y in web mercator meters"""
+    size = 2 * MERCATOR_HALF / 2 ** z
+    minx = -MERCATOR_HALF + x * size
+    maxy = MERCATOR_HALF - y * size
+    return minx, maxy - size, minx + size, maxy
+
+
+def tile_lonlat_bounds(z, x, y):
+    """(west, south, east, north) of tile z/x/y in degrees"""
+    minx, miny, maxx, maxy = tile_bounds(z, x, y)
+    lat = lambda v: math.degrees(2 * math.atan(math.exp(v / MERCATOR_RADIUS)) - math.pi / 2)
+    return math.degrees(minx / MERCATOR_RADIUS), lat(miny), math.degrees(maxx / MERCATOR_RADIUS), lat(maxy)
+
+
+def tiles_covering(bounds, z):
+    """Tile (x, y) ranges at zoom z covering lon/lat bounds (minx, miny, maxx, maxy)"""
+    (minx, miny), (maxx, maxy) = to_mercator(np.array([bounds[:2], bounds[2:]], dtype=float))
+    n = 2 ** z
+    size = 2 * MERCATOR_HALF / n
+    x0 = min(max(int((minx + MERCATOR_HALF) // size), 0), n - 1)
+    x1 = min(max(int((maxx + MERCATOR_HALF) // size), 0), n - 1)
+    y0 = min(max(int((MERCATOR_HALF - maxy) // size), 0), n - 1)
+    y1 = min(max(int((MERCATOR_HALF - miny) // size), 0), n - 1)
+    return range(x0, x1 + 1), range(y0, y1 + 1)
+
+
+def tile_features(geometries, properties, z, x, y, simplify=True):
+    """
+    Clip, simplify and scale mercator geometries into tile coordinates
+
+    Args:
+        geometries: Array of shapely geometries in EPSG:3857
+        properties: Attribute dicts, one per geometry
+        z, x, y: Tile address
+        simplify: Drop detail below one tile unit
+
+    Returns:
+        list of (geometry in tile units, properties) for non-empty results
+    """
+    if len(geometries) == 0:
+        return []
+    minx, miny, maxx, maxy = tile_bounds(z, x, y)
+    unit = (maxx - minx) / EXTENT
+    pad = BUFFER * unit
+    clipped = shapely.clip_by_rect(geometries, minx - pad, miny - pad, maxx + pad, maxy + pad)
+    if simplify:
+        clipped = shapely.simplify(clipped, unit, preserve_topology=True)
+    scaled = shapely.transform(
+        clipped, lambda c: np.column_stack([(c[:, 0] - minx) / unit, (maxy - c[:, 1]) / unit])
+    )
+    return [(g, p) for g, p in zip(scaled, properties) if g is not None and not g.is_empty]
+
+
+class TileLayer:
+    """
+    A point or line layer indexed for tile cutting
+
+    Args:
+        name: Layer name inside the tiles
+        geometries: Shapely geometries in EPSG:4326
+        properties: Attribute dicts, one per geometry
+    """
+
+    def __init__(self, name, geometries, properties):
+        self.name = name
+        self.geometries = shapely.transform(np.asarray(geometries, dtype=object), to_mercator)
+        self.properties = list(properties)
+        self.tree = STRtree(self.geometries)
+        self.bounds = tuple(shapely.total_bounds(np.asarray(geometries, dtype=object)))
+
+    @classmethod
+    def from_frame(cls, name, frame, fields=None):
+        """TileLayer of a GeoDataFrame; `fields` limits the attribute columns kept"""
+        frame = frame.to_crs(epsg=4326) if frame.crs is not None else frame
+        columns = [c for c in (fields or frame.columns) if c in frame.columns and c != frame.geometry.name]
+        records = frame[columns].to_dict('records')
+        properties = [{k: v for k, v in r.items() if _is_scalar(v)} for r in records]
+        return cls(name, frame.geometry.values, properties)
+
+    def features(self, z, x, y):
+        minx, miny, maxx, maxy = tile_bounds(z, x, y)
+        pad = BUFFER * (maxx - minx) / EXTENT
+        rows = self.tree.query(shapely.box(minx - pad, miny - pad, maxx + pad, maxy + pad))
+        rows.sort()
+        return tile_features(self.geometries[rows], [self.properties[i] for i in rows], z, x, y)
+
+
+def _is_scalar(value):
+    if isinstance(value, float):
+        return not math.isnan(value)
+    return isinstance(value, (str, bool, int, np.integer, np.floating))
+
+
+# --- Protobuf encoding -------------------------------------------------------
+
+def _varint(value):
+    out = bytearray()
+    while value > 0x7f:
+        out.append((value & 0x7f) | 0x80)
+        value >>= 7
+    out.append(value)
+    return bytes(out)
+
+
+def _field(number, data):
+    """Length-delimited field"""
+    return _varint((number << 3) | 2) + _varint(len(data)) + data
+
+
+def _uint_field(number, value):
+    return _varint(number << 3) + _varint(value)
+
+
+def _zigzag(value):
+    return (value << 1) ^ (value >> 63)
+
+
+def _packed(number, values):
+    return _field(number, b''.join(_varint(v) for v in values))
+
+
+def _value(value):
+    if isinstance(value, (bool, np.bool_)):
+        return _uint_field(7, int(value))
+    if isinstance(value, (int, np.integer)):
+        value = int(value)
+        return _uint_field(5, value) if value >= 0 else _uint_field(6, _zigzag(value))
+    if isinstance(value, (float, np.floating)):
+        return _varint((3 << 3) | 1) + struct.pack('<d', float(value))
+    return _field(1, str(value).encode('utf-8'))
+
+
+def _line_commands(coords, cursor):
+    points = np.rint(np.asarray(coords)[:, :2]).astype(np.int64)
+    # Vertices falling on the same tile unit collapse
+    keep = np.ones(len(points), dtype=bool)
+    keep[1:] = np.any(points[1:] != points[:-1], axis=1)
+    points = points[keep]
+    if len(points) < 2:
+        return [], cursor
+    deltas = np.diff(points, axis=0, prepend=[cursor])
+    zigzag = ((deltas << 1) ^ (deltas >> 63)).tolist()
+    commands = [_MOVE_TO | (1 << 3), *zigzag[0], _LINE_TO | ((len(points) - 1) << 3)]
+    for dx, dy in zigzag[1:]:
+        commands.append(dx)
+        commands.append(dy)
+    return commands, tuple(points[-1])
+
+
+def encode_geometry(geometry):
+    """
+    (MVT geometry type, command integers) of a geometry in tile units
+
+    Returns:
+        (None, []) for geometries without a tile representation (polygons,
+        lines shorter than one tile unit)
+    """
+    kind = geometry.geom_type
+    if kind in ('Point', 'MultiPoint'):
+        points = np.rint(shapely.get_coordinates(geometry)).astype(np.int64)
+        deltas = np.diff(points, axis=0, prepend=[[0, 0]])
+        zigzag = ((deltas << 1) ^ (deltas >> 63)).ravel().tolist()
+        return _POINT, [_MOVE_TO | (len(points) << 3), *zigzag]
+    if kind in ('LineString', 'MultiLineString', 'GeometryCollection'):
+        parts = [g for g in getattr(geometry, 'geoms', [geometry]) if g.geom_type == 'LineString']
+        commands, cursor = [], (0, 0)
+        for part in parts:
+            part_commands, cursor = _line_commands(part.coords, cursor)
+            commands.extend(part_commands)
+        return (_LINESTRING, commands) if commands else (None, [])
+    return None, []
+
+
+def encode_layer(name, features, extent=EXTENT):
+    """Layer message of (geometry in tile units, properties) pairs, or b'' if none encode"""
+    keys, values = {}, {}
+    encoded = []
+    for geometry, properties in features:
+        kind, commands = encode_geometry(geometry)
+        if kind is None:
+            continue
+        tags = []
+        for key, value in properties.items():
+            if value is None:
+                continue
+            value_bytes = _value(value)
+            tags.append(keys.setdefault(key, len(keys)))
+            tags.append(values.setdefault(value_bytes, len(values)))
+        feature = (_packed(2, tags) if tags else b'') + _uint_field(3, kind) + _packed(4, commands)
+        encoded.append(_field(2, feature))
+    if not encoded:
+        return b''
+    layer = (
+        _uint_field(15, 2)
+        + _field(1, name.encode('utf-8'))
+        + b''.join(encoded)
+        + b''.join(_field(3, key.encode('utf-8')) for key in keys)
+        + b''.join(_field(4, value) for value in values)
+        + _uint_field(5, extent)
+    )
+    return _field(3, layer)
+
+
+def encode_tile(layers):
+    """
+    Vector tile bytes
+
+    Args:
+        layers: Iterable of (layer name, [(geometry in tile units, properties), ...])
+
+    Returns:
+        Tile bytes (empty for a tile without features)
+    """
+    return b''.join(encode_layer(name, features) for name, features in layers)